@@ -3,6 +3,8 @@
 #include <vector>
 #include <string>
 #include <chrono>
+#include <unordered_map>
+#include <utility>
 #include <nlohmann/json.hpp>
 
 using json = nlohmann::json;
@@ -12,6 +14,14 @@ struct ConsumptionEntry
     std::string timestamp;
     double total_power;
     double total_cost;
+    // Per-device power for this tick, indexed by device column; NaN if the device was absent
+    std::vector<float> device_power;
+};
+
+struct DevicePowerSample
+{
+    std::string timestamp;
+    float power;
 };
 
 class ConsumptionHistory
@@ -21,6 +31,14 @@ public:
 
     void recordConsumption(double power_watt, double price_per_kwh = 0.0);
 
+    void recordConsumption(double power_watt,
+                           const std::vector<std::pair<std::string, double>>& device_powers,
+                           double price_per_kwh = 0.0);
+
+    std::vector<DevicePowerSample> getDeviceHistory(const std::string& device_id, int minutes) const;
+
+    bool hasDevice(const std::string& device_id) const;
+
     std::vector<ConsumptionEntry> getLastMinutes(int minutes) const;
 
     std::vector<ConsumptionEntry> getLastHours(int hours) const;
@@ -39,7 +57,14 @@ public:
 
 private:
     std::vector<ConsumptionEntry> entries;
+    std::unordered_map<std::string, size_t> device_columns;
     static constexpr size_t MAX_ENTRIES = 10080;
+    // Columns of devices that no longer appear in any entry are dropped after this many prunes
+    static constexpr size_t COMPACT_EVERY = 1000;
+    size_t pruned_since_compact = 0;
+
+    size_t deviceColumn(const std::string& device_id);
+    void compactColumns();
 
     std::string getCurrentTimestamp() const;
     bool isWithinTimeRange(const std::string& timestamp, int minutes) const;
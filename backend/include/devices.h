@@ -32,6 +32,11 @@ public:
     virtual void updateFromJson(const json& j) = 0;
 
     virtual json toJson(const std::string& roomName) const = 0;
+
+    // Monotonic state version, bumped on every accepted change
+    virtual long long getVersion() const = 0;
+    virtual void setVersion(long long v) = 0;
+    virtual void bumpVersion() = 0;
 };
 
 class DeviceBase : public IDevice
@@ -42,6 +47,7 @@ protected:
     bool on;
     bool critical;
     std::string priority;
+    long long version = 0;
 
 public:
     DeviceBase(std::string id, std::string name, bool on = true, bool critical = false)
@@ -60,6 +66,10 @@ public:
 
     bool isCritical() const override { return critical; }
 
+    long long getVersion() const override { return version; }
+    void setVersion(long long v) override { version = v; }
+    void bumpVersion() override { ++version; }
+
     json baseJson(const std::string& roomName) const
     {
         json j;
@@ -69,6 +79,7 @@ public:
         j["critical"] = critical;
         j["room"] = roomName;
         j["priority"] = priority;
+        j["version"] = version;
         return j;
     }
 };
@@ -7,6 +7,8 @@
 #include <thread>
 #include <chrono>
 #include <fstream>
+#include <algorithm>
+#include <cstdlib>
 using json = nlohmann::json;
 
 void saveSchedulesToFile(const Schedule& schedule, const std::string& filename = "schedules.json") {
@@ -184,13 +186,25 @@ int main()
             }
         });
 
+    // Tariff reported by the frontend with each /stats poll; the backend has no tariff of its own
+    double price_per_kwh = 0.0;
+
     CROW_ROUTE(app, "/stats").methods(crow::HTTPMethod::GET)(
-        [&]() {
+        [&](const crow::request& req) {
             try {
+                auto price = req.url_params.get("price_per_kwh");
+                if (price)
+                    price_per_kwh = std::max(0.0, std::atof(price));
+
                 double total_power = 0.0;
+                std::vector<std::pair<std::string, double>> device_powers;
                 for (const auto& r : home.getRooms())
+                {
                     total_power += r.totalPower();
-                consumption_history.recordConsumption(total_power);
+                    for (const auto& d : r.getDevices())
+                        device_powers.emplace_back(d->getId(), d->getCurrentPower());
+                }
+                consumption_history.recordConsumption(total_power, device_powers, price_per_kwh);
 
                 return crow::response(home.getStatsJson().dump());
             }
@@ -214,9 +228,30 @@ int main()
             else
                 data = consumption_history.getLastHours(24);
 
+            // Average over the whole requested period, so a since= top-up carries the same value as a full load
+            double average = 0.0;
+            if (!data.empty())
+            {
+                for (const auto& entry : data)
+                    average += entry.total_power;
+                average /= data.size();
+            }
+
+            // since= returns entries at or after that stamp (client cache top-up); ISO 8601 stamps compare as strings
+            auto since = req.url_params.get("since");
+            if (since)
+            {
+                std::string since_str(since);
+                data.erase(std::remove_if(data.begin(), data.end(),
+                                          [&](const ConsumptionEntry& e) { return e.timestamp < since_str; }),
+                           data.end());
+            }
+
             json result;
             result["period"] = period_str;
-            result["average"] = consumption_history.getAverageConsumption();
+            if (since)
+                result["since"] = std::string(since);
+            result["average"] = average;
             result["data"] = json::array();
 
             for (const auto& entry : data)
@@ -235,6 +270,42 @@ int main()
         }
     });
 
+    CROW_ROUTE(app, "/chart/device_history").methods(crow::HTTPMethod::GET)([&](const crow::request& req) {
+        try {
+            auto device_id = req.url_params.get("device_id");
+            if (!device_id)
+                return crow::response(400, json{{"status","error"},{"message","device_id is required"}}.dump());
+
+            auto period = req.url_params.get("period");
+            std::string period_str = period ? std::string(period) : "24hours";
+
+            int minutes = 24 * 60;
+            if (period_str == "1hour")
+                minutes = 60;
+            else if (period_str == "7days")
+                minutes = 7 * 24 * 60;
+            else
+                period_str = "24hours";
+
+            std::string id(device_id);
+            if (!consumption_history.hasDevice(id))
+                return crow::response(404, json{{"status","error"},{"message","no history for device"}}.dump());
+
+            json result;
+            result["device_id"] = id;
+            result["period"] = period_str;
+            result["data"] = json::array();
+
+            for (const auto& sample : consumption_history.getDeviceHistory(id, minutes))
+                result["data"].push_back({{"timestamp", sample.timestamp}, {"power", sample.power}});
+
+            return crow::response(result.dump());
+        }
+        catch (const std::exception& ex) {
+            return crow::response(400, json{{"status","error"},{"message",ex.what()}}.dump());
+        }
+    });
+
     CROW_ROUTE(app, "/schedules/<string>").methods(crow::HTTPMethod::GET)(
         [&](const std::string& device_id) {
             try {
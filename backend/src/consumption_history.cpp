@@ -1,7 +1,10 @@
 #include "consumption_history.h"
 #include <algorithm>
 #include <ctime>
+#include <cmath>
+#include <cstdint>
 #include <iomanip>
+#include <limits>
 #include <sstream>
 
 ConsumptionHistory::ConsumptionHistory()
@@ -28,6 +31,61 @@ void ConsumptionHistory::recordConsumption(double power_watt, double price_per_k
     pruneOldEntries();
 }
 
+size_t ConsumptionHistory::deviceColumn(const std::string& device_id)
+{
+    auto it = device_columns.find(device_id);
+    if (it != device_columns.end())
+        return it->second;
+
+    size_t column = device_columns.size();
+    device_columns.emplace(device_id, column);
+    return column;
+}
+
+void ConsumptionHistory::recordConsumption(double power_watt,
+                                           const std::vector<std::pair<std::string, double>>& device_powers,
+                                           double price_per_kwh)
+{
+    ConsumptionEntry entry;
+    entry.timestamp = getCurrentTimestamp();
+    entry.total_power = power_watt;
+    entry.total_cost = (power_watt / 1000.0) * price_per_kwh;
+
+    for (const auto& [device_id, power] : device_powers)
+        deviceColumn(device_id);
+
+    entry.device_power.assign(device_columns.size(), std::numeric_limits<float>::quiet_NaN());
+    for (const auto& [device_id, power] : device_powers)
+        entry.device_power[device_columns.at(device_id)] = static_cast<float>(power);
+
+    entries.push_back(std::move(entry));
+    pruneOldEntries();
+}
+
+bool ConsumptionHistory::hasDevice(const std::string& device_id) const
+{
+    return device_columns.count(device_id) > 0;
+}
+
+std::vector<DevicePowerSample> ConsumptionHistory::getDeviceHistory(const std::string& device_id, int minutes) const
+{
+    std::vector<DevicePowerSample> result;
+    auto it = device_columns.find(device_id);
+    if (it == device_columns.end())
+        return result;
+
+    const size_t column = it->second;
+    for (const auto& entry : entries)
+    {
+        // Ticks recorded before the device appeared have a shorter array
+        if (column >= entry.device_power.size() || std::isnan(entry.device_power[column]))
+            continue;
+        if (isWithinTimeRange(entry.timestamp, minutes))
+            result.push_back({entry.timestamp, entry.device_power[column]});
+    }
+    return result;
+}
+
 bool ConsumptionHistory::isWithinTimeRange(const std::string& timestamp, int minutes) const
 {
     auto now = std::chrono::system_clock::now();
@@ -85,31 +143,82 @@ double ConsumptionHistory::getAverageConsumption() const
 
 json ConsumptionHistory::toJson() const
 {
-    json result = json::array();
+    // Compact layout: device ids once, then one power array per entry in column order (null = absent)
+    json devices = json::array();
+    std::vector<std::string> ids(device_columns.size());
+    for (const auto& [device_id, column] : device_columns)
+        ids[column] = device_id;
+    for (const auto& id : ids)
+        devices.push_back(id);
+
+    json list = json::array();
     for (const auto& entry : entries)
     {
         json j;
         j["timestamp"] = entry.timestamp;
         j["power"] = entry.total_power;
         j["cost"] = entry.total_cost;
-        result.push_back(j);
+        if (!entry.device_power.empty())
+        {
+            json powers = json::array();
+            for (float power : entry.device_power)
+            {
+                if (std::isnan(power))
+                    powers.push_back(nullptr);
+                else
+                    powers.push_back(power);
+            }
+            j["device_power"] = powers;
+        }
+        list.push_back(j);
     }
+
+    json result;
+    result["devices"] = devices;
+    result["entries"] = list;
     return result;
 }
 
 void ConsumptionHistory::fromJson(const json& j)
 {
     entries.clear();
-    if (!j.is_array())
+    device_columns.clear();
+    pruned_since_compact = 0;
+
+    // Older files are a plain array of totals without per-device data
+    const json* list = &j;
+    if (j.is_object())
+    {
+        if (j.contains("devices") && j["devices"].is_array())
+        {
+            for (const auto& id : j["devices"])
+                deviceColumn(id.get<std::string>());
+        }
+        if (!j.contains("entries"))
+            return;
+        list = &j["entries"];
+    }
+    if (!list->is_array())
         return;
 
-    for (const auto& item : j)
+    for (const auto& item : *list)
     {
         ConsumptionEntry entry;
         entry.timestamp = item.value("timestamp", "");
         entry.total_power = item.value("power", 0.0);
         entry.total_cost = item.value("cost", 0.0);
-        entries.push_back(entry);
+        if (item.contains("device_power") && item["device_power"].is_array())
+        {
+            const auto& powers = item["device_power"];
+            size_t count = std::min(powers.size(), device_columns.size());
+            entry.device_power.assign(count, std::numeric_limits<float>::quiet_NaN());
+            for (size_t i = 0; i < count; ++i)
+            {
+                if (powers[i].is_number())
+                    entry.device_power[i] = powers[i].get<float>();
+            }
+        }
+        entries.push_back(std::move(entry));
     }
 }
 
@@ -117,13 +226,74 @@ void ConsumptionHistory::pruneOldEntries()
 {
     if (entries.size() > MAX_ENTRIES)
     {
-        entries.erase(entries.begin(), entries.end() - MAX_ENTRIES);
+        size_t excess = entries.size() - MAX_ENTRIES;
+        entries.erase(entries.begin(), entries.begin() + excess);
+        pruned_since_compact += excess;
+        if (pruned_since_compact >= COMPACT_EVERY)
+            compactColumns();
+    }
+}
+
+void ConsumptionHistory::compactColumns()
+{
+    pruned_since_compact = 0;
+
+    std::vector<bool> used(device_columns.size(), false);
+    for (const auto& entry : entries)
+    {
+        for (size_t column = 0; column < entry.device_power.size(); ++column)
+        {
+            if (!std::isnan(entry.device_power[column]))
+                used[column] = true;
+        }
+    }
+    if (std::all_of(used.begin(), used.end(), [](bool u) { return u; }))
+        return;
+
+    // Renumber the remaining columns densely so new devices reuse the freed slots
+    std::vector<size_t> remap(used.size(), SIZE_MAX);
+    size_t next = 0;
+    for (size_t column = 0; column < used.size(); ++column)
+    {
+        if (used[column])
+            remap[column] = next++;
+    }
+
+    for (auto it = device_columns.begin(); it != device_columns.end();)
+    {
+        if (remap[it->second] == SIZE_MAX)
+        {
+            it = device_columns.erase(it);
+        }
+        else
+        {
+            it->second = remap[it->second];
+            ++it;
+        }
+    }
+
+    for (auto& entry : entries)
+    {
+        if (entry.device_power.empty())
+            continue;
+        std::vector<float> compact(next, std::numeric_limits<float>::quiet_NaN());
+        for (size_t column = 0; column < entry.device_power.size(); ++column)
+        {
+            if (remap[column] != SIZE_MAX)
+                compact[remap[column]] = entry.device_power[column];
+        }
+        // Keep older entries short: trailing columns did not exist yet
+        while (!compact.empty() && std::isnan(compact.back()))
+            compact.pop_back();
+        entry.device_power = std::move(compact);
     }
 }
 
 void ConsumptionHistory::clear()
 {
     entries.clear();
+    device_columns.clear();
+    pruned_since_compact = 0;
 }
 
 size_t ConsumptionHistory::size() const
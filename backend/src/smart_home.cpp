@@ -219,6 +219,7 @@ json SmartHome::updateDeviceState(const std::string& deviceId, const json& newSt
 
     IDevice* dev = devOpt.value();
     dev->updateFromJson(newState);
+    dev->bumpVersion();
 
     std::string roomName = "unknown";
     for (const auto& r : rooms)
@@ -250,6 +251,14 @@ json SmartHome::optimize(int tariffLevel)
         strategy->optimize(rooms, tariffLevel);
     }
 
+    if (tariffLevel != 0)
+    {
+        for (auto& r : rooms)
+            for (auto* d : r.getDevicesRaw())
+                if (d)
+                    d->bumpVersion();
+    }
+
     double total = 0.0;
     for (const auto& r : rooms)
         total += r.totalPower();
@@ -327,6 +336,7 @@ void SmartHome::loadState()
                     DeviceType dt = deviceTypeFromString(typeStr);
                     std::string did = dj.value("id", std::string(""));
                     auto dev = DeviceFactory::create(dt, did, dj);
+                    dev->setVersion(dj.value("version", 0LL));
                     room.addDevice(std::move(dev));
                 }
             }
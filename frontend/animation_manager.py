@@ -0,0 +1,149 @@
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, QEasingCurve
+
+
+class _Animation:
+    __slots__ = ("owner", "start", "end", "duration", "setter", "easing", "started_at")
+
+    def __init__(self, owner, start, end, duration, setter, easing, started_at):
+        self.owner = owner
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.setter = setter
+        self.easing = easing
+        self.started_at = started_at
+
+
+class AnimationManager(QObject):
+    """
+    Спільний "двигун" анімацій карток: один таймер на всі анімації замість
+    QVariantAnimation/QPropertyAnimation у кожній картці.
+
+    Бюджет:
+      - одночасно не більше MAX_CONCURRENT анімацій - зайві одразу
+        переходять у кінцевий стан;
+      - якщо кадр затримався (GUI-потік зайнятий) або сам крок анімацій
+        не вкладається в FRAME_BUDGET_MS - усі анімації завершуються стрибком;
+      - для невидимих віджетів (згорнуте вікно, прихована вкладка) анімація
+        не програється, значення встановлюється одразу.
+    """
+
+    FRAME_INTERVAL_MS = 16
+    FRAME_BUDGET_MS = 8.0
+    MAX_CONCURRENT = 8
+    # Пропущено стільки кадрів поспіль - вважаємо, що не встигаємо
+    MAX_FRAME_LAG = 3
+
+    _instance: Optional["AnimationManager"] = None
+
+    @classmethod
+    def instance(cls) -> "AnimationManager":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._animations: Dict[Tuple[int, str], _Animation] = {}
+        self._last_tick = 0.0
+        self.snapped = 0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.FRAME_INTERVAL_MS)
+        self._timer.timeout.connect(self._tick)
+
+    def __len__(self) -> int:
+        return len(self._animations)
+
+    @staticmethod
+    def _visible(owner) -> bool:
+        try:
+            if not owner.isVisible():
+                return False
+            window = owner.window()
+            return window is not None and not window.isMinimized()
+        except RuntimeError:
+            # C++ об'єкт віджета вже видалено
+            return False
+
+    def _apply(self, setter: Callable[[float], None], value: float) -> bool:
+        try:
+            setter(value)
+            return True
+        except RuntimeError:
+            return False
+        except Exception as e:
+            print(f"Animation step failed: {e}")
+            return False
+
+    def animate(self, owner, key: str, start: float, end: float, duration_ms: int,
+                setter: Callable[[float], None],
+                easing: QEasingCurve.Type = QEasingCurve.OutQuad):
+        """
+        Анімує значення від start до end, викликаючи setter(value) на кожному кадрі.
+        Нова анімація з тим самим (owner, key) замінює попередню.
+        """
+        anim_key = (id(owner), key)
+        self._animations.pop(anim_key, None)
+
+        if (duration_ms <= 0 or start == end or not self._visible(owner)
+                or len(self._animations) >= self.MAX_CONCURRENT):
+            if start != end:
+                self.snapped += 1
+            self._apply(setter, end)
+            return
+
+        self._animations[anim_key] = _Animation(owner, start, end, duration_ms, setter,
+                                                QEasingCurve(easing), time.perf_counter())
+        if not self._timer.isActive():
+            self._last_tick = time.perf_counter()
+            self._timer.start()
+
+    def cancel(self, owner, key: Optional[str] = None, finish: bool = False):
+        """Зупиняє анімації віджета (за потреби - з переходом у кінцевий стан)."""
+        for anim_key in [k for k in self._animations if k[0] == id(owner) and (key is None or k[1] == key)]:
+            anim = self._animations.pop(anim_key)
+            if finish:
+                self._apply(anim.setter, anim.end)
+
+    def finish_all(self):
+        """Завершує всі анімації стрибком у кінцевий стан."""
+        animations, self._animations = self._animations, {}
+        self.snapped += len(animations)
+        for anim in animations.values():
+            self._apply(anim.setter, anim.end)
+        self._timer.stop()
+
+    def _tick(self):
+        now = time.perf_counter()
+        lag_ms = (now - self._last_tick) * 1000.0
+        self._last_tick = now
+
+        if lag_ms > self.FRAME_INTERVAL_MS * self.MAX_FRAME_LAG:
+            self.finish_all()
+            return
+
+        deadline = now + self.FRAME_BUDGET_MS / 1000.0
+        for anim_key, anim in list(self._animations.items()):
+            if time.perf_counter() > deadline:
+                # Кадр вичерпано - решту анімацій не програємо
+                self.finish_all()
+                return
+
+            if not self._visible(anim.owner):
+                self._animations.pop(anim_key, None)
+                self.snapped += 1
+                self._apply(anim.setter, anim.end)
+                continue
+
+            progress = min(1.0, (now - anim.started_at) * 1000.0 / anim.duration)
+            value = anim.start + (anim.end - anim.start) * anim.easing.valueForProgress(progress)
+            alive = self._apply(anim.setter, value)
+            if progress >= 1.0 or not alive:
+                self._animations.pop(anim_key, None)
+
+        if not self._animations:
+            self._timer.stop()
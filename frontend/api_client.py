@@ -1,5 +1,6 @@
 import requests
-from typing import List, Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Optional
 
 from frontend.models import DeviceModel, RoomModel, DeviceType
 
@@ -9,18 +10,24 @@ class ApiError(Exception):
 
 
 class ApiSmartHomeClient:
-    def __init__(self, base_url: str = "http://localhost:8080"):
+    def __init__(self, base_url: str = "http://localhost:8080", timeout: float = 5, pool_size: int = 8):
         self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        # Власний пул з'єднань для кожного backend (keep-alive між запитами)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     def _get(self, path: str) -> Any:
         url = f"{self.base_url}{path}"
-        resp = requests.get(url, timeout=5)
+        resp = self.session.get(url, timeout=self.timeout)
         resp.raise_for_status()
         return resp.json()
 
     def _post(self, path: str, payload: Dict[str, Any]) -> Any:
         url = f"{self.base_url}{path}"
-        resp = requests.post(url, json=payload, timeout=5)
+        resp = self.session.post(url, json=payload, timeout=self.timeout)
         resp.raise_for_status()
         return resp.json()
 
@@ -97,13 +104,33 @@ class ApiSmartHomeClient:
         devices_json = data.get("devices", [])
         return [DeviceModel.from_json(d) for d in devices_json]
 
-    def get_stats(self) -> Dict[str, Any]:
-        data = self._get("/stats")
-        return data
+    def get_stats(self, price_per_kwh: Optional[float] = None) -> Dict[str, Any]:
+        # price_per_kwh - поточний тариф: backend рахує за ним вартість у своїй історії
+        if price_per_kwh is None:
+            return self._get("/stats")
+        resp = self.session.get(f"{self.base_url}/stats", params={"price_per_kwh": price_per_kwh},
+                                timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
 
-    def get_chart_history(self, period: str = "24hours") -> Dict[str, Any]:
-        data = self._get(f"/chart/history?period={period}")
-        return data
+    def get_chart_history(self, period: str = "24hours", since: Optional[str] = None) -> Dict[str, Any]:
+        # since - лише точки, новіші за цю мітку часу (дозавантаження кешу)
+        params = {"period": period}
+        if since:
+            params["since"] = since
+        resp = self.session.get(f"{self.base_url}/chart/history", params=params, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def get_device_history(self, device_id: str, period: str = "24hours") -> Dict[str, Any]:
+        resp = self.session.get(f"{self.base_url}/chart/device_history",
+                                params={"device_id": device_id, "period": period},
+                                timeout=self.timeout)
+        if resp.status_code == 404:
+            # Backend ще не записав жодного такту для цього пристрою
+            return {"device_id": device_id, "period": period, "data": []}
+        resp.raise_for_status()
+        return resp.json()
 
     def get_schedules(self, device_id: str) -> List[Dict[str, Any]]:
         data = self._get(f"/schedules?device_id={device_id}")
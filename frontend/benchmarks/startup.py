@@ -0,0 +1,60 @@
+"""
+Cold-start benchmark: запускає frontend N разів з трасуванням старту
+і друкує медіану для кожного етапу (імпорти, побудова вікна, first paint).
+
+    python -m frontend.benchmarks.startup --runs 10
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+_LINE = re.compile(r"^\[startup\] (?P<label>.+?): (?:(?P<dur>[\d.]+) ms \(at (?P<at1>[\d.]+) ms\)|at (?P<at2>[\d.]+) ms)$")
+
+
+def run_once(python: str, env: dict) -> dict:
+    proc = subprocess.run(
+        [python, "-m", "frontend.main", "--startup-trace", "--exit-after-paint"],
+        env=env, capture_output=True, text=True, timeout=60,
+    )
+    timings = {}
+    for line in proc.stdout.splitlines():
+        m = _LINE.match(line.strip())
+        if not m:
+            continue
+        value = m.group("dur") or m.group("at2")
+        timings[m.group("label")] = float(value)
+    if "first paint" not in timings:
+        raise RuntimeError(f"No startup trace in output:\n{proc.stdout}\n{proc.stderr}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--offscreen", action="store_true", help="QT_QPA_PLATFORM=offscreen")
+    args = parser.parse_args()
+
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = project_root + os.pathsep + env.get("PYTHONPATH", "")
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    samples = defaultdict(list)
+    # Прогрівальний запуск (компіляція .pyc, кеш іконок), у результати не входить
+    run_once(sys.executable, env)
+    for _ in range(args.runs):
+        for label, value in run_once(sys.executable, env).items():
+            samples[label].append(value)
+
+    print(f"{'stage':<32}{'median':>10}{'min':>10}{'max':>10}  (ms, {args.runs} runs)")
+    for label, values in samples.items():
+        print(f"{label:<32}{statistics.median(values):>10.1f}{min(values):>10.1f}{max(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Style recompute benchmark: вартість перемикання стану віджетів (ok/warn/critical)
+через setStyleSheet з новим QSS-рядком проти динамічної властивості (theme.set_state).
+
+    python -m frontend.benchmarks.style_recompute --updates 500 --offscreen
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+_LEGACY_BAR_QSS = """
+    QProgressBar {{
+        border: 1px solid #cbd5e1;
+        border-radius: 6px;
+        height: 22px;
+        text-align: center;
+        font-weight: bold;
+        color: {color};
+    }}
+    QProgressBar::chunk {{
+        background-color: {color};
+        border-radius: 5px;
+    }}
+"""
+_LEGACY_COLORS = {"ok": "#10b981", "warn": "#f59e0b", "critical": "#ef4444"}
+_STATES = ("ok", "warn", "critical")
+
+
+def _measure(app, widgets, apply, updates: int):
+    samples = []
+    for i in range(updates):
+        state = _STATES[i % len(_STATES)]
+        start = time.perf_counter()
+        for w in widgets:
+            apply(w, state)
+        # Полірування і перемальовування відбуваються в циклі подій
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=300)
+    parser.add_argument("--theme", choices=("light", "dark"), default="light")
+    parser.add_argument("--offscreen", action="store_true", help="QT_QPA_PLATFORM=offscreen")
+    args = parser.parse_args()
+
+    if args.offscreen:
+        os.environ["QT_QPA_PLATFORM"] = "offscreen"
+
+    from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout
+    from frontend.theme import get_light_qss, get_dark_qss, set_state
+    from frontend.windows.optimization_widget import OptimizationWidget, BudgetWidget
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    app.setStyleSheet(get_dark_qss() if args.theme == "dark" else get_light_qss())
+
+    root = QWidget()
+    layout = QVBoxLayout(root)
+    optimization = OptimizationWidget()
+    budget = BudgetWidget()
+    layout.addWidget(optimization)
+    layout.addWidget(budget)
+    root.resize(480, 720)
+    root.show()
+    app.processEvents()
+
+    widgets = [optimization.score_bar, budget.budget_bar, budget.daily_label]
+
+    def legacy(w, state):
+        w.setStyleSheet(_LEGACY_BAR_QSS.format(color=_LEGACY_COLORS[state]))
+
+    def by_property(w, state):
+        set_state(w, state)
+
+    results = {}
+    for name, apply in (("setStyleSheet", legacy), ("set_state", by_property)):
+        _measure(app, widgets, apply, 20)  # прогрів
+        for w in widgets:
+            w.setStyleSheet("")
+        results[name] = _measure(app, widgets, apply, args.updates)
+
+    print(f"{'method':<16}{'median':>10}{'p95':>10}{'max':>10}  (ms per update of {len(widgets)} widgets, "
+          f"{args.updates} updates, {args.theme})")
+    for name, values in results.items():
+        values = sorted(values)
+        p95 = values[int(len(values) * 0.95) - 1]
+        print(f"{name:<16}{statistics.median(values):>10.3f}{p95:>10.3f}{values[-1]:>10.3f}")
+
+    root.close()
+
+
+if __name__ == "__main__":
+    main()
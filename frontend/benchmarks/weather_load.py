@@ -0,0 +1,57 @@
+"""
+Weather load benchmark: WeatherClient + OptimizationEngine проти локальної
+заглушки Open-Meteo (frontend.weather_stub_server) - без доступу до мережі.
+
+    python -m frontend.benchmarks.weather_load --requests 500 --workers 8 --latency-ms 20
+"""
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="затримка відповіді заглушки")
+    parser.add_argument("--locations", type=int, default=50, help="скільки різних координат")
+    parser.add_argument("--cached", action="store_true", help="не обходити TTL-кеш WeatherClient")
+    args = parser.parse_args()
+
+    from frontend.weather import WeatherClient
+    from frontend.weather_providers import OpenMeteoProvider
+    from frontend.weather_stub_server import start_in_thread
+    from frontend.optimization import OptimizationEngine
+
+    server, url = start_in_thread(latency_ms=args.latency_ms)
+    client = WeatherClient(disk_cache=None, provider=OpenMeteoProvider(url))
+    engine = OptimizationEngine()
+    rng = random.Random(1)
+    locations = [(rng.uniform(44, 52), rng.uniform(22, 40)) for _ in range(args.locations)]
+
+    def one(i: int) -> float:
+        start = time.perf_counter()
+        bundle = client.get_weather_bundle(force=not args.cached, location=locations[i % len(locations)])
+        engine.analyze_consumption(current_power=rng.uniform(200, 4000), total_power_today=12.0,
+                                   hourly_avg=800.0, weather_data=bundle["weather"])
+        return (time.perf_counter() - start) * 1000.0
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            samples = sorted(pool.map(one, range(args.requests)))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{args.requests} requests, {args.workers} workers, stub latency {args.latency_ms:.0f} ms, "
+          f"{'cached' if args.cached else 'uncached'}")
+    print(f"throughput {args.requests / elapsed:.1f} req/s | median {statistics.median(samples):.2f} ms | "
+          f"p95 {p95:.2f} ms | max {samples[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from frontend.timeseries_store import format_timestamp
+
+
+class ChartHistoryCache:
+    """
+    Кеш відповідей /chart/history за періодом.
+
+    Поки запис свіжий (TTL від останнього повного завантаження), оновлення
+    запитує в backend лише точки, новіші за останню кешовану (since=), і
+    дописує їх у кінець, відкидаючи те, що вийшло за межі періоду. Після TTL
+    період завантажується повністю - так виправляються можливі розбіжності
+    (наприклад, після перезапуску backend). Загальна кількість точок обмежена
+    MAX_POINTS: найдавніше використані періоди витісняються першими.
+
+    Сумісний зі звичайним словником period -> дані (get / [] / update), тож
+    зберігається у знімку стану як раніше.
+    """
+
+    TTL = {"1hour": 10 * 60, "24hours": 30 * 60, "7days": 2 * 3600}
+    DEFAULT_TTL = 30 * 60
+    PERIOD_SECONDS = {"1hour": 3600, "24hours": 86400, "7days": 7 * 86400}
+    MAX_POINTS = 30000
+    # Скільки секунд після завантаження дані вважаються актуальними без жодного запиту
+    RECENT_SECONDS = 30
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # period -> {"data": ..., "full_at": час повного завантаження, "updated_at": останнього оновлення}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _expired(self, period: str, entry: Dict[str, Any], now: float) -> bool:
+        return now - entry["full_at"] > self.TTL.get(period, self.DEFAULT_TTL)
+
+    def get(self, period: str, default=None, allow_stale: bool = True):
+        """Дані періоду; allow_stale=False - лише якщо TTL ще не минув."""
+        with self._lock:
+            entry = self._entries.get(period)
+            if entry is None:
+                return default
+            if not allow_stale and self._expired(period, entry, time.time()):
+                return default
+            self._entries.move_to_end(period)
+            return entry["data"]
+
+    def __getitem__(self, period: str):
+        data = self.get(period)
+        if data is None:
+            raise KeyError(period)
+        return data
+
+    def __setitem__(self, period: str, data: Dict[str, Any]):
+        self.put(period, data)
+
+    def __contains__(self, period: str) -> bool:
+        with self._lock:
+            return period in self._entries
+
+    def put(self, period: str, data: Dict[str, Any], full_at: Optional[float] = None):
+        with self._lock:
+            now = time.time()
+            self._entries[period] = {"data": data, "full_at": now if full_at is None else full_at,
+                                     "updated_at": now if full_at is None or full_at > 0 else 0.0}
+            self._entries.move_to_end(period)
+            self._evict()
+
+    def update(self, items: Dict[str, Any]):
+        # Дані зі знімку на диску: показуються одразу, але при першому оновленні завантажуються повністю
+        for period, data in (items or {}).items():
+            if isinstance(data, dict):
+                self.put(period, data, full_at=0.0)
+
+    def is_recent(self, period: str, seconds: Optional[float] = None) -> bool:
+        with self._lock:
+            entry = self._entries.get(period)
+            limit = self.RECENT_SECONDS if seconds is None else seconds
+            return entry is not None and time.time() - entry["updated_at"] <= limit
+
+    def invalidate(self, period: Optional[str] = None):
+        with self._lock:
+            if period is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(period, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {period: entry["data"] for period, entry in self._entries.items()}
+
+    def fetch(self, client, period: str, full: bool = False) -> Dict[str, Any]:
+        """
+        Актуальні дані періоду: дозавантаження since= для свіжого запису або
+        повний запит (завжди при full=True). Викликається з робочого потоку.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(period)
+            fresh = not full and entry is not None and not self._expired(period, entry, now)
+            cached = entry["data"] if fresh else None
+            full_at = entry["full_at"] if fresh else None
+
+        since = self._last_timestamp(cached) if cached else None
+        if not since:
+            data = client.get_chart_history(period)
+            self.put(period, data)
+            return data
+
+        delta = client.get_chart_history(period, since=since)
+        data = self._splice(period, cached, delta, now)
+        self.put(period, data, full_at=full_at)
+        return data
+
+    @staticmethod
+    def _last_timestamp(data: Dict[str, Any]) -> Optional[str]:
+        entries = data.get("data") or []
+        if not entries:
+            return None
+        return str(entries[-1].get("timestamp", "")) or None
+
+    def _splice(self, period: str, cached: Dict[str, Any], delta: Dict[str, Any], now: float) -> Dict[str, Any]:
+        new_entries = delta.get("data") or []
+        entries = cached.get("data") or []
+        if new_entries:
+            # Точки з тими ж або пізнішими мітками замінюються (останній кошик міг бути неповним),
+            # а повтори однієї мітки в дозавантаженні зводяться до останньої
+            by_timestamp = {str(e.get("timestamp", "")): e for e in new_entries}
+            first_new = min(by_timestamp)
+            entries = ([e for e in entries if str(e.get("timestamp", "")) < first_new]
+                       + [by_timestamp[ts] for ts in sorted(by_timestamp)])
+
+        seconds = self.PERIOD_SECONDS.get(period)
+        if seconds:
+            cutoff = format_timestamp(now - seconds)
+            entries = [e for e in entries if str(e.get("timestamp", "")) >= cutoff]
+
+        return {
+            **cached,
+            "period": period,
+            "average": delta.get("average", cached.get("average", 0)),
+            "data": entries,
+        }
+
+    def _evict(self):
+        total = sum(len(e["data"].get("data") or []) for e in self._entries.values())
+        while total > self.MAX_POINTS and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            total -= len(entry["data"].get("data") or [])
@@ -0,0 +1,295 @@
+"""
+Рівень деталізації (LOD) для графіків історії: ряд зменшується приблизно до
+ширини графіка в пікселях (LTTB або min/max-обвідна), а при масштабуванні
+видима ділянка перераховується з повних даних.
+"""
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from PyQt5.QtCore import QEvent, QObject, Qt, QTimer
+from PyQt5.QtGui import QCursor
+from PyQt5.QtWidgets import QToolTip
+
+
+def series_from_history(entries: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Записи /chart/history -> (час у секундах epoch UTC, потужність у Вт)."""
+    y = np.fromiter((e.get("power", 0) or 0 for e in entries), dtype=np.float64, count=len(entries))
+    try:
+        stamps = [str(e.get("timestamp", "")).rstrip("Z") for e in entries]
+        x = np.array(stamps, dtype="datetime64[s]").astype(np.int64).astype(np.float64)
+    except Exception:
+        # Без коректних міток часу - просто порядкові номери
+        x = np.arange(len(entries), dtype=np.float64)
+    return x, y
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets: n_out точок, що зберігають форму кривої."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    # n_out - 2 внутрішніх кошиків між першою та останньою точкою
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0] = 0
+    idx[-1] = n - 1
+
+    a = 0
+    last = len(edges) - 1
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start = edges[i + 1]
+        next_end = edges[i + 2] if i + 1 < last else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y - ay))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+
+def minmax_envelope(x: np.ndarray, y: np.ndarray, n_bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Мінімум і максимум кожного кошика в порядку часу - жоден пік не губиться."""
+    n = len(y)
+    if n_bins < 1 or n <= 2 * n_bins:
+        return x, y
+
+    per = n // n_bins
+    m = per * n_bins
+    blocks = y[:m].reshape(n_bins, per)
+    offsets = np.arange(n_bins, dtype=np.intp) * per
+    pair = np.stack([blocks.argmin(axis=1), blocks.argmax(axis=1)], axis=1)
+    pair.sort(axis=1)
+    idx = (pair + offsets[:, None]).ravel()
+    if m < n:
+        tail = y[m:]
+        extra = np.unique(np.array([m + tail.argmin(), m + tail.argmax(), n - 1], dtype=np.intp))
+        idx = np.concatenate([idx, extra])
+    return x[idx], y[idx]
+
+
+def nearest_index(x: np.ndarray, value: float) -> int:
+    """Індекс точки відсортованого x, найближчої до value (бінарний пошук); -1 для порожнього ряду."""
+    n = len(x)
+    if n == 0:
+        return -1
+    i = int(np.searchsorted(x, value))
+    if i <= 0:
+        return 0
+    if i >= n:
+        return n - 1
+    return i if x[i] - value < value - x[i - 1] else i - 1
+
+
+def downsample(x: np.ndarray, y: np.ndarray, width_px: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Зменшує ряд до ~ширини в пікселях. Дуже щільні ряди - min/max-обвідна
+    (2 точки на піксель, гарантовано з піками), помірні - LTTB.
+    """
+    n = len(x)
+    width_px = max(16, int(width_px))
+    if n <= 2 * width_px:
+        return x, y
+    if n > 8 * width_px:
+        return minmax_envelope(x, y, width_px)
+    return lttb(x, y, 2 * width_px)
+
+
+class LodCurve(QObject):
+    """
+    Крива pyqtgraph з повними даними в NumPy і промальовуванням лише
+    видимої ділянки, зменшеної до ширини графіка. Перерахунок після зміни
+    масштабу/розміру відкладається на RESAMPLE_DELAY_MS, щоб не робити його
+    на кожен кадр панорамування.
+    """
+
+    RESAMPLE_DELAY_MS = 30
+
+    def __init__(self, plot_widget, pen=None, name=None, parent=None):
+        super().__init__(parent or plot_widget)
+        self._plot = plot_widget
+        self._view = plot_widget.getPlotItem().getViewBox()
+        self.item = plot_widget.plot([], [], pen=pen, name=name)
+        self._x = np.empty(0, dtype=np.float64)
+        self._y = np.empty(0, dtype=np.float64)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.RESAMPLE_DELAY_MS)
+        self._timer.timeout.connect(self.resample)
+        self._view.sigXRangeChanged.connect(lambda *_: self._timer.start())
+        self._view.sigResized.connect(lambda *_: self._timer.start())
+
+    @property
+    def plot_widget(self):
+        return self._plot
+
+    @property
+    def view_box(self):
+        return self._view
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._x
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._y
+
+    def set_data(self, x, y):
+        self._x = np.asarray(x, dtype=np.float64)
+        self._y = np.asarray(y, dtype=np.float64)
+        self.resample()
+
+    def visible_slice(self) -> Tuple[int, int]:
+        n = len(self._x)
+        x0, x1 = self._view.viewRange()[0]
+        lo = max(0, int(np.searchsorted(self._x, x0, side="left")) - 1)
+        hi = min(n, int(np.searchsorted(self._x, x1, side="right")) + 1)
+        if hi - lo < 2:
+            # Вид ще не охоплює дані (до першого автомасштабу) - показуємо все
+            return 0, n
+        return lo, hi
+
+    def resample(self):
+        self._timer.stop()
+        if len(self._x) == 0:
+            self.item.setData([], [])
+            return
+        lo, hi = self.visible_slice()
+        width = self._view.width() or self._plot.width()
+        xs, ys = downsample(self._x[lo:hi], self._y[lo:hi], width)
+        self.item.setData(xs, ys)
+
+
+class ChartCrosshair(QObject):
+    """
+    Перехрестя з підказкою над LodCurve. Найближча точка шукається в повних
+    (не зменшених) даних бінарним пошуком, а рух миші обробляється не частіше
+    RATE_LIMIT разів на секунду (pg.SignalProxy) - тож навіть на рядах у сотні
+    тисяч точок наведення лишається плавним. Текст підказки будує describe(index)
+    і перераховується лише при зміні точки.
+    """
+
+    RATE_LIMIT = 60
+
+    def __init__(self, curve: LodCurve, describe, parent=None):
+        super().__init__(parent or curve)
+        import pyqtgraph as pg
+
+        self._curve = curve
+        self._plot = curve.plot_widget
+        self._describe = describe
+        self._index = -1
+        self._text = ""
+
+        plot_item = self._plot.getPlotItem()
+        self._vline = pg.InfiniteLine(angle=90, movable=False,
+                                      pen=pg.mkPen(color=(100, 116, 139), width=1, style=Qt.DashLine))
+        self._marker = pg.ScatterPlotItem(size=8, pen=pg.mkPen('w'), brush=pg.mkBrush(59, 130, 246))
+        plot_item.addItem(self._vline, ignoreBounds=True)
+        plot_item.addItem(self._marker, ignoreBounds=True)
+        self.hide()
+
+        self._proxy = pg.SignalProxy(self._plot.scene().sigMouseMoved,
+                                     rateLimit=self.RATE_LIMIT, slot=self._on_mouse_moved)
+        self._plot.installEventFilter(self)
+
+    def hide(self):
+        self._vline.hide()
+        self._marker.hide()
+        self._index = -1
+        QToolTip.hideText()
+
+    def eventFilter(self, obj, event):
+        if obj is self._plot and event.type() == QEvent.Leave:
+            self.hide()
+        return False
+
+    def _on_mouse_moved(self, evt):
+        pos = evt[0]
+        view = self._curve.view_box
+        if not view.sceneBoundingRect().contains(pos):
+            self.hide()
+            return
+        xs = self._curve.x
+        i = nearest_index(xs, view.mapSceneToView(pos).x())
+        if i < 0:
+            self.hide()
+            return
+
+        x, y = xs[i], self._curve.y[i]
+        self._vline.setPos(x)
+        self._marker.setData([x], [y])
+        self._vline.show()
+        self._marker.show()
+        if i != self._index:
+            self._index = i
+            try:
+                self._text = self._describe(i)
+            except Exception as e:
+                print(f"Error describing chart point: {e}")
+                self._text = f"{y:.1f} W"
+        QToolTip.showText(QCursor.pos(), self._text, self._plot)
+
+
+class RingSeries:
+    """
+    Кільцевий буфер (час, значення) фіксованої ємності для живого режиму.
+    Кожна точка пишеться двічі (i та i + capacity), тож останні точки завжди
+    лежать у пам'яті суцільно: view() - зріз NumPy без копіювання й алокацій.
+    Зріз ділить пам'ять із буфером і перезаписується після обходу кола, тож
+    назовні (у криву) слід віддавати копію з window().
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._x = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._y = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    def append(self, x: float, y: float):
+        i = self._head
+        cap = self.capacity
+        self._x[i] = self._x[i + cap] = x
+        self._y[i] = self._y[i + cap] = y
+        self._head = (i + 1) % cap
+        if self._size < cap:
+            self._size += 1
+
+    def extend(self, xs, ys):
+        """Замінює вміст останніми capacity точками з xs/ys."""
+        xs = np.asarray(xs, dtype=np.float64)[-self.capacity:]
+        ys = np.asarray(ys, dtype=np.float64)[-self.capacity:]
+        n = len(xs)
+        cap = self.capacity
+        self._x[:n] = xs
+        self._x[cap:cap + n] = xs
+        self._y[:n] = ys
+        self._y[cap:cap + n] = ys
+        self._head = n % cap
+        self._size = n
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray]:
+        end = self._head + self.capacity
+        start = end - self._size
+        return self._x[start:end], self._y[start:end]
+
+    def window(self, span: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Копія точок за останні `span` одиниць x (для живого ряду - секунд)."""
+        x, y = self.view()
+        if not len(x):
+            return x.copy(), y.copy()
+        lo = int(np.searchsorted(x, x[-1] - span, side="left"))
+        return x[lo:].copy(), y[lo:].copy()
@@ -0,0 +1,369 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from frontend.models import DeviceModel, DeviceType
+
+
+class _TrieNode:
+    __slots__ = ("children", "bits")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Бітова маска пристроїв, у яких є слово з цим префіксом
+        self.bits = 0
+
+
+class DeviceIndex:
+    """
+    Інкрементальний індекс пристроїв для пошуку "на льоту".
+
+    Кожен пристрій займає слот (номер біта). Слова з назви, кімнати та типу
+    лежать у префіксному дереві, де кожен вузол тримає бітову маску (Python int)
+    пристроїв з таким префіксом. Стан увімкнено/вимкнено - окрема маска,
+    потужність - відсортований масив. Запит - це AND масок, тому відповідь
+    на кожне натискання клавіші не залежить від кількості пристроїв лінійно.
+
+    Синтаксис запиту: слова (префікси назви/кімнати/типу), "on"/"off"
+    (або "увімк"/"вимк"), ">100", "<500", "100-500" (Вт).
+    """
+
+    _TYPE_WORDS = {
+        DeviceType.LIGHT: "light світло лампа",
+        DeviceType.CLIMATE: "climate клімат",
+        DeviceType.SMART_PLUG: "plug розетка",
+    }
+    _ON_WORDS = ("on", "увімк", "увімкнено")
+    _OFF_WORDS = ("off", "вимк", "вимкнено")
+    _RANGE = re.compile(r"^(\d+(?:\.\d+)?)-(\d+(?:\.\d+)?)$")
+    _CMP = re.compile(r"^([<>])=?(\d+(?:\.\d+)?)$")
+    _TOKEN = re.compile(r"\w+", re.UNICODE)
+
+    _BLOCK = 256
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        # Список для пакетної побудови при першому зверненні (див. rebuild)
+        self._pending: Optional[List[DeviceModel]] = None
+        self._root = _TrieNode()
+        self._slot_by_id: Dict[str, int] = {}
+        self._devices: List[Optional[DeviceModel]] = []
+        self._tokens: List[Tuple[str, ...]] = []
+        # (назва, кімната, тип), з яких отримано _tokens - щоб не розбирати текст повторно
+        self._text_keys: List[Optional[tuple]] = []
+        self._slot_power: List[float] = []
+        self._free_slots: List[int] = []
+        self._all = 0
+        self._on = 0
+        # Відсортовані (потужність, слот) для діапазонних запитів, поділені на блоки до 2*_BLOCK
+        # записів; для кожного блоку - останній запис і маска його слотів (оновлюються на місці)
+        self._power_chunks: List[List[Tuple[float, int]]] = []
+        self._chunk_last: List[Tuple[float, int]] = []
+        self._chunk_bits: List[int] = []
+
+    def __len__(self) -> int:
+        if self._pending is not None:
+            return len(self._pending)
+        return len(self._slot_by_id)
+
+    @staticmethod
+    def device_power(device: DeviceModel) -> float:
+        base = device.load_power if device.load_power is not None else device.current_power
+        return float(base or 0.0) if device.is_on else 0.0
+
+    @staticmethod
+    def _text_key(device: DeviceModel) -> tuple:
+        return device.name, device.room, device.type
+
+    def _words(self, device: DeviceModel, shared: Optional[Dict[tuple, List[str]]] = None) -> Tuple[str, ...]:
+        # shared - кеш слів кімнати й типу, спільних для багатьох пристроїв (пакетна побудова)
+        if shared is None:
+            text = f"{device.name} {device.room} {self._TYPE_WORDS.get(device.type, '')}"
+            return tuple(sorted(set(self._TOKEN.findall(text.lower()))))
+        key = (device.room, device.type)
+        common = shared.get(key)
+        if common is None:
+            common = shared[key] = self._TOKEN.findall(
+                f"{device.room} {self._TYPE_WORDS.get(device.type, '')}".lower())
+        return tuple(sorted(set(self._TOKEN.findall(device.name.lower())).union(common)))
+
+    def rebuild(self, devices: List[DeviceModel]):
+        """
+        Приводить індекс до списку devices. Порожній індекс будується пакетно
+        і лише при першому пошуку чи зміні, а не під час завантаження; інакше
+        переіндексуються лише пристрої, у яких змінилися слова, потужність чи
+        стан, - після /devices чи /optimize це зазвичай одиниці.
+        """
+        if not self._slot_by_id:
+            self._reset()
+            self._pending = list(devices)
+            return
+
+        seen = set()
+        for device in devices:
+            seen.add(device.id)
+            slot = self._slot_by_id.get(device.id)
+            if slot is None:
+                self.add(device)
+            elif (self._text_keys[slot] == self._text_key(device)
+                  and self._slot_power[slot] == self.device_power(device)
+                  and bool(self._on >> slot & 1) == bool(device.is_on)):
+                self._devices[slot] = device
+            else:
+                self.update(device)
+        for device_id in [i for i in self._slot_by_id if i not in seen]:
+            self.remove(device_id)
+
+    def _materialize(self):
+        if self._pending is not None:
+            self._bulk_build(self._pending)
+
+    def _bulk_build(self, devices: List[DeviceModel]):
+        self._reset()
+        # Спершу збираємо слоти кожного слова і вузла, потім одна маска на вузол -
+        # замість тисяч OR над довгими цілими під час вставки
+        word_slots: Dict[str, List[int]] = {}
+        shared: Dict[tuple, List[str]] = {}
+        power = []
+        on_slots = []
+        for device in devices:
+            if device.id in self._slot_by_id:
+                continue
+            slot = len(self._devices)
+            words = self._words(device, shared)
+            self._slot_by_id[device.id] = slot
+            self._devices.append(device)
+            self._tokens.append(words)
+            self._text_keys.append(self._text_key(device))
+            self._slot_power.append(self.device_power(device))
+            power.append((self._slot_power[slot], slot))
+            if device.is_on:
+                on_slots.append(slot)
+            for word in words:
+                word_slots.setdefault(word, []).append(slot)
+
+        # Спільні слова (кімнати, типи) проходять дерево один раз
+        node_slots: Dict[int, Tuple[_TrieNode, List[int]]] = {}
+        for word, slots in word_slots.items():
+            node = self._root
+            for ch in word:
+                child = node.children.get(ch)
+                if child is None:
+                    child = node.children[ch] = _TrieNode()
+                    node_slots[id(child)] = (child, [])
+                node = child
+                node_slots[id(node)][1].extend(slots)
+
+        size = (len(self._devices) + 7) // 8
+        for node, slots in node_slots.values():
+            node.bits = self._mask(slots, size)
+        self._all = (1 << len(self._devices)) - 1
+        self._on = self._mask(on_slots, size)
+
+        power.sort()
+        step = self._BLOCK
+        for i in range(0, len(power), step):
+            chunk = power[i:i + step]
+            self._power_chunks.append(chunk)
+            self._chunk_last.append(chunk[-1])
+            self._chunk_bits.append(self._mask([slot for _, slot in chunk], size))
+
+    @staticmethod
+    def _mask(slots: List[int], size: int) -> int:
+        if len(slots) < 64:
+            bits = 0
+            for slot in slots:
+                bits |= 1 << slot
+            return bits
+        buf = bytearray(size)
+        for slot in slots:
+            buf[slot >> 3] |= 1 << (slot & 7)
+        return int.from_bytes(buf, "little")
+
+    def add(self, device: DeviceModel):
+        self._materialize()
+        if device.id in self._slot_by_id:
+            self.update(device)
+            return
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._devices[slot] = device
+        else:
+            slot = len(self._devices)
+            self._devices.append(device)
+            self._tokens.append(())
+            self._text_keys.append(None)
+            self._slot_power.append(0.0)
+        self._slot_by_id[device.id] = slot
+        self._index(slot, device)
+
+    def update(self, device: DeviceModel):
+        self._materialize()
+        slot = self._slot_by_id.get(device.id)
+        if slot is None:
+            self.add(device)
+            return
+        self._unindex(slot)
+        self._devices[slot] = device
+        self._index(slot, device)
+
+    def remove(self, device_id: str):
+        self._materialize()
+        slot = self._slot_by_id.pop(device_id, None)
+        if slot is None:
+            return
+        self._unindex(slot)
+        self._devices[slot] = None
+        self._free_slots.append(slot)
+
+    def _index(self, slot: int, device: DeviceModel):
+        bit = 1 << slot
+        words = self._words(device)
+        for word in words:
+            node = self._root
+            for ch in word:
+                child = node.children.get(ch)
+                if child is None:
+                    child = node.children[ch] = _TrieNode()
+                node = child
+                node.bits |= bit
+        self._tokens[slot] = words
+        self._text_keys[slot] = self._text_key(device)
+
+        self._all |= bit
+        if device.is_on:
+            self._on |= bit
+
+        power = self.device_power(device)
+        self._slot_power[slot] = power
+        self._power_insert((power, slot))
+
+    def _unindex(self, slot: int):
+        mask = ~(1 << slot)
+        for word in self._tokens[slot]:
+            node = self._root
+            path = []
+            for ch in word:
+                child = node.children.get(ch)
+                if child is None:
+                    break
+                child.bits &= mask
+                path.append((node, ch, child))
+                node = child
+            # Прибираємо порожні гілки
+            for parent, ch, child in reversed(path):
+                if child.bits or child.children:
+                    break
+                del parent.children[ch]
+        self._tokens[slot] = ()
+        self._text_keys[slot] = None
+
+        self._all &= mask
+        self._on &= mask
+
+        self._power_remove((self._slot_power[slot], slot))
+
+    def _power_insert(self, entry: Tuple[float, int]):
+        if not self._power_chunks:
+            self._power_chunks.append([entry])
+            self._chunk_last.append(entry)
+            self._chunk_bits.append(1 << entry[1])
+            return
+        i = min(bisect_left(self._chunk_last, entry), len(self._power_chunks) - 1)
+        chunk = self._power_chunks[i]
+        chunk.insert(bisect_left(chunk, entry), entry)
+        self._chunk_last[i] = chunk[-1]
+        self._chunk_bits[i] |= 1 << entry[1]
+        if len(chunk) > 2 * self._BLOCK:
+            # Переповнений блок ділиться навпіл; маски перераховуються лише для нього
+            half = chunk[self._BLOCK:]
+            del chunk[self._BLOCK:]
+            size = (len(self._devices) + 7) // 8
+            self._chunk_last[i] = chunk[-1]
+            self._chunk_bits[i] = self._mask([slot for _, slot in chunk], size)
+            self._power_chunks.insert(i + 1, half)
+            self._chunk_last.insert(i + 1, half[-1])
+            self._chunk_bits.insert(i + 1, self._mask([slot for _, slot in half], size))
+
+    def _power_remove(self, entry: Tuple[float, int]):
+        i = bisect_left(self._chunk_last, entry)
+        if i >= len(self._power_chunks):
+            return
+        chunk = self._power_chunks[i]
+        j = bisect_left(chunk, entry)
+        if j >= len(chunk) or chunk[j] != entry:
+            return
+        del chunk[j]
+        if not chunk:
+            del self._power_chunks[i]
+            del self._chunk_last[i]
+            del self._chunk_bits[i]
+            return
+        self._chunk_last[i] = chunk[-1]
+        self._chunk_bits[i] &= ~(1 << entry[1])
+
+    def _prefix_bits(self, prefix: str) -> int:
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return 0
+        return node.bits
+
+    def _power_bits(self, low: float, high: float) -> int:
+        lo = (low, -1)
+        hi = (high, float("inf"))
+        bits = 0
+        for i in range(bisect_left(self._chunk_last, lo), len(self._power_chunks)):
+            chunk = self._power_chunks[i]
+            if chunk[0] > hi:
+                break
+            if chunk[0] >= lo and chunk[-1] <= hi:
+                bits |= self._chunk_bits[i]
+                continue
+            # Крайній блок - лише записи з діапазону
+            for _, slot in chunk[bisect_left(chunk, lo):bisect_right(chunk, hi)]:
+                bits |= 1 << slot
+        return bits
+
+    def query_bits(self, text: str) -> int:
+        self._materialize()
+        bits = self._all
+        for raw in (text or "").lower().split():
+            if not bits:
+                break
+            if raw in self._ON_WORDS:
+                bits &= self._on
+                continue
+            if raw in self._OFF_WORDS:
+                bits &= self._all & ~self._on
+                continue
+            m = self._RANGE.match(raw)
+            if m:
+                bits &= self._power_bits(float(m.group(1)), float(m.group(2)))
+                continue
+            m = self._CMP.match(raw)
+            if m:
+                value = float(m.group(2))
+                if m.group(1) == ">":
+                    bits &= self._power_bits(value, float("inf"))
+                else:
+                    bits &= self._power_bits(float("-inf"), value)
+                continue
+            for word in self._TOKEN.findall(raw):
+                bits &= self._prefix_bits(word)
+        return bits
+
+    def query(self, text: str, limit: Optional[int] = None) -> List[DeviceModel]:
+        bits = self.query_bits(text)
+        result = []
+        while bits:
+            low = bits & -bits
+            result.append(self._devices[low.bit_length() - 1])
+            if limit is not None and len(result) >= limit:
+                break
+            bits ^= low
+        return result
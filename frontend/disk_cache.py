@@ -0,0 +1,113 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+MISSING = object()
+
+
+class DiskCache:
+    """
+    Невеликий постійний key-value кеш (SQLite, значення - JSON) з терміном дії.
+
+    Перед диском - LRU у пам'яті, тож повторні звернення обслуговуються за
+    мікросекунди, а після перезапуску - одним читанням з SQLite. Прострочені
+    записи не повертаються (хіба що allow_expired=True - для роботи без мережі)
+    і видаляються при відкритті через PURGE_GRACE.
+    """
+
+    FILE_NAME = "weather_cache.sqlite3"
+    MEMORY_ITEMS = 256
+    # Прострочені записи ще стільки зберігаються на диску - як запасні дані без мережі
+    PURGE_GRACE = 2 * 86400
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            from frontend.utils.cache_paths import cache_file
+            path = cache_file(self.FILE_NAME)
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # key -> (value, expires_at)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS kv (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+        self.purge_expired(self.PURGE_GRACE)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key: str, value: Any, expires_at: float):
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.MEMORY_ITEMS:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str, default: Any = None, allow_expired: bool = False) -> Any:
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                self._memory.move_to_end(key)
+        if hit is None:
+            try:
+                row = self._conn().execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"Error reading cache {key}: {e}")
+                return default
+            if row is None:
+                return default
+            hit = (json.loads(row[0]), row[1])
+            self._remember(key, *hit)
+
+        value, expires_at = hit
+        if expires_at < now and not allow_expired:
+            return default
+        return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        expires_at = time.time() + ttl
+        self._remember(key, value, expires_at)
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO kv(key, value, expires_at) VALUES (?, ?, ?)",
+                             (key, json.dumps(value, ensure_ascii=False, separators=(',', ':')), expires_at))
+        except sqlite3.Error as e:
+            print(f"Error writing cache {key}: {e}")
+
+    def delete(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def purge_expired(self, grace: float = 0.0):
+        """Видаляє записи, прострочені більш ніж на grace секунд."""
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM kv WHERE expires_at < ?", (time.time() - grace,))
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,241 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import replace
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from frontend.api_client import ApiSmartHomeClient, ApiError
+from frontend.models import DeviceModel, RoomModel, DeviceType
+from frontend.timeseries_store import format_timestamp, parse_timestamp
+
+
+class FleetClient:
+    """
+    Клієнт для кількох backend (по одному smart_home_server на будівлю).
+
+    Має той самий інтерфейс, що й ApiSmartHomeClient: запити на читання
+    розсилаються паралельно, результати об'єднуються, а id кімнат/пристроїв
+    отримують префікс будівлі ("Корпус A::dev_1"), за яким маршрутизуються
+    запити на зміну. Збій або повільна відповідь однієї будівлі не блокує інші.
+    """
+
+    SEP = "::"
+
+    def __init__(self, backends: Dict[str, str], timeout: float = 5.0):
+        if not backends:
+            raise ValueError("At least one backend is required")
+        self.timeout = timeout
+        self.clients: Dict[str, ApiSmartHomeClient] = {
+            name: ApiSmartHomeClient(url, timeout=timeout) for name, url in backends.items()
+        }
+        self.default_backend = next(iter(self.clients))
+        self.last_errors: Dict[str, str] = {}
+        self._last_results: Dict[Tuple[str, str], Any] = {}
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(4, len(self.clients) * 4),
+                                            thread_name_prefix="fleet")
+
+    def _fan_out(self, key: str, call: Callable[[ApiSmartHomeClient], Any],
+                 use_last: bool = True) -> Dict[str, Any]:
+        futures = {name: self._executor.submit(call, client) for name, client in self.clients.items()}
+
+        def remember(name, fut):
+            if not fut.cancelled() and fut.exception() is None:
+                with self._lock:
+                    self._last_results[(name, key)] = fut.result()
+
+        for name, fut in futures.items():
+            fut.add_done_callback(lambda f, n=name: remember(n, f))
+
+        wait(futures.values(), timeout=self.timeout)
+
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for name, fut in futures.items():
+            if fut.done() and fut.exception() is None:
+                results[name] = fut.result()
+                continue
+            errors[name] = str(fut.exception()) if fut.done() else "timeout"
+            # Повільна/недоступна будівля - показуємо її останні відомі дані (лише для читання)
+            with self._lock:
+                if use_last and (name, key) in self._last_results:
+                    results[name] = self._last_results[(name, key)]
+
+        with self._lock:
+            for name in futures:
+                if name in errors:
+                    self.last_errors[name] = errors[name]
+                else:
+                    self.last_errors.pop(name, None)
+
+        if not results:
+            raise ApiError("; ".join(f"{n}: {e}" for n, e in errors.items()))
+        return results
+
+    def _qualify(self, backend: str, local_id: str) -> str:
+        return f"{backend}{self.SEP}{local_id}"
+
+    def _split(self, qualified_id: str) -> Tuple[ApiSmartHomeClient, str, str]:
+        backend, sep, local_id = qualified_id.partition(self.SEP)
+        if not sep or backend not in self.clients:
+            raise ApiError(f"Unknown backend for id: {qualified_id}")
+        return self.clients[backend], backend, local_id
+
+    def _room_name(self, backend: str, name: str) -> str:
+        return f"{backend} / {name}"
+
+    def _qualify_device(self, backend: str, device: DeviceModel) -> DeviceModel:
+        return replace(device,
+                       id=self._qualify(backend, device.id),
+                       room=self._room_name(backend, device.room))
+
+    def _qualify_room(self, backend: str, room: RoomModel) -> RoomModel:
+        return RoomModel(
+            id=self._qualify(backend, room.id),
+            name=self._room_name(backend, room.name),
+            total_power=room.total_power,
+            devices=[self._qualify_device(backend, d) for d in room.devices],
+        )
+
+    def get_rooms(self) -> List[RoomModel]:
+        results = self._fan_out("rooms", lambda c: c.get_rooms())
+        return [self._qualify_room(b, r) for b, rooms in results.items() for r in rooms]
+
+    def add_room(self, name: str, backend: Optional[str] = None) -> RoomModel:
+        backend = backend or self.default_backend
+        return self._qualify_room(backend, self.clients[backend].add_room(name))
+
+    def delete_room(self, room_id: str) -> Dict[str, Any]:
+        client, _, local_id = self._split(room_id)
+        return client.delete_room(local_id)
+
+    def get_devices(self) -> List[DeviceModel]:
+        results = self._fan_out("devices", lambda c: c.get_devices())
+        return [self._qualify_device(b, d) for b, devices in results.items() for d in devices]
+
+    def add_device(self, room_id: str, device_type: DeviceType, config: Dict[str, Any]) -> DeviceModel:
+        client, backend, local_id = self._split(room_id)
+        return self._qualify_device(backend, client.add_device(local_id, device_type, config))
+
+    def delete_device(self, device_id: str) -> Dict[str, Any]:
+        client, _, local_id = self._split(device_id)
+        return client.delete_device(local_id)
+
+    def update_device(self, device_id: str, state: Dict[str, Any]) -> DeviceModel:
+        client, backend, local_id = self._split(device_id)
+        return self._qualify_device(backend, client.update_device(local_id, state))
+
+    def optimize(self, tariff: int) -> List[DeviceModel]:
+        # Без старих результатів: пристрої будівлі, що не відповіла, у відповіді відсутні,
+        # і MainWindow лишає для неї поточний стан
+        results = self._fan_out("optimize", lambda c: c.optimize(tariff), use_last=False)
+        return [self._qualify_device(b, d) for b, devices in results.items() for d in devices]
+
+    def get_stats(self, price_per_kwh: Optional[float] = None) -> Dict[str, Any]:
+        results = self._fan_out("stats", lambda c: c.get_stats(price_per_kwh))
+        rooms = []
+        backends = {}
+        for backend, data in results.items():
+            for room in data.get("rooms", []):
+                rooms.append({
+                    **room,
+                    "id": self._qualify(backend, room.get("id", "")),
+                    "name": self._room_name(backend, room.get("name", "")),
+                    "devices": [{**d, "id": self._qualify(backend, d.get("id", ""))}
+                                for d in room.get("devices", [])],
+                })
+            backends[backend] = {
+                "total_power": data.get("total_power", 0),
+                "error": self.last_errors.get(backend),
+            }
+        for backend, err in list(self.last_errors.items()):
+            backends.setdefault(backend, {"total_power": 0, "error": err})
+
+        return {
+            "total_power": sum(d.get("total_power", 0) for d in results.values()),
+            "forecast_next_total": sum(d.get("forecast_next_total", 0) for d in results.values()),
+            "rooms": rooms,
+            "backends": backends,
+        }
+
+    def get_chart_history(self, period: str = "24hours", since: Optional[str] = None) -> Dict[str, Any]:
+        if since:
+            # Точки зводяться до хвилин: хвилину since запитуємо повністю, щоб її кошик не був неповним
+            minute = parse_timestamp(since[:16] + ":00Z")
+            since = format_timestamp(minute - 1) if minute is not None else None
+        key = f"chart:{period}:since" if since else f"chart:{period}"
+        results = self._fan_out(key, lambda c: c.get_chart_history(period, since=since))
+        if since and any(name in self.last_errors for name in self.clients):
+            # Для дозавантаження не можна підставляти старі дані будівлі - хай кеш лишить попередні
+            raise ApiError("; ".join(f"{n}: {e}" for n, e in self.last_errors.items()))
+        # Сервери пишуть історію незалежно: зразки кожної будівлі усереднюються в межах
+        # хвилини, а середні різних будівель сумуються
+        buckets: Dict[str, Dict[str, float]] = {}
+        for data in results.values():
+            minutes: Dict[str, List[float]] = {}
+            for entry in data.get("data", []):
+                acc = minutes.setdefault(str(entry.get("timestamp", ""))[:16], [0.0, 0.0, 0])
+                acc[0] += entry.get("power", 0) or 0
+                acc[1] += entry.get("cost", 0) or 0
+                acc[2] += 1
+            for key, (power, cost, n) in minutes.items():
+                b = buckets.setdefault(key, {"power": 0.0, "cost": 0.0})
+                b["power"] += power / n
+                b["cost"] += cost / n
+        merged = [{"timestamp": f"{k}:00Z", **v} for k, v in sorted(buckets.items())]
+        return {
+            "period": period,
+            "average": sum(d.get("average", 0) for d in results.values()),
+            "data": merged,
+        }
+
+    def get_device_history(self, device_id: str, period: str = "24hours") -> Dict[str, Any]:
+        client, _, local_id = self._split(device_id)
+        return {**client.get_device_history(local_id, period), "device_id": device_id}
+
+    def get_schedules(self, device_id: str) -> List[Dict[str, Any]]:
+        client, _, local_id = self._split(device_id)
+        return client.get_schedules(local_id)
+
+    def save_schedule(self, device_id: str, schedule_data: Dict[str, Any]) -> Dict[str, Any]:
+        client, _, local_id = self._split(device_id)
+        return client.save_schedule(local_id, {**schedule_data, "device_id": local_id})
+
+    def delete_schedule(self, device_id: str, day_of_week: int) -> Dict[str, Any]:
+        client, _, local_id = self._split(device_id)
+        return client.delete_schedule(local_id, day_of_week)
+
+
+def parse_backends(value: Union[str, List[str], None]) -> Dict[str, str]:
+    """'Корпус A=http://10.0.0.2:8080, Корпус B=http://10.0.0.3:8080' -> {name: url}"""
+    if not value:
+        return {}
+    items = value.split(",") if isinstance(value, str) else list(value)
+    backends = {}
+    for i, item in enumerate(items, start=1):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, url = item.partition("=")
+        if not sep:
+            name, url = f"Будівля {i}", item
+        backends[name.strip()] = url.strip()
+    return backends
+
+
+def create_client():
+    """
+    Створює клієнт за налаштуваннями: змінна SMARTHOME_BACKENDS або
+    QSettings 'backends'. Одна адреса (або жодної) - звичайний ApiSmartHomeClient.
+    """
+    backends = parse_backends(os.environ.get("SMARTHOME_BACKENDS"))
+    if not backends:
+        from PyQt5.QtCore import QSettings
+        settings = QSettings('SmartHome', 'EnergyManager')
+        backends = parse_backends(settings.value('backends', None))
+
+    if len(backends) > 1:
+        return FleetClient(backends)
+    if backends:
+        return ApiSmartHomeClient(next(iter(backends.values())))
+    return ApiSmartHomeClient()
@@ -0,0 +1,169 @@
+import csv
+import os
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except Exception:
+    HAS_PYARROW = False
+
+
+FORMATS = {
+    "csv": "CSV (*.csv)",
+    "parquet": "Parquet (*.parquet)",
+    "arrow": "Arrow IPC (*.arrow)",
+}
+
+COLUMNS = ["series", "timestamp", "avg_power_w", "min_power_w", "max_power_w", "cost"]
+
+
+def available_formats() -> List[str]:
+    return list(FORMATS) if HAS_PYARROW else ["csv"]
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class _CsvSink:
+    def __init__(self, path: str):
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, series: str, rows: Sequence[tuple]):
+        self._writer.writerows(
+            (series, datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+             f"{avg:.3f}", f"{mn:.3f}", f"{mx:.3f}", f"{cost:.6f}")
+            for ts, avg, mn, mx, cost in rows
+        )
+
+    def close(self):
+        self._file.close()
+
+
+class _ArrowSink:
+    """Parquet або Arrow IPC: кожна порція - окремий record batch, у пам'яті лише одна порція."""
+
+    def __init__(self, path: str, fmt: str):
+        self._schema = pa.schema([
+            ("series", pa.string()),
+            ("timestamp", pa.timestamp("s", tz="UTC")),
+            ("avg_power_w", pa.float64()),
+            ("min_power_w", pa.float64()),
+            ("max_power_w", pa.float64()),
+            ("cost", pa.float64()),
+        ])
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(path, self._schema)
+        else:
+            self._writer = pa_ipc.new_file(path, self._schema)
+
+    def write(self, series: str, rows: Sequence[tuple]):
+        ts, avg, mn, mx, cost = zip(*rows)
+        batch = pa.record_batch([
+            pa.array([series] * len(rows), pa.string()),
+            pa.array([int(t) for t in ts], pa.timestamp("s", tz="UTC")),
+            pa.array(avg, pa.float64()),
+            pa.array(mn, pa.float64()),
+            pa.array(mx, pa.float64()),
+            pa.array(cost, pa.float64()),
+        ], schema=self._schema)
+        if isinstance(self._writer, pq.ParquetWriter):
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+
+class HistoryExportWorker(QObject):
+    """
+    Потоковий експорт історії з TimeSeriesStore у CSV / Parquet / Arrow IPC.
+
+    Працює в окремому QThread (як ApiWorker): дані читаються порціями по
+    CHUNK_SIZE рядків і одразу пишуться у файл, тож пам'ять не залежить від
+    довжини періоду. Файл спершу пишеться у .part і перейменовується лише
+    після успішного завершення; скасований експорт нічого не лишає.
+    """
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    CHUNK_SIZE = 5000
+
+    def __init__(self, store, path: str, fmt: str, start: float, end: float,
+                 series: Optional[List[str]] = None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.store = store
+        self.path = path
+        self.fmt = fmt
+        self.start = start
+        self.end = end
+        self.series = series
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _resolution(self, series: str) -> int:
+        # Сирі зразки зберігаються 2 доби, хвилинні агрегати - 35 днів: для довшого діапазону
+        # береться найдрібніша роздільність, що покриває його повністю
+        return self.store.covering_resolution(self.start, self.end, series)
+
+    def _open_sink(self, path: str):
+        if self.fmt == "csv":
+            return _CsvSink(path)
+        if not HAS_PYARROW:
+            raise RuntimeError("pyarrow is required for Parquet/Arrow export")
+        return _ArrowSink(path, self.fmt)
+
+    def run(self):
+        tmp_path = self.path + ".part"
+        sink = None
+        try:
+            series_list = self.series or ([self.store.RAW_SERIES]
+                                          + sorted(self.store.series_names("room:"))
+                                          + sorted(self.store.series_names("device:")))
+            plan = [(s, self._resolution(s)) for s in series_list]
+            total = sum(self.store.count(self.start, self.end, s, res) for s, res in plan)
+            done = 0
+            self.progress.emit(done, total)
+
+            sink = self._open_sink(tmp_path)
+            for series, res in plan:
+                for rows in self.store.iter_range(self.start, self.end, series, res, self.CHUNK_SIZE):
+                    if self._cancel.is_set():
+                        raise ExportCancelled()
+                    sink.write(series, rows)
+                    done += len(rows)
+                    self.progress.emit(done, total)
+            sink.close()
+            sink = None
+            os.replace(tmp_path, self.path)
+            self.finished.emit(self.path)
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            if sink is not None:
+                try:
+                    sink.close()
+                except Exception:
+                    pass
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
@@ -2,17 +2,21 @@ import sys
 import os
 
 current_file = os.path.abspath(__file__)
-current_dir = os.path.dirname(current_file)  
-project_root = os.path.dirname(current_dir) 
+current_dir = os.path.dirname(current_file)
+project_root = os.path.dirname(current_dir)
 
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QSettings
-from frontend.windows.main_window import MainWindow
-from frontend.theme import apply_theme, current_theme
+from frontend import startup_trace
+
+with startup_trace.span("import PyQt5"):
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtGui import QIcon
+    from PyQt5.QtCore import QSettings, QTimer
+with startup_trace.span("import MainWindow"):
+    from frontend.windows.main_window import MainWindow
+    from frontend.theme import apply_theme, current_theme
 
 
 def main():
@@ -24,9 +28,22 @@ def main():
         app.setWindowIcon(QIcon(icon_path))
 
     # Apply previously selected theme (default: light)
-    apply_theme(current_theme())
+    with startup_trace.span("apply_theme"):
+        apply_theme(current_theme())
+
+    with startup_trace.span("MainWindow()"):
+        window = MainWindow()
+
+    if startup_trace.enabled:
+        exit_after_paint = "--exit-after-paint" in sys.argv
+
+        def on_first_paint():
+            print(startup_trace.report(), flush=True)
+            if exit_after_paint:
+                QTimer.singleShot(0, app.quit)
+
+        startup_trace.watch_first_paint(window, on_first_paint)
 
-    window = MainWindow()
     window.show()
 
     sys.exit(app.exec_())
@@ -34,4 +51,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
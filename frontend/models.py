@@ -38,6 +38,9 @@ class DeviceModel:
 
     load_power: Optional[float] = None 
 
+    # Версія стану на сервері (зростає з кожною прийнятою зміною)
+    version: int = 0
+
     @staticmethod
     def from_json(data: Dict[str, Any]) -> "DeviceModel":
         d_type = DeviceType.from_str(data.get("type", "light"))
@@ -59,8 +62,26 @@ class DeviceModel:
             target_temperature=data.get("target_temperature"),
             base_power=data.get("base_power"),
             load_power=load_power,
+            version=int(data.get("version", 0) or 0),
         )
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "room": self.room,
+            "type": self.type.value,
+            "is_on": self.is_on,
+            "critical": self.critical,
+            "current_power": self.current_power,
+            "brightness": self.brightness,
+            "max_power": self.max_power,
+            "target_temperature": self.target_temperature,
+            "base_power": self.base_power,
+            "load_power": self.load_power,
+            "version": self.version,
+        }
+
 
 @dataclass
 class RoomModel:
@@ -80,6 +101,14 @@ class RoomModel:
             devices=devices,
         )
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "total_power": self.total_power,
+            "devices": [d.to_dict() for d in self.devices],
+        }
+
 
 @dataclass
 class ScheduleEntryModel:
@@ -0,0 +1,89 @@
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from frontend.models import DeviceModel
+
+
+class PendingPatchQueue:
+    """
+    Черга оптимістичних змін стану пристроїв.
+
+    Для кожного пристрою зберігається останній авторитетний стан із сервера
+    (з його версією) та список ще не підтверджених патчів. Видимий стан - це
+    авторитетний стан з накладеними поверх патчами у порядку їх створення.
+    """
+
+    def __init__(self):
+        self._base: Dict[str, DeviceModel] = {}
+        self._pending: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        self._next_seq = 1
+
+    def push(self, current: DeviceModel, patch: Dict[str, Any]) -> int:
+        """Додає локальну зміну; повертає її порядковий номер."""
+        if current.id not in self._base:
+            self._base[current.id] = current
+        seq = self._next_seq
+        self._next_seq += 1
+        self._pending.setdefault(current.id, []).append((seq, dict(patch)))
+        return seq
+
+    def confirm(self, seq: int, server: DeviceModel) -> DeviceModel:
+        """Сервер прийняв патч `seq`: перебазовуємо решту черги на його відповідь."""
+        pending = self._pending.get(server.id, [])
+        confirmed = next((p for s, p in pending if s == seq), None)
+        remaining = []
+        for s, p in pending:
+            if s == seq:
+                continue
+            if confirmed is not None and s < seq:
+                # Старіші патчі не повинні перекривати поля, які вже підтвердив новіший
+                p = {k: v for k, v in p.items() if k not in confirmed}
+                if not p:
+                    continue
+            remaining.append((s, p))
+        self._set_pending(server.id, remaining)
+        self._accept_confirmed(server)
+        return self.view(server.id)
+
+    def reject(self, device_id: str, seq: int) -> Optional[DeviceModel]:
+        """Патч не пройшов: відкочуємо його, решта черги залишається."""
+        pending = [(s, p) for s, p in self._pending.get(device_id, []) if s != seq]
+        self._set_pending(device_id, pending)
+        return self.view(device_id)
+
+    def rebase(self, server: DeviceModel) -> DeviceModel:
+        """Повний стан із сервера (/devices, /optimize) з накладеними очікуваними патчами.
+
+        Повне завантаження завжди замінює базу: версії на бекенді живуть у пам'яті
+        й скидаються після перезапуску, тож менша версія тут не означає застарілий стан.
+        """
+        self._base[server.id] = server
+        return self.view(server.id)
+
+    def view(self, device_id: str) -> Optional[DeviceModel]:
+        base = self._base.get(device_id)
+        if base is None:
+            return None
+        result = replace(base)
+        for _, patch in self._pending.get(device_id, []):
+            result = replace(result, **patch)
+        return result
+
+    def has_pending(self, device_id: str) -> bool:
+        return bool(self._pending.get(device_id))
+
+    def forget(self, device_id: str):
+        self._base.pop(device_id, None)
+        self._pending.pop(device_id, None)
+
+    def _accept_confirmed(self, server: DeviceModel):
+        known = self._base.get(server.id)
+        # Відповідь, що прийшла не по черзі, зі старішою версією - ігноруємо
+        if known is None or server.version >= known.version:
+            self._base[server.id] = server
+
+    def _set_pending(self, device_id: str, pending: List[Tuple[int, Dict[str, Any]]]):
+        if pending:
+            self._pending[device_id] = pending
+        else:
+            self._pending.pop(device_id, None)
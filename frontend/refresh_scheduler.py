@@ -0,0 +1,63 @@
+from typing import Callable, Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer
+
+
+class RefreshScheduler(QObject):
+    """
+    Планувальник перемальовування: компоненти позначаються "брудними",
+    а перерахунок виконується не частіше одного разу за кадр.
+    """
+
+    FRAME_INTERVAL_MS = 16
+
+    def __init__(self, interval_ms: int = FRAME_INTERVAL_MS, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._callbacks: Dict[str, Callable[[], None]] = {}
+        self._order: List[str] = []
+        self._dirty = set()
+        self._flushing = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def register(self, name: str, callback: Callable[[], None]):
+        """Реєструє компонент. Порядок реєстрації = порядок перерахунку."""
+        if name not in self._callbacks:
+            self._order.append(name)
+        self._callbacks[name] = callback
+
+    def mark_dirty(self, *names: str):
+        for name in names:
+            if name in self._callbacks:
+                self._dirty.add(name)
+        if self._dirty and not self._timer.isActive():
+            self._timer.start()
+
+    def is_dirty(self, name: str) -> bool:
+        return name in self._dirty
+
+    def flush(self):
+        """Перераховує всі брудні компоненти (кожен рівно один раз)."""
+        if self._flushing:
+            return
+        self._timer.stop()
+        self._flushing = True
+        try:
+            # Компонент може позначити наступні за порядком компоненти брудними -
+            # вони будуть оброблені в цьому ж проході.
+            for name in self._order:
+                if name not in self._dirty:
+                    continue
+                self._dirty.discard(name)
+                try:
+                    self._callbacks[name]()
+                except Exception as e:
+                    print(f"Refresh '{name}' failed: {e}")
+        finally:
+            self._flushing = False
+
+        if self._dirty:
+            self._timer.start()
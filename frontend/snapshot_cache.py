@@ -0,0 +1,48 @@
+import json
+import mmap
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class SnapshotCache:
+    """
+    Локальний знімок стану дому (кімнати, пристрої, тариф, погода, графіки)
+    для "теплого" старту без очікування backend.
+    """
+
+    FORMAT_VERSION = 1
+    FILE_NAME = "home_snapshot.json"
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            from frontend.utils.cache_paths import cache_file
+            path = cache_file(self.FILE_NAME)
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    data = json.loads(mm[:])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading snapshot: {e}")
+            return None
+
+        if not isinstance(data, dict) or data.get("version") != self.FORMAT_VERSION:
+            return None
+        return data
+
+    def save(self, snapshot: Dict[str, Any]):
+        payload = {**snapshot, "version": self.FORMAT_VERSION, "saved_at": datetime.now().isoformat()}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving snapshot: {e}")
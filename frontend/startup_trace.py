@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+_T0 = time.perf_counter()
+_marks: List[Tuple[str, float, float]] = []
+
+enabled = bool(os.environ.get("SMARTHOME_STARTUP_TRACE")) or "--startup-trace" in sys.argv
+
+
+def mark(label: str):
+    """Позначка часу від старту процесу."""
+    now = time.perf_counter()
+    _marks.append((label, now - _T0, 0.0))
+
+
+@contextmanager
+def span(label: str):
+    """Вимірює тривалість блоку (імпорт, побудова віджета тощо)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _marks.append((label, end - _T0, end - start))
+
+
+def report() -> str:
+    lines = []
+    for label, at, duration in _marks:
+        if duration:
+            lines.append(f"[startup] {label}: {duration * 1000:.1f} ms (at {at * 1000:.1f} ms)")
+        else:
+            lines.append(f"[startup] {label}: at {at * 1000:.1f} ms")
+    return "\n".join(lines)
+
+
+def watch_first_paint(widget, callback=None):
+    """Фіксує перший Paint-подію вікна як "first paint"."""
+    from PyQt5.QtCore import QObject, QEvent
+
+    class _FirstPaintFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                obj.removeEventFilter(self)
+                mark("first paint")
+                if callback:
+                    callback()
+            return False
+
+    watcher = _FirstPaintFilter(widget)
+    widget.installEventFilter(watcher)
+    return watcher
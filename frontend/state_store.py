@@ -0,0 +1,165 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+def device_power(device) -> float:
+    """Поточна потужність пристрою з урахуванням навантаження; вимкнений - 0 Вт."""
+    base_power = device.load_power if device.load_power is not None else device.current_power
+    return base_power if device.is_on else 0.0
+
+
+class StateStore(QObject):
+    """
+    Спільний стан застосунку (кімнати, пристрої, /stats, тариф) для всіх вікон.
+
+    Зрізи стану змінюються лише через set()/touch() у потоці GUI; кожна зміна
+    збільшує версію зрізу. Селектори - похідні значення від зрізів або інших
+    селекторів; результат запам'ятовується за версіями залежностей, тож
+    рахується один раз, скільки б вікон його не читали. Підписники
+    сповіщаються один раз за цикл подій (зміни зливаються), і лише якщо
+    значення справді змінилося.
+    """
+
+    changed = pyqtSignal(str)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._state: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        # name -> (залежності, функція)
+        self._selectors: Dict[str, Tuple[Tuple[str, ...], Callable[..., Any]]] = {}
+        # name -> (версії залежностей, значення)
+        self._memo: Dict[str, Tuple[tuple, Any]] = {}
+        self._subscribers: Dict[str, List[Callable[[Any], None]]] = {}
+        # name -> значення, з яким підписників сповіщено востаннє
+        self._notified: Dict[str, Any] = {}
+        self._dirty = set()
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._flush)
+
+    # --- зрізи ---
+
+    def get(self, key: str, default=None):
+        return self._state.get(key, default)
+
+    def has(self, key: str) -> bool:
+        return key in self._state
+
+    def set(self, key: str, value: Any):
+        # Списки/словники могли змінитися на місці - їх версія оновлюється завжди
+        if key in self._state and not isinstance(value, (list, dict)) and self._state[key] == value:
+            return
+        self._state[key] = value
+        self.touch(key)
+
+    def update(self, **values):
+        for key, value in values.items():
+            self.set(key, value)
+
+    def touch(self, key: str):
+        """Позначає зріз зміненим (після зміни списку/словника на місці)."""
+        self._versions[key] = self._versions.get(key, 0) + 1
+        self._dirty.add(key)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    # --- селектори ---
+
+    def selector(self, name: str, deps: Sequence[str], fn: Callable[..., Any]):
+        self._selectors[name] = (tuple(deps), fn)
+        self._memo.pop(name, None)
+
+    def _version_of(self, name: str):
+        if name in self._selectors:
+            deps, _ = self._selectors[name]
+            return tuple(self._version_of(d) for d in deps)
+        return self._versions.get(name, 0)
+
+    def select(self, name: str):
+        if name not in self._selectors:
+            return self._state.get(name)
+        deps, fn = self._selectors[name]
+        versions = tuple(self._version_of(d) for d in deps)
+        memo = self._memo.get(name)
+        if memo is not None and memo[0] == versions:
+            return memo[1]
+        value = fn(*(self.select(d) for d in deps))
+        self._memo[name] = (versions, value)
+        return value
+
+    def _depends_on(self, name: str, keys) -> bool:
+        if name in keys:
+            return True
+        if name in self._selectors:
+            return any(self._depends_on(d, keys) for d in self._selectors[name][0])
+        return False
+
+    # --- підписки ---
+
+    def subscribe(self, name: str, callback: Callable[[Any], None]) -> Callable[[], None]:
+        """callback(значення) при кожній зміні зрізу/селектора name. Повертає функцію відписки."""
+        self._subscribers.setdefault(name, []).append(callback)
+
+        def unsubscribe():
+            callbacks = self._subscribers.get(name, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+        return unsubscribe
+
+    def _flush(self):
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            self.changed.emit(key)
+
+        for name, callbacks in list(self._subscribers.items()):
+            if not callbacks or not self._depends_on(name, dirty):
+                continue
+            try:
+                value = self.select(name)
+            except Exception as e:
+                print(f"Selector '{name}' failed: {e}")
+                continue
+            # Похідне значення не змінилося - підписникам нічого перемальовувати
+            if name in self._selectors and name in self._notified and self._notified[name] == value:
+                continue
+            self._notified[name] = value
+            for callback in list(callbacks):
+                try:
+                    callback(value)
+                except Exception as e:
+                    print(f"Subscriber of '{name}' failed: {e}")
+
+
+def _room_power(devices) -> Dict[str, float]:
+    result: Dict[str, float] = {}
+    for d in devices or []:
+        result[d.room] = result.get(d.room, 0.0) + device_power(d)
+    return result
+
+
+def _stats_summary(stats) -> Dict[str, Any]:
+    stats = stats or {}
+    rooms = stats.get("rooms", [])
+    return {
+        "total_power": stats.get("total_power", 0),
+        "forecast_next_total": stats.get("forecast_next_total", 0),
+        "rooms": rooms,
+        "device_names": {dev.get("id"): dev.get("name", "")
+                         for room in rooms for dev in room.get("devices", [])},
+    }
+
+
+def create_store(parent: Optional[QObject] = None) -> StateStore:
+    """Сховище зі стандартними селекторами, спільними для MainWindow і StatisticsWindow."""
+    store = StateStore(parent)
+    store.selector('room_power', ('devices',), _room_power)
+    store.selector('total_power', ('room_power',), lambda rooms: sum(rooms.values()))
+    store.selector('cost_per_hour', ('total_power', 'price_per_kwh'),
+                   lambda power, price: (power / 1000.0) * (price or 0.0))
+    store.selector('stats_summary', ('stats',), _stats_summary)
+    return store
@@ -2,6 +2,124 @@ from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import QSettings
 import os
 
+# Кольори станів (ok/warn/critical, з'єднання, рівні оптимізації) для кожної теми.
+# Віджети перемикаються між ними динамічною властивістю (set_state), без setStyleSheet.
+STATE_COLORS = {
+    'light': {
+        'ok': '#10b981',
+        'ok_text': '#059669',
+        'warn': '#f59e0b',
+        'critical': '#ef4444',
+        'info': '#3b82f6',
+        'muted': '#64748b',
+        'bar_border': '#cbd5e1',
+        'panel_border': '#cbd5e1',
+        'panel_bg': '#f9fafb',
+        'connected': '#2ecc71',
+        'partial': '#f59e0b',
+        'disconnected': '#e74c3c',
+        'unknown': 'gray',
+        'tip_high_bg': '#fef2f2',
+        'tip_medium_bg': '#fffbeb',
+        'tip_low_bg': '#eff6ff',
+        'tip_title': '#0f172a',
+        'tip_text': '#4b5563',
+        'tip_impact': '#059669',
+    },
+    'dark': {
+        'ok': '#10b981',
+        'ok_text': '#10b981',
+        'warn': '#f59e0b',
+        'critical': '#ef4444',
+        'info': '#60a5fa',
+        'muted': '#94a3b8',
+        'bar_border': '#334155',
+        'panel_border': '#334155',
+        'panel_bg': '#0f172a',
+        'connected': '#2ecc71',
+        'partial': '#f59e0b',
+        'disconnected': '#e74c3c',
+        'unknown': '#64748b',
+        'tip_high_bg': '#2f1515',
+        'tip_medium_bg': '#2f2410',
+        'tip_low_bg': '#152238',
+        'tip_title': '#e5e7eb',
+        'tip_text': '#cbd5e1',
+        'tip_impact': '#22c55e',
+    },
+}
+
+
+def get_state_qss(theme: str) -> str:
+    """Правила для станів віджетів; дописуються до QSS теми."""
+    c = STATE_COLORS.get(theme, STATE_COLORS['light'])
+    rules = [f"""
+/* State variants */
+QProgressBar#scoreBar, QProgressBar#budgetBar {{
+    border: 1px solid {c['bar_border']};
+    border-radius: 6px;
+    text-align: center;
+    font-weight: bold;
+}}
+QProgressBar#scoreBar {{ height: 20px; font-size: 11px; }}
+QProgressBar#budgetBar {{ height: 22px; }}
+QProgressBar#scoreBar::chunk, QProgressBar#budgetBar::chunk {{
+    background-color: {c['info']};
+    border-radius: 5px;
+}}
+QLabel#optLevel {{ color: {c['muted']}; }}
+QLabel#optScore {{ color: {c['info']}; }}
+QLabel#optSavings {{ color: {c['ok_text']}; }}
+QLabel#optNoTips {{ color: {c['ok_text']}; font-weight: bold; }}
+QLabel#optMoreTips {{ color: #94a3b8; font-style: italic; }}
+QScrollArea#recommendationsArea {{
+    border: 1px solid {c['panel_border']};
+    background-color: {c['panel_bg']};
+    border-radius: 6px;
+}}
+QLabel#connIndicator {{ border-radius: 7px; background: {c['unknown']}; }}
+QFrame#tipItem {{ border-radius: 4px; padding: 8px; }}
+QLabel#tipTitle {{ color: {c['tip_title']}; }}
+QLabel#tipDescription {{ color: {c['tip_text']}; }}
+QLabel#tipImpact {{ color: {c['tip_impact']}; }}
+"""]
+    for state in ('ok', 'warn', 'critical'):
+        rules.append(f"""
+QProgressBar#scoreBar[state="{state}"]::chunk,
+QProgressBar#budgetBar[state="{state}"]::chunk {{ background-color: {c[state]}; }}
+QProgressBar#budgetBar[state="{state}"] {{ color: {c[state]}; }}
+QLabel#dailyLimit[state="{state}"] {{ color: {c[state]}; font-weight: bold; }}
+""")
+    for level, key in (('off', 'ok'), ('soft', 'warn'), ('aggressive', 'critical')):
+        rules.append(f'QLabel#optLevel[state="{level}"] {{ color: {c[key]}; font-weight: bold; }}\n')
+    for priority, key in (('high', 'critical'), ('medium', 'warn'), ('low', 'info')):
+        rules.append(f"""
+QFrame#tipItem[priority="{priority}"] {{
+    background-color: {c[f'tip_{priority}_bg']};
+    border-left: 3px solid {c[key]};
+}}
+QLabel#tipAction[priority="{priority}"] {{ color: {c[key]}; }}
+""")
+    for state in ('connected', 'partial', 'disconnected', 'unknown'):
+        rules.append(f'QLabel#connIndicator[state="{state}"] {{ background: {c[state]}; }}\n')
+    return "".join(rules)
+
+
+def set_state(widget, value: str, name: str = 'state'):
+    """
+    Перемикає варіант стилю віджета через динамічну властивість.
+    Якщо стан не змінився - нічого не робить; інакше перераховує стиль
+    лише цього віджета (unpolish/polish) без розбору нового QSS.
+    """
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+
+
 def get_light_qss():
     return """
 /* Apple-Inspired Theme */
@@ -33,16 +151,12 @@ QWidget#topPanel {
 }
 
 /* Device Cards - Apple Style */
+/* Фон, рамка і тінь картки малюються з кешу (CARD_CHROME нижче) */
 QFrame#deviceCard {
-    background: #ffffff;
-    border: 0.5px solid rgba(0, 0, 0, 0.04);
-    border-radius: 12px;
+    background: transparent;
+    border: none;
     padding: 16px;
 }
-QFrame#deviceCard:hover {
-    border: 0.5px solid rgba(0, 0, 0, 0.1);
-    background: #fafafa;
-}
 
 /* Buttons - Apple Style */
 QPushButton {
@@ -282,7 +396,7 @@ QTabBar::tab:selected {
 /* Left Navigation */
 QWidget#leftNav { background: transparent; }
 QListWidget#roomsList { background: transparent; border: none; }
-"""
+""" + get_state_qss('light')
 
 def get_dark_qss():
     return """
@@ -315,15 +429,10 @@ QWidget#topPanel {
 
 /* Device Cards - Modern Dark */
 QFrame#deviceCard {
-    background: #1e293b;
-    border: 1px solid #334155;
-    border-radius: 12px;
+    background: transparent;
+    border: none;
     padding: 14px;
 }
-QFrame#deviceCard:hover {
-    border: 1px solid #475569;
-    background: #253549;
-}
 
 /* Buttons - Dark Professional */
 QPushButton {
@@ -551,22 +660,54 @@ QTabBar::tab:selected {
 /* Left Navigation - Dark */
 QWidget#leftNav { background: transparent; }
 QListWidget#roomsList { background: transparent; border: none; }
-"""
+""" + get_state_qss('dark')
+
+
+# Кольори "хрому" карток пристроїв (#AARRGGBB або #RRGGBB)
+CARD_CHROME = {
+    'light': {
+        'background': '#ffffff',
+        'background_hover': '#fafafa',
+        'border': '#0a000000',
+        'border_hover': '#1a000000',
+        'border_width': 0.5,
+        'shadow': '#64000000',
+        'radius': 12,
+    },
+    'dark': {
+        'background': '#1e293b',
+        'background_hover': '#253549',
+        'border': '#334155',
+        'border_hover': '#475569',
+        'border_width': 1.0,
+        'shadow': '#8c000000',
+        'radius': 12,
+    },
+}
+
+
+_active_theme = None
 
 
 def apply_theme(name: str):
+    global _active_theme
     app = QApplication.instance()
     if not app:
         return
+    # Зберігаємо до setStyleSheet: картки перечитують тему на StyleChange
+    _active_theme = name if name in ('light', 'dark') else 'light'
+    settings = QSettings('SmartHome', 'EnergyManager')
+    settings.setValue('theme', name)
     if name == 'dark':
         app.setStyleSheet(get_dark_qss())
     else:
         app.setStyleSheet(get_light_qss())
-    settings = QSettings('SmartHome', 'EnergyManager')
-    settings.setValue('theme', name)
 
 
 def current_theme():
+    # Після apply_theme тема відома без звернення до QSettings (викликається з paint/icon шляхів)
+    if _active_theme is not None:
+        return _active_theme
     settings = QSettings('SmartHome', 'EnergyManager')
     val = settings.value('theme', 'light')
     return val if val in ('light', 'dark') else 'light'
@@ -0,0 +1,364 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class TimeSeriesStore:
+    """
+    Локальне сховище історії споживання (SQLite у режимі WAL).
+
+    Кожен вимір /stats записується як "сирий" зразок загальної потужності та
+    одразу додається до агрегатів 1 хв / 1 год / 1 доба (min/avg/max, енергія,
+    вартість) для загальної потужності, кожної кімнати і кожного пристрою.
+    Без мережі графік будь-якого періоду читається з потрібної роздільності.
+
+    Ряди: 'total', 'room:<назва>', 'device:<id>'.
+    """
+
+    FILE_NAME = "history.sqlite3"
+
+    RAW_SERIES = "total"
+    RESOLUTIONS = (60, 3600, 86400)
+    # Скільки зберігати (секунд): сирі зразки та агрегати кожної роздільності
+    RAW_RETENTION = 2 * 86400
+    RETENTION = {60: 35 * 86400, 3600: 2 * 365 * 86400, 86400: None}
+    # Інтервал опитування /stats; довші паузи (застосунок закрито) не рахуються в енергію
+    SAMPLE_INTERVAL = 5.0
+    MAX_GAP = 60.0
+    PRUNE_EVERY = 720
+
+    PERIOD_SECONDS = {"1hour": 3600, "24hours": 86400, "7days": 7 * 86400}
+    MAX_POINTS = 20000
+
+    _UPSERT = (
+        "INSERT INTO rollups(res, series, bucket, n, min, max, sum, energy_wh, cost) "
+        "VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(res, series, bucket) DO UPDATE SET "
+        "n = n + 1, min = MIN(min, excluded.min), max = MAX(max, excluded.max), "
+        "sum = sum + excluded.sum, energy_wh = energy_wh + excluded.energy_wh, "
+        "cost = cost + excluded.cost"
+    )
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            from frontend.utils.cache_paths import cache_file
+            path = cache_file(self.FILE_NAME)
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._last: Dict[str, Tuple[float, float]] = {}
+        self._ingested = 0
+
+        conn = self._writer()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS samples (
+                ts REAL PRIMARY KEY,
+                power REAL NOT NULL,
+                cost REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rollups (
+                res INTEGER NOT NULL,
+                series TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                n INTEGER NOT NULL,
+                min REAL NOT NULL,
+                max REAL NOT NULL,
+                sum REAL NOT NULL,
+                energy_wh REAL NOT NULL,
+                cost REAL NOT NULL,
+                PRIMARY KEY (res, series, bucket)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS rollups_by_bucket ON rollups(res, bucket);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # Окреме з'єднання на потік для читання: не чекає запису з робочого потоку (WAL)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _writer(self) -> sqlite3.Connection:
+        # Одне довготривале з'єднання для запису (лише під _write_lock), з якого б потоку
+        # не прийшов вимір - без нового з'єднання і PRAGMA на кожен зразок
+        if self._write_conn is None:
+            self._write_conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            self._write_conn.execute("PRAGMA synchronous=NORMAL")
+        return self._write_conn
+
+    # ---- запис ----
+
+    def _energy(self, series: str, ts: float, power: float) -> float:
+        last = self._last.get(series)
+        dt = ts - last[0] if last else self.SAMPLE_INTERVAL
+        self._last[series] = (ts, power)
+        if dt <= 0:
+            return 0.0
+        return power * min(dt, self.MAX_GAP) / 3600.0
+
+    @staticmethod
+    def stats_values(stats: Dict[str, Any]) -> Dict[str, float]:
+        """Відповідь /stats -> {ряд: потужність Вт}."""
+        values = {"total": float(stats.get("total_power", 0) or 0)}
+        for room in stats.get("rooms", []) or []:
+            values[f"room:{room.get('name', '')}"] = float(room.get("total_power", 0) or 0)
+            for dev in room.get("devices", []) or []:
+                if dev.get("id"):
+                    values[f"device:{dev['id']}"] = float(dev.get("current_power", 0) or 0)
+        return values
+
+    def ingest_stats(self, ts: float, stats: Dict[str, Any], price_per_kwh: float = 0.0):
+        self.ingest(ts, self.stats_values(stats), price_per_kwh)
+
+    def ingest(self, ts: float, values: Dict[str, float], price_per_kwh: float = 0.0):
+        """Записує один вимір (викликається з робочого потоку перевірки з'єднання)."""
+        with self._write_lock:
+            rows = []
+            raw = None
+            for series, power in values.items():
+                energy_wh = self._energy(series, ts, power)
+                # Вартість - гроші за інтервал зразка (а не миттєвий тариф, як у backend)
+                cost = energy_wh / 1000.0 * price_per_kwh
+                if series == self.RAW_SERIES:
+                    raw = (ts, power, cost)
+                rows.extend((res, series, int(ts // res) * res, power, power, power, energy_wh, cost)
+                            for res in self.RESOLUTIONS)
+
+            conn = self._writer()
+            with conn:
+                if raw is not None:
+                    conn.execute("INSERT OR REPLACE INTO samples(ts, power, cost) VALUES (?, ?, ?)", raw)
+                conn.executemany(self._UPSERT, rows)
+            self._ingested += 1
+            if self._ingested % self.PRUNE_EVERY == 0:
+                self._prune(conn, ts)
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        with conn:
+            conn.execute("DELETE FROM samples WHERE ts < ?", (now - self.RAW_RETENTION,))
+            for res, keep in self.RETENTION.items():
+                if keep is not None:
+                    conn.execute("DELETE FROM rollups WHERE res = ? AND bucket < ?", (res, now - keep))
+
+    def backfill(self, period: str, history: Dict[str, Any]):
+        """
+        Доповнює сховище історією з backend (/chart/history) - лише точками,
+        старішими за наявні, щоб агрегати не рахувалися двічі.
+        """
+        entries = history.get("data", []) if isinstance(history, dict) else []
+        with self._write_lock:
+            conn = self._writer()
+            first = self._first_ts(conn)
+            rows = []
+            raw = []
+            prev_ts = None
+            for entry in entries:
+                ts = parse_timestamp(entry.get("timestamp"))
+                if ts is None or (first is not None and ts >= first):
+                    continue
+                power = float(entry.get("power", 0) or 0)
+                cost_rate = float(entry.get("cost", 0) or 0)
+                dt = min(ts - prev_ts, self.MAX_GAP) if prev_ts is not None and ts > prev_ts else self.SAMPLE_INTERVAL
+                prev_ts = ts
+                energy_wh = power * dt / 3600.0
+                cost = cost_rate * dt / 3600.0
+                raw.append((ts, power, cost))
+                for res in self.RESOLUTIONS:
+                    rows.append((res, self.RAW_SERIES, int(ts // res) * res, power, power, power, energy_wh, cost))
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO samples(ts, power, cost) VALUES (?, ?, ?)", raw)
+                conn.executemany(self._UPSERT, rows)
+                # Backend старших даних не має - період вважаємо покритим
+                conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+                             (f"backfilled:{period}", str(time.time())))
+
+    # ---- читання ----
+
+    def _first_ts(self, conn: sqlite3.Connection, series: str = RAW_SERIES) -> Optional[float]:
+        row = conn.execute("SELECT MIN(bucket) FROM rollups WHERE res = ? AND series = ?",
+                           (self.RESOLUTIONS[0], series)).fetchone()
+        raw = conn.execute("SELECT MIN(ts) FROM samples").fetchone() if series == self.RAW_SERIES else None
+        candidates = [v for v in ((row or [None])[0], (raw or [None])[0]) if v is not None]
+        return min(candidates) if candidates else None
+
+    def series_names(self, prefix: str = "") -> List[str]:
+        rows = self._conn().execute(
+            "SELECT DISTINCT series FROM rollups WHERE res = ? AND series LIKE ?",
+            (self.RESOLUTIONS[-1], prefix + "%")).fetchall()
+        return [r[0] for r in rows]
+
+    def top_series_at(self, ts: float, prefix: str = "device:", limit: int = 3,
+                      res: int = RESOLUTIONS[0]) -> List[Tuple[str, float]]:
+        """Ряди з найбільшою середньою потужністю в кошику, що містить ts: [(series, avg)]."""
+        rows = self._conn().execute(
+            "SELECT series, sum / n FROM rollups WHERE res = ? AND bucket = ? AND series LIKE ? "
+            "ORDER BY sum / n DESC LIMIT ?",
+            (res, int(ts // res) * res, prefix + "%", limit)).fetchall()
+        return [(series, avg) for series, avg in rows]
+
+    def resolution_for(self, start: float, end: float, series: str = RAW_SERIES,
+                       max_points: int = MAX_POINTS) -> int:
+        """0 - сирі зразки, інакше розмір кошика агрегату в секундах."""
+        span = max(1.0, end - start)
+        if series == self.RAW_SERIES and span / self.SAMPLE_INTERVAL <= max_points:
+            return 0
+        for res in self.RESOLUTIONS:
+            if span / res <= max_points:
+                return res
+        return self.RESOLUTIONS[-1]
+
+    def first_timestamp(self, series: str = RAW_SERIES) -> Optional[float]:
+        """Найраніша збережена точка ряду (за найгрубшим агрегатом, що зберігається вічно)."""
+        conn = self._conn()
+        day = conn.execute("SELECT MIN(bucket) FROM rollups WHERE res = ? AND series = ?",
+                           (self.RESOLUTIONS[-1], series)).fetchone()[0]
+        if day is None:
+            return None
+        # Хвилинні агрегати ще не обрізані до початку історії - вони точніші за кошик доби
+        minute = self._first_ts(conn, series)
+        return minute if minute is not None and minute - day < self.RESOLUTIONS[-1] else day
+
+    def covering_resolution(self, start: float, end: float, series: str = RAW_SERIES) -> int:
+        """
+        Найдрібніша роздільність, що ще зберігається на весь діапазон [start, end]:
+        сирі зразки (лише 'total'), потім 1 хв, 1 год, 1 доба - за RAW_RETENTION / RETENTION.
+        """
+        first = self.first_timestamp(series)
+        if first is not None:
+            start = max(start, first)
+        levels = ((0,) if series == self.RAW_SERIES else ()) + self.RESOLUTIONS
+        for res in levels:
+            keep = self.RAW_RETENTION if res == 0 else self.RETENTION[res]
+            if keep is None or start >= end - keep:
+                return res
+        return self.RESOLUTIONS[-1]
+
+    def query(self, start: float, end: float, series: str = RAW_SERIES,
+              max_points: int = MAX_POINTS, res: Optional[int] = None) -> List[Tuple[float, float, float, float, float]]:
+        """Рядки (ts, avg, min, max, cost) у діапазоні [start, end]."""
+        if res is None:
+            res = self.resolution_for(start, end, series, max_points)
+        conn = self._conn()
+        if res == 0:
+            return conn.execute(
+                "SELECT ts, power, power, power, cost FROM samples WHERE ts BETWEEN ? AND ? ORDER BY ts",
+                (start, end)).fetchall()
+        return conn.execute(
+            "SELECT bucket, sum / n, min, max, cost FROM rollups "
+            "WHERE res = ? AND series = ? AND bucket BETWEEN ? AND ? ORDER BY bucket",
+            (res, series, int(start // res) * res, end)).fetchall()
+
+    def iter_range(self, start: float, end: float, series: str, res: int,
+                   chunk_size: int = 5000) -> Iterable[List[Tuple]]:
+        """Порціями по chunk_size рядків (для експорту без завантаження всього в пам'ять)."""
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            if res == 0:
+                cur = conn.execute(
+                    "SELECT ts, power, power, power, cost FROM samples WHERE ts BETWEEN ? AND ? ORDER BY ts",
+                    (start, end))
+            else:
+                cur = conn.execute(
+                    "SELECT bucket, sum / n, min, max, cost FROM rollups "
+                    "WHERE res = ? AND series = ? AND bucket BETWEEN ? AND ? ORDER BY bucket",
+                    (res, series, int(start // res) * res, end))
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def count(self, start: float, end: float, series: str, res: int) -> int:
+        conn = self._conn()
+        if res == 0:
+            return conn.execute("SELECT COUNT(*) FROM samples WHERE ts BETWEEN ? AND ?",
+                                (start, end)).fetchone()[0]
+        return conn.execute(
+            "SELECT COUNT(*) FROM rollups WHERE res = ? AND series = ? AND bucket BETWEEN ? AND ?",
+            (res, series, int(start // res) * res, end)).fetchone()[0]
+
+    def chart_rows(self, period: str, now: Optional[float] = None) -> Optional[List[Tuple[float, float, float]]]:
+        """
+        Точки графіка періоду (ts, avg, грн/год) без перетворення міток часу або
+        None, якщо сховище ще не покриває період. Запасне джерело, коли backend
+        недоступний; викликається з робочого потоку.
+        """
+        seconds = self.PERIOD_SECONDS.get(period)
+        if seconds is None:
+            return None
+        now = time.time() if now is None else now
+        start = now - seconds
+
+        conn = self._conn()
+        first = self._first_ts(conn)
+        if first is None:
+            return None
+        if first > start + self.MAX_GAP:
+            backfilled = conn.execute("SELECT 1 FROM meta WHERE key = ?", (f"backfilled:{period}",)).fetchone()
+            if not backfilled:
+                return None
+
+        rows = self.rate_rows(start, now)
+        return rows or None
+
+    def rate_rows(self, start: float, end: float, series: str = RAW_SERIES,
+                  max_points: int = MAX_POINTS) -> List[Tuple[float, float, float]]:
+        """
+        Рядки (ts, avg, cost_per_hour): вартість як швидкість у грн/год - та сама
+        одиниця, що й "cost" у /chart/history backend (а не гроші за точку, як у таблицях).
+        """
+        res = self.resolution_for(start, end, series, max_points)
+        conn = self._conn()
+        if res:
+            # Середній тариф кошика (грн/Вт·год) помножений на середню потужність
+            return conn.execute(
+                "SELECT bucket, sum / n, CASE WHEN energy_wh > 0 THEN cost * (sum / n) / energy_wh ELSE 0 END "
+                "FROM rollups WHERE res = ? AND series = ? AND bucket BETWEEN ? AND ? ORDER BY bucket",
+                (res, series, int(start // res) * res, end)).fetchall()
+
+        # Зразок зберігає гроші за інтервал від попереднього (див. _energy) - ділимо на той самий інтервал
+        prev = conn.execute("SELECT MAX(ts) FROM samples WHERE ts < ?", (start,)).fetchone()[0]
+        result = []
+        for ts, power, cost in conn.execute(
+                "SELECT ts, power, cost FROM samples WHERE ts BETWEEN ? AND ? ORDER BY ts", (start, end)):
+            dt = min(ts - prev, self.MAX_GAP) if prev is not None else self.SAMPLE_INTERVAL
+            prev = ts
+            result.append((ts, power, cost * 3600.0 / dt if dt > 0 else 0.0))
+        return result
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        with self._write_lock:
+            if self._write_conn is not None:
+                self._write_conn.close()
+                self._write_conn = None
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """'2024-05-01T12:00:00Z' -> секунди epoch (UTC)."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value)[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+def format_timestamp(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
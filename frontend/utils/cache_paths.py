@@ -0,0 +1,16 @@
+import os
+from PyQt5.QtCore import QStandardPaths
+
+
+def cache_dir() -> str:
+    """Return (and create) the local cache directory, e.g. ~/.cache/SmartHome/EnergyManager."""
+    base = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+    path = os.path.join(base, 'SmartHome', 'EnergyManager')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_file(name: str) -> str:
+    return os.path.join(cache_dir(), name)
@@ -0,0 +1,148 @@
+"""
+Кешоване малювання карток пристроїв: тінь рендериться один раз на
+(тема, розмиття, радіус) і малюється як nine-patch, фон картки - один раз на
+(тема, розмір, hover). Кадр картки - кілька drawPixmap замість
+QGraphicsDropShadowEffect, який щоразу розмиває всю картку поза екраном.
+"""
+from collections import OrderedDict
+from typing import Tuple
+
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QPainter, QPixmap, QColor, QPen
+
+from frontend.theme import CARD_CHROME
+
+# Відступ навколо картки, у якому малюється тінь
+SHADOW_MARGIN = 12
+SHADOW_BLUR_REST = 6
+SHADOW_BLUR_HOVER = 12
+
+_CHROME_CACHE_SIZE = 64
+
+_shadow_cache: "OrderedDict[Tuple, QPixmap]" = OrderedDict()
+_chrome_cache: "OrderedDict[Tuple, QPixmap]" = OrderedDict()
+
+
+def _lru_get(cache: OrderedDict, key, limit: int, factory):
+    pm = cache.get(key)
+    if pm is not None:
+        cache.move_to_end(key)
+        return pm
+    pm = factory()
+    cache[key] = pm
+    if len(cache) > limit:
+        cache.popitem(last=False)
+    return pm
+
+
+def _chrome(theme: str) -> dict:
+    return CARD_CHROME.get(theme, CARD_CHROME['light'])
+
+
+def _render_shadow_source(blur: int, radius: int, color: QColor, dpr: float) -> QPixmap:
+    """Квадрат (2c+1) з розмитим заокругленим прямокутником; c = blur + radius."""
+    c = blur + radius
+    size = 2 * c + 1
+    pm = QPixmap(int(size * dpr), int(size * dpr))
+    pm.setDevicePixelRatio(dpr)
+    pm.fill(Qt.transparent)
+
+    painter = QPainter(pm)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(Qt.NoPen)
+    steps = max(1, blur)
+    # Шари від зовнішнього до внутрішнього з наростаючою прозорістю - наближення гаусового розмиття
+    for i in range(steps):
+        t = (i + 1) / steps
+        layer = QColor(color)
+        layer.setAlpha(max(1, min(255, int(color.alpha() * 2 * t / steps))))
+        painter.setBrush(layer)
+        r = radius + blur - i
+        painter.drawRoundedRect(QRectF(i, i, size - 2 * i, size - 2 * i), r, r)
+    painter.end()
+    return pm
+
+
+def shadow_pixmap(theme: str, blur: int, dpr: float) -> QPixmap:
+    chrome = _chrome(theme)
+    key = (theme, blur, chrome['radius'], dpr)
+    return _lru_get(_shadow_cache, key, 16,
+                    lambda: _render_shadow_source(blur, chrome['radius'], QColor(chrome['shadow']), dpr))
+
+
+def draw_nine_patch(painter: QPainter, target: QRectF, source: QPixmap, corner: int):
+    dpr = source.devicePixelRatio()
+    c = corner
+    L, T, W, H = target.left(), target.top(), target.width(), target.height()
+    cw = min(c, W / 2.0)
+    ch = min(c, H / 2.0)
+    R, B = L + W, T + H
+
+    def src(x, y, w, h):
+        return QRectF(x * dpr, y * dpr, w * dpr, h * dpr)
+
+    pieces = (
+        (QRectF(L, T, cw, ch), src(0, 0, c, c)),
+        (QRectF(R - cw, T, cw, ch), src(c + 1, 0, c, c)),
+        (QRectF(L, B - ch, cw, ch), src(0, c + 1, c, c)),
+        (QRectF(R - cw, B - ch, cw, ch), src(c + 1, c + 1, c, c)),
+        (QRectF(L + cw, T, W - 2 * cw, ch), src(c, 0, 1, c)),
+        (QRectF(L + cw, B - ch, W - 2 * cw, ch), src(c, c + 1, 1, c)),
+        (QRectF(L, T + ch, cw, H - 2 * ch), src(0, c, c, 1)),
+        (QRectF(R - cw, T + ch, cw, H - 2 * ch), src(c + 1, c, c, 1)),
+        (QRectF(L + cw, T + ch, W - 2 * cw, H - 2 * ch), src(c, c, 1, 1)),
+    )
+    for dst, s in pieces:
+        if dst.width() > 0 and dst.height() > 0:
+            painter.drawPixmap(dst, source, s)
+
+
+def _render_chrome(theme: str, width: int, height: int, hovered: bool, dpr: float) -> QPixmap:
+    chrome = _chrome(theme)
+    pm = QPixmap(int(width * dpr), int(height * dpr))
+    pm.setDevicePixelRatio(dpr)
+    pm.fill(Qt.transparent)
+
+    painter = QPainter(pm)
+    painter.setRenderHint(QPainter.Antialiasing)
+    bw = chrome['border_width']
+    painter.setPen(QPen(QColor(chrome['border_hover' if hovered else 'border']), bw))
+    painter.setBrush(QColor(chrome['background_hover' if hovered else 'background']))
+    half = bw / 2.0
+    painter.drawRoundedRect(QRectF(half, half, width - bw, height - bw), chrome['radius'], chrome['radius'])
+    painter.end()
+    return pm
+
+
+def chrome_pixmap(theme: str, width: int, height: int, hovered: bool, dpr: float) -> QPixmap:
+    key = (theme, width, height, hovered, dpr)
+    return _lru_get(_chrome_cache, key, _CHROME_CACHE_SIZE,
+                    lambda: _render_chrome(theme, width, height, hovered, dpr))
+
+
+def paint_card(painter: QPainter, widget_rect, theme: str, hover: float, dpr: float):
+    """
+    Малює тінь і фон картки. hover у [0, 1] змішує стан спокою і наведення
+    через прозорість двох кешованих варіантів - вартість не залежить від розмиття.
+    """
+    card = QRectF(widget_rect).adjusted(SHADOW_MARGIN, SHADOW_MARGIN, -SHADOW_MARGIN, -SHADOW_MARGIN)
+    if card.width() <= 0 or card.height() <= 0:
+        return
+
+    radius = _chrome(theme)['radius']
+    hover = max(0.0, min(1.0, hover))
+    for blur, opacity in ((SHADOW_BLUR_REST, 1.0 - hover), (SHADOW_BLUR_HOVER, hover)):
+        if opacity <= 0.0:
+            continue
+        offset = max(1.5, blur / 4.0)
+        target = card.adjusted(-blur, -blur, blur, blur).translated(0, offset)
+        painter.setOpacity(opacity)
+        draw_nine_patch(painter, target, shadow_pixmap(theme, blur, dpr), blur + radius)
+
+    w, h = int(card.width()), int(card.height())
+    painter.setOpacity(1.0)
+    painter.drawPixmap(card.topLeft(), chrome_pixmap(theme, w, h, False, dpr))
+    if hover > 0.0:
+        painter.setOpacity(hover)
+        painter.drawPixmap(card.topLeft(), chrome_pixmap(theme, w, h, True, dpr))
+    painter.setOpacity(1.0)
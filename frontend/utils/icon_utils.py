@@ -1,50 +1,254 @@
+import json
 import os
-from PyQt5.QtGui import QIcon, QPixmap
-from PyQt5.QtCore import Qt
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from PyQt5.QtGui import QIcon, QPixmap, QPainter
+from PyQt5.QtCore import Qt, QRect
 
 
 RESOURCE_DIR = os.path.join(os.path.dirname(__file__), '..', 'resources', 'icons')
+_RESOURCE_PREFIXES = (":/icons/", ":/resources/icons/", ":/frontend/resources/icons/")
+
+# Розміри, які програма реально використовує - вони потрапляють в атлас
+ATLAS_SIZES = (16, 20, 24, 32, 36)
+ATLAS_STATES = ('normal', 'off')
+ATLAS_FORMAT_VERSION = 1
+PIXMAP_CACHE_SIZE = 256
+
+# Прозорість іконки вимкненого пристрою для кожної теми
+_OFF_OPACITY = {'light': 0.45, 'dark': 0.35}
+
+_DEVICE_ICONS = {
+    'LIGHT': 'light.svg',
+    'CLIMATE': 'climate.svg',
+    'SMART_PLUG': 'plug.svg',
+}
+
+# (name, size, state, theme, dpr) -> QPixmap
+_pixmap_cache: "OrderedDict[Tuple, QPixmap]" = OrderedDict()
+_icon_cache: Dict[str, QIcon] = {}
+_atlas_loaded = set()
 
 
 def _fs_path(name: str) -> str:
     return os.path.join(RESOURCE_DIR, name)
 
 
+def _current_theme() -> str:
+    try:
+        from frontend.theme import current_theme
+        return current_theme()
+    except Exception:
+        return 'light'
+
+
+def _current_dpr() -> float:
+    try:
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance()
+        return float(app.devicePixelRatio()) if app else 1.0
+    except Exception:
+        return 1.0
+
+
 def get_icon(name: str) -> QIcon:
     """Return a QIcon preferring a file in `frontend/resources/icons/`, otherwise try Qt resource paths."""
+    cached = _icon_cache.get(name)
+    if cached is not None:
+        return cached
+
+    icon = QIcon()
     # try filesystem first for easier local iteration
     fs = _fs_path(name)
     if os.path.exists(fs):
-        return QIcon(fs)
-
-    # try common resource prefixes used in this project
-    for prefix in (":/icons/", ":/resources/icons/", ":/frontend/resources/icons/"):
-        qpath = prefix + name
-        ic = QIcon(qpath)
-        if not ic.isNull():
-            return ic
+        icon = QIcon(fs)
+    else:
+        # try common resource prefixes used in this project
+        for prefix in _RESOURCE_PREFIXES:
+            ic = QIcon(prefix + name)
+            if not ic.isNull():
+                icon = ic
+                break
 
-    # fallback empty
-    return QIcon()
+    _icon_cache[name] = icon
+    return icon
 
 
-def get_pixmap(name: str, size: int = None) -> QPixmap:
-    """Return a QPixmap from filesystem or resources. If size provided, scale preserving aspect."""
+def _load_source(name: str) -> QPixmap:
     fs = _fs_path(name)
-    pm = QPixmap()
     if os.path.exists(fs):
-        pm = QPixmap(fs)
-    else:
-        # try resource paths
-        for prefix in (":/icons/", ":/resources/icons/", ":/frontend/resources/icons/"):
-            qpath = prefix + name
-            pm = QPixmap(qpath)
-            if not pm.isNull():
-                break
+        return QPixmap(fs)
+    for prefix in _RESOURCE_PREFIXES:
+        pm = QPixmap(prefix + name)
+        if not pm.isNull():
+            return pm
+    return QPixmap()
+
+
+def _render(source: QPixmap, size: int, state: str, theme: str, dpr: float) -> QPixmap:
+    """Растеризує іконку у фізичних пікселях (size * dpr) з урахуванням стану."""
+    px = max(1, int(round(size * dpr)))
+    scaled = source.scaled(px, px, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    if state == 'off':
+        dimmed = QPixmap(scaled.size())
+        dimmed.fill(Qt.transparent)
+        painter = QPainter(dimmed)
+        painter.setOpacity(_OFF_OPACITY.get(theme, 0.45))
+        painter.drawPixmap(0, 0, scaled)
+        painter.end()
+        scaled = dimmed
+    scaled.setDevicePixelRatio(dpr)
+    return scaled
+
+
+def _remember(key: Tuple, pm: QPixmap):
+    _pixmap_cache[key] = pm
+    _pixmap_cache.move_to_end(key)
+    while len(_pixmap_cache) > PIXMAP_CACHE_SIZE:
+        _pixmap_cache.popitem(last=False)
+
+
+def _icon_names():
+    try:
+        return sorted(n for n in os.listdir(RESOURCE_DIR) if n.endswith('.svg'))
+    except OSError:
+        return []
 
-    if pm.isNull():
-        return QPixmap()
 
-    if size is not None:
-        return pm.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+def _atlas_signature(names) -> str:
+    parts = [str(ATLAS_FORMAT_VERSION), ",".join(map(str, ATLAS_SIZES))]
+    for n in names:
+        try:
+            st = os.stat(_fs_path(n))
+            parts.append(f"{n}:{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            parts.append(n)
+    return "|".join(parts)
+
+
+def _atlas_paths(theme: str, dpr: float) -> Tuple[str, str]:
+    from frontend.utils.cache_paths import cache_file
+    stem = f"icon_atlas_{theme}_{dpr:g}x"
+    return cache_file(stem + ".png"), cache_file(stem + ".json")
+
+
+def _build_atlas(names, theme: str, dpr: float, png_path: str, index_path: str, signature: str):
+    """Растеризує всі іконки в усіх розмірах/станах в одне PNG + JSON-індекс."""
+    cell = int(round(max(ATLAS_SIZES) * dpr))
+    entries = [(n, s, st) for n in names for s in ATLAS_SIZES for st in ATLAS_STATES]
+    if not entries:
+        return
+    columns = len(ATLAS_SIZES) * len(ATLAS_STATES)
+    rows = -(-len(entries) // columns)
+
+    atlas = QPixmap(columns * cell, rows * cell)
+    atlas.fill(Qt.transparent)
+    painter = QPainter(atlas)
+    index = {}
+    sources = {}
+    for i, (name, size, state) in enumerate(entries):
+        src = sources.get(name)
+        if src is None:
+            src = sources[name] = _load_source(name)
+        if src.isNull():
+            continue
+        pm = _render(src, size, state, theme, dpr)
+        x, y = (i % columns) * cell, (i // columns) * cell
+        # Пишемо у фізичних пікселях, тому малюємо без урахування dpr
+        pm.setDevicePixelRatio(1.0)
+        painter.drawPixmap(x, y, pm)
+        index[f"{name}|{size}|{state}"] = [x, y, pm.width(), pm.height()]
+        pm.setDevicePixelRatio(dpr)
+        _remember((name, size, state, theme, dpr), pm)
+    painter.end()
+
+    try:
+        tmp_png = png_path + ".tmp.png"
+        if atlas.save(tmp_png, "PNG"):
+            os.replace(tmp_png, png_path)
+            tmp_index = index_path + ".tmp"
+            with open(tmp_index, 'w', encoding='utf-8') as f:
+                json.dump({"signature": signature, "entries": index}, f, separators=(',', ':'))
+            os.replace(tmp_index, index_path)
+    except Exception as e:
+        print(f"Error saving icon atlas: {e}")
+
+
+def warm_icon_cache(theme: Optional[str] = None, dpr: Optional[float] = None):
+    """
+    Заповнює кеш pixmap з атласу на диску (одне PNG замість розбору кожного SVG).
+    Якщо атласу немає або іконки змінились - атлас перебудовується.
+    """
+    theme = theme or _current_theme()
+    dpr = dpr or _current_dpr()
+    if (theme, dpr) in _atlas_loaded:
+        return
+    _atlas_loaded.add((theme, dpr))
+
+    names = _icon_names()
+    signature = _atlas_signature(names)
+    try:
+        png_path, index_path = _atlas_paths(theme, dpr)
+    except Exception as e:
+        print(f"Icon atlas unavailable: {e}")
+        return
+
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get("signature") == signature:
+            atlas = QPixmap(png_path)
+            if not atlas.isNull():
+                for key, (x, y, w, h) in index.get("entries", {}).items():
+                    name, size, state = key.split("|")
+                    pm = atlas.copy(QRect(x, y, w, h))
+                    pm.setDevicePixelRatio(dpr)
+                    _remember((name, int(size), state, theme, dpr), pm)
+                return
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading icon atlas: {e}")
+
+    _build_atlas(names, theme, dpr, png_path, index_path, signature)
+
+
+def get_pixmap(name: str, size: int = None, state: str = 'normal',
+               theme: Optional[str] = None, dpr: Optional[float] = None) -> QPixmap:
+    """Return a QPixmap from filesystem or resources. If size provided, scale preserving aspect."""
+    if size is None:
+        return _load_source(name)
+
+    theme = theme or _current_theme()
+    dpr = dpr or _current_dpr()
+    key = (name, size, state, theme, dpr)
+    pm = _pixmap_cache.get(key)
+    if pm is not None:
+        _pixmap_cache.move_to_end(key)
+        return pm
+
+    if (theme, dpr) not in _atlas_loaded:
+        warm_icon_cache(theme, dpr)
+        pm = _pixmap_cache.get(key)
+        if pm is not None:
+            return pm
+
+    src = _load_source(name)
+    if src.isNull():
+        return QPixmap()
+    pm = _render(src, size, state, theme, dpr)
+    _remember(key, pm)
     return pm
+
+
+def get_device_icon(device_type: str, is_on: bool = True, size: int = 32) -> QPixmap:
+    """Іконка пристрою за назвою типу (DeviceType.name); вимкнений - приглушена."""
+    name = _DEVICE_ICONS.get(str(device_type).upper(), 'device.svg')
+    return get_pixmap(name, size, 'normal' if is_on else 'off')
+
+
+def clear_icon_cache():
+    _pixmap_cache.clear()
+    _icon_cache.clear()
+    _atlas_loaded.clear()
@@ -1,123 +1,262 @@
-import requests
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import json
+import threading
+import time
+from collections import OrderedDict
+
+from frontend.disk_cache import DiskCache, MISSING
+from frontend.weather_providers import WeatherProvider, create_provider
 
 
 class WeatherClient:
-    BASE_URL = "https://api.open-meteo.com/v1/forecast"
+    # Один запит на локацію за цей час; поточна погода, погодинний і денний прогноз - з нього
+    CACHE_TTL = 10 * 60
+    FORECAST_DAYS = 7
+    # Постійний кеш (DiskCache): геокодування майже не змінюється, "не знайдено" - перевіряємо частіше
+    GEOCODE_TTL = 30 * 86400
+    GEOCODE_MISS_TTL = 86400
+    SUGGEST_COUNT = 10
+    SUGGEST_MIN_CHARS = 2
+    # Open-Meteo для 2 символів шукає лише точні збіги, тож звужувати локально можна
+    # тільки списки префіксів від 3 символів
+    SUGGEST_NARROW_MIN_CHARS = 3
+    SUGGEST_CACHE_ITEMS = 512
     
-    def __init__(self, latitude: float = 50.4501, longitude: float = 30.5234):
+    def __init__(self, latitude: float = 50.4501, longitude: float = 30.5234, disk_cache=MISSING,
+                 provider: Optional[WeatherProvider] = None):
         self.latitude = latitude
         self.longitude = longitude
-        self._cache = {}
-        self._cache_time = None
+        # Джерело даних: Open-Meteo, локальна заглушка або файл (див. frontend.weather_providers)
+        self.provider = provider or create_provider()
+        if disk_cache is MISSING:
+            try:
+                disk_cache = DiskCache()
+            except Exception as e:
+                print(f"Weather disk cache unavailable: {e}")
+                disk_cache = None
+        self._disk = disk_cache
+        # (latitude, longitude) -> повна відповідь Open-Meteo і час її отримання
+        self._cache: Dict[Tuple[float, float], Dict[str, Any]] = {}
+        self._cache_time: Dict[Tuple[float, float], float] = {}
+        self._lock = threading.Lock()
+        # нормалізований запит -> підказки (префіксний кеш у пам'яті)
+        self._suggest_cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
     
     def set_location(self, latitude: float, longitude: float):
         self.latitude = latitude
         self.longitude = longitude
-        self._cache.clear()
+
+    def _location_key(self, location: Optional[Tuple[float, float]] = None) -> Tuple[float, float]:
+        latitude, longitude = location if location is not None else (self.latitude, self.longitude)
+        return round(latitude, 4), round(longitude, 4)
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        return " ".join(query.casefold().split())
+
+    def _forecast_key(self, key: Tuple[float, float], hour: Optional[str] = None) -> str:
+        # ~1 км і поточна година: сусідні точки та повторні запуски в межах години ділять прогноз
+        hour = hour or datetime.now().strftime('%Y-%m-%dT%H')
+        return f"{self.provider.name}:forecast:{key[0]:.2f},{key[1]:.2f}:{hour}"
 
     def search_location(self, query: str) -> Optional[Dict[str, Any]]:
+        cache_key = f"{self.provider.name}:geo:{self._normalize_query(query)}"
+        if self._disk is not None:
+            cached = self._disk.get(cache_key, MISSING)
+            if cached is not MISSING:
+                return cached
+
+        result = self._search_location_remote(query)
+        if self._disk is not None and result is not MISSING:
+            self._disk.set(cache_key, result, self.GEOCODE_TTL if result else self.GEOCODE_MISS_TTL)
+        return None if result is MISSING else result
+
+    def _geocode(self, query: str, count: int) -> List[Dict[str, Any]]:
+        """Запит до геокодера; помилки мережі - винятком (щоб їх не кешувати)."""
+        return self.provider.geocode(query, count)
+
+    def _search_location_remote(self, query: str):
+        """Результат геокодування, None - не знайдено, MISSING - помилка мережі (не кешується)."""
         try:
-            params = {
-                "name": query,
-                "count": 1,
-                "language": "uk",
-                "format": "json",
-            }
-            response = requests.get(
-                "https://geocoding-api.open-meteo.com/v1/search",
-                params=params,
-                timeout=5,
-            )
-            response.raise_for_status()
-            data = response.json()
-            results = data.get("results") or []
-            if not results:
-                return None
-            first = results[0]
-            return {
-                "name": first.get("name"),
-                "country": first.get("country"),
-                "latitude": first.get("latitude"),
-                "longitude": first.get("longitude"),
-            }
+            results = self._geocode(query, 1)
         except Exception as e:
             print(f"Error searching location: {e}")
+            return MISSING
+        if not results:
             return None
-    
-    def get_current_weather(self) -> Optional[Dict[str, Any]]:
+        first = results[0]
+        return {key: first[key] for key in ("name", "country", "latitude", "longitude")}
+
+    def _cached_suggestions(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            results = self._suggest_cache.get(query)
+            if results is not None:
+                self._suggest_cache.move_to_end(query)
+                return results
+        if self._disk is not None:
+            results = self._disk.get(f"{self.provider.name}:suggest:{query}")
+            if results is not None:
+                self._remember_suggestions(query, results)
+        return results
+
+    def _remember_suggestions(self, query: str, results: List[Dict[str, Any]]):
+        with self._lock:
+            self._suggest_cache[query] = results
+            self._suggest_cache.move_to_end(query)
+            while len(self._suggest_cache) > self.SUGGEST_CACHE_ITEMS:
+                self._suggest_cache.popitem(last=False)
+
+    def suggest_locations(self, query: str, count: int = SUGGEST_COUNT) -> List[Dict[str, Any]]:
+        """
+        Підказки для введення локації. Якщо для коротшого префікса (від
+        SUGGEST_NARROW_MIN_CHARS символів) вже відомий непорожній повний список
+        (менше count результатів), звужуємо його локально - без запиту до мережі.
+        """
+        q = self._normalize_query(query)
+        if len(q) < self.SUGGEST_MIN_CHARS:
+            return []
+
+        results = self._cached_suggestions(q)
+        # Порожня відповідь на 2 символи нічого не означає для довших запитів - не довіряємо їй
+        if results is not None and (results or len(q) >= self.SUGGEST_NARROW_MIN_CHARS):
+            return results
+
+        for end in range(len(q) - 1, self.SUGGEST_NARROW_MIN_CHARS - 1, -1):
+            results = self._cached_suggestions(q[:end])
+            if results is None:
+                continue
+            if results and len(results) < count:
+                return [r for r in results if self._normalize_query(r.get("name") or "").startswith(q)]
+            break
+
         try:
-            params = {
-                "latitude": self.latitude,
-                "longitude": self.longitude,
-                "current": "temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m",
-                "hourly": "temperature_2m,weather_code",
-                "daily": "weather_code,temperature_2m_max,temperature_2m_min,precipitation_sum",
-                "timezone": "Europe/Kiev"
-            }
-            
-            response = requests.get(
-                self.BASE_URL,
-                params=params,
-                timeout=5
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            current = data.get("current", {})
-            
-            return {
-                "temperature": current.get("temperature_2m"),
-                "humidity": current.get("relative_humidity_2m"),
-                "wind_speed": current.get("wind_speed_10m"),
-                "weather_code": current.get("weather_code"),
-                "weather_description": self._get_weather_description(current.get("weather_code")),
-                "timestamp": datetime.now().isoformat(),
-            }
+            results = self._geocode(query.strip(), count)
+        except Exception as e:
+            print(f"Error suggesting locations: {e}")
+            return []
+        if results or len(q) >= self.SUGGEST_NARROW_MIN_CHARS:
+            self._remember_suggestions(q, results)
+            if self._disk is not None:
+                self._disk.set(f"{self.provider.name}:suggest:{q}", results,
+                               self.GEOCODE_TTL if results else self.GEOCODE_MISS_TTL)
+        return results
+
+    def fetch(self, force: bool = False,
+              location: Optional[Tuple[float, float]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Повна відповідь Open-Meteo для локації (за замовчуванням - поточної):
+        з кешу, якщо вона молодша за CACHE_TTL, інакше - один запит. При
+        помилці мережі повертаються останні відомі дані (якщо є).
+        """
+        key = self._location_key(location)
+        with self._lock:
+            payload = self._cache.get(key)
+            fetched_at = self._cache_time.get(key, 0.0)
+        if payload is not None and not force and time.monotonic() - fetched_at < self.CACHE_TTL:
+            return payload
+
+        disk_key = self._forecast_key(key)
+        if payload is None and not force and self._disk is not None:
+            # Після перезапуску - прогноз з диска, якщо він ще в межах TTL
+            stored = self._disk.get(disk_key)
+            if stored:
+                age = max(0.0, time.time() - stored.get("fetched_at", 0))
+                with self._lock:
+                    self._cache[key] = stored["payload"]
+                    self._cache_time[key] = time.monotonic() - age
+                return stored["payload"]
+
+        try:
+            payload = self.provider.forecast(key[0], key[1], self.FORECAST_DAYS)
         except Exception as e:
             print(f"Error fetching weather: {e}")
-            return None
+            if payload is None and self._disk is not None:
+                # Без мережі краще показати прогноз минулої години, ніж нічого
+                stored = self._disk.get(self._forecast_key(key, "latest"), allow_expired=True)
+                payload = stored.get("payload") if stored else None
+            return payload
+
+        with self._lock:
+            self._cache[key] = payload
+            self._cache_time[key] = time.monotonic()
+        if self._disk is not None:
+            stored = {"fetched_at": time.time(), "payload": payload}
+            self._disk.set(disk_key, stored, self.CACHE_TTL)
+            self._disk.set(self._forecast_key(key, "latest"), stored, self.CACHE_TTL)
+        return payload
+
+    def _current_from(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        current = payload.get("current", {})
+        return {
+            "temperature": current.get("temperature_2m"),
+            "humidity": current.get("relative_humidity_2m"),
+            "wind_speed": current.get("wind_speed_10m"),
+            "weather_code": current.get("weather_code"),
+            "weather_description": self._get_weather_description(current.get("weather_code")),
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def _forecast_from(self, payload: Dict[str, Any], days: int) -> Dict[str, Any]:
+        daily = payload.get("daily", {})
+        forecast = []
+        for i in range(min(days, len(daily.get("time", [])))):
+            forecast.append({
+                "date": daily["time"][i],
+                "temp_max": daily["temperature_2m_max"][i],
+                "temp_min": daily["temperature_2m_min"][i],
+                "weather_code": daily["weather_code"][i],
+                "weather_description": self._get_weather_description(daily["weather_code"][i]),
+                "precipitation": daily["precipitation_sum"][i],
+            })
+        return {
+            "forecast": forecast,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def _hourly_from(self, payload: Dict[str, Any], hours: int) -> Dict[str, Any]:
+        hourly = payload.get("hourly", {})
+        times = hourly.get("time", [])
+        # Погодинний ряд починається з опівночі - пропускаємо години, що вже минули
+        now = datetime.now().strftime("%Y-%m-%dT%H:00")
+        start = next((i for i, t in enumerate(times) if t >= now), len(times))
+        return {
+            "hourly": [
+                {
+                    "time": times[i],
+                    "temperature": hourly["temperature_2m"][i],
+                    "weather_code": hourly["weather_code"][i],
+                }
+                for i in range(start, min(start + hours, len(times)))
+            ],
+            "timestamp": datetime.now().isoformat(),
+        }
+    
+    def get_current_weather(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        payload = self.fetch(force)
+        return self._current_from(payload) if payload else None
     
     def get_forecast(self, days: int = 7) -> Optional[Dict[str, Any]]:
-        try:
-            params = {
-                "latitude": self.latitude,
-                "longitude": self.longitude,
-                "daily": "weather_code,temperature_2m_max,temperature_2m_min,precipitation_sum",
-                "timezone": "Europe/Kiev",
-                "forecast_days": min(days, 7)
-            }
-            
-            response = requests.get(
-                self.BASE_URL,
-                params=params,
-                timeout=5
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            daily = data.get("daily", {})
-            
-            forecast = []
-            for i in range(len(daily.get("time", []))):
-                forecast.append({
-                    "date": daily["time"][i],
-                    "temp_max": daily["temperature_2m_max"][i],
-                    "temp_min": daily["temperature_2m_min"][i],
-                    "weather_code": daily["weather_code"][i],
-                    "weather_description": self._get_weather_description(daily["weather_code"][i]),
-                    "precipitation": daily["precipitation_sum"][i],
-                })
-            
-            return {
-                "forecast": forecast,
-                "timestamp": datetime.now().isoformat(),
-            }
-        except Exception as e:
-            print(f"Error fetching forecast: {e}")
+        payload = self.fetch()
+        return self._forecast_from(payload, days) if payload else None
+
+    def get_hourly_forecast(self, hours: int = 24) -> Optional[Dict[str, Any]]:
+        payload = self.fetch()
+        return self._hourly_from(payload, hours) if payload else None
+
+    def get_weather_bundle(self, force: bool = False,
+                           location: Optional[Tuple[float, float]] = None) -> Optional[Dict[str, Any]]:
+        """Поточна погода, прогнози та рекомендації з однієї (кешованої) відповіді."""
+        payload = self.fetch(force, location)
+        if not payload:
             return None
+        weather = self._current_from(payload)
+        return {
+            "weather": weather,
+            "forecast": self._forecast_from(payload, self.FORECAST_DAYS)["forecast"],
+            "hourly": self._hourly_from(payload, 24)["hourly"],
+            "recommendations": self._recommendations_for(weather),
+        }
     
     def get_energy_recommendations(self) -> Optional[Dict[str, Any]]:
         try:
@@ -125,74 +264,78 @@ class WeatherClient:
             if not weather:
                 return None
             
-            recommendations = []
-            
-            temp = weather.get("temperature")
-            if temp is not None:
-                if temp > 25:
-                    recommendations.append({
-                        "type": "climate",
-                        "emoji": "❄️",
-                        "title": "Спека!",
-                        "message": f"Температура {temp}°C. Розгляньте кондиціонер!",
-                        "priority": "high"
-                    })
-                elif temp < 5:
-                    recommendations.append({
-                        "type": "climate",
-                        "emoji": "🔥",
-                        "title": "Холодно!",
-                        "message": f"Температура {temp}°C. Перевірте опалення!",
-                        "priority": "high"
-                    })
-            
-            humidity = weather.get("humidity")
-            if humidity is not None:
-                if humidity > 70:
-                    recommendations.append({
-                        "type": "energy",
-                        "emoji": "💨",
-                        "title": "Висока вологість",
-                        "message": f"Вологість {humidity}%. Увімкніть вентиляцію!",
-                        "priority": "medium"
-                    })
-            
-            wind = weather.get("wind_speed")
-            if wind is not None and wind > 20:
-                recommendations.append({
-                    "type": "energy",
-                    "emoji": "🌪️",
-                    "title": "Сильний вітер",
-                    "message": f"Вітер {wind} км/год. Перевірте ущільнення вікон!",
-                    "priority": "medium"
-                })
-            
-            code = weather.get("weather_code")
-            if code in [80, 81, 82]:
-                recommendations.append({
-                    "type": "energy",
-                    "emoji": "☔",
-                    "title": "Дощ",
-                    "message": "Дощова погода. Розгляньте природне освітлення!",
-                    "priority": "low"
-                })
-            elif code in [1, 2, 3]:
-                recommendations.append({
-                    "type": "energy",
-                    "emoji": "☀️",
-                    "title": "Сонячна погода",
-                    "message": "Використовуйте природне світло!",
-                    "priority": "low"
-                })
-            
             return {
-                "recommendations": recommendations,
+                "recommendations": self._recommendations_for(weather),
                 "weather": weather,
                 "timestamp": datetime.now().isoformat(),
             }
         except Exception as e:
             print(f"Error generating recommendations: {e}")
             return None
+
+    @staticmethod
+    def _recommendations_for(weather: Dict[str, Any]) -> List[Dict[str, Any]]:
+        recommendations = []
+        
+        temp = weather.get("temperature")
+        if temp is not None:
+            if temp > 25:
+                recommendations.append({
+                    "type": "climate",
+                    "emoji": "❄️",
+                    "title": "Спека!",
+                    "message": f"Температура {temp}°C. Розгляньте кондиціонер!",
+                    "priority": "high"
+                })
+            elif temp < 5:
+                recommendations.append({
+                    "type": "climate",
+                    "emoji": "🔥",
+                    "title": "Холодно!",
+                    "message": f"Температура {temp}°C. Перевірте опалення!",
+                    "priority": "high"
+                })
+        
+        humidity = weather.get("humidity")
+        if humidity is not None:
+            if humidity > 70:
+                recommendations.append({
+                    "type": "energy",
+                    "emoji": "💨",
+                    "title": "Висока вологість",
+                    "message": f"Вологість {humidity}%. Увімкніть вентиляцію!",
+                    "priority": "medium"
+                })
+        
+        wind = weather.get("wind_speed")
+        if wind is not None and wind > 20:
+            recommendations.append({
+                "type": "energy",
+                "emoji": "🌪️",
+                "title": "Сильний вітер",
+                "message": f"Вітер {wind} км/год. Перевірте ущільнення вікон!",
+                "priority": "medium"
+            })
+        
+        code = weather.get("weather_code")
+        if code in [80, 81, 82]:
+            recommendations.append({
+                "type": "energy",
+                "emoji": "☔",
+                "title": "Дощ",
+                "message": "Дощова погода. Розгляньте природне освітлення!",
+                "priority": "low"
+            })
+        elif code in [1, 2, 3]:
+            recommendations.append({
+                "type": "energy",
+                "emoji": "☀️",
+                "title": "Сонячна погода",
+                "message": "Використовуйте природне світло!",
+                "priority": "low"
+            })
+        
+        return recommendations
     
     @staticmethod
     def _get_weather_description(code: Optional[int]) -> str:
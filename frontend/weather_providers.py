@@ -0,0 +1,190 @@
+"""
+Джерела погоди для WeatherClient.
+
+Усі провайдери повертають дані у форматі Open-Meteo (current / hourly / daily),
+тож WeatherClient, кеші та рекомендації від джерела не залежать:
+
+    OpenMeteoProvider  - api.open-meteo.com або сумісний сервер за іншою адресою
+                         (наприклад, локальний frontend.weather_stub_server);
+    FileWeatherProvider - записана відповідь і список локацій з JSON-файлу.
+
+Вибір: змінна SMARTHOME_WEATHER або QSettings 'weather_provider' -
+"file:<шлях>", "http://127.0.0.1:8090" або порожньо (Open-Meteo).
+"""
+import json
+import math
+from abc import ABC, abstractmethod
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import requests
+
+FORECAST_FIELDS = {
+    "current": "temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m",
+    "hourly": "temperature_2m,weather_code",
+    "daily": "weather_code,temperature_2m_max,temperature_2m_min,precipitation_sum",
+}
+
+
+class WeatherProvider(ABC):
+    """Інтерфейс джерела погоди. name розділяє записи постійного кешу різних джерел."""
+
+    name = "base"
+
+    @abstractmethod
+    def forecast(self, latitude: float, longitude: float, days: int) -> Dict[str, Any]:
+        """Відповідь у форматі Open-Meteo /v1/forecast; помилки - винятком."""
+
+    @abstractmethod
+    def geocode(self, query: str, count: int) -> List[Dict[str, Any]]:
+        """[{name, country, admin1, latitude, longitude}]; помилки - винятком."""
+
+
+class OpenMeteoProvider(WeatherProvider):
+    FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+    GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 5):
+        # base_url - один сервер для обох API (локальна заглушка); інакше - публічні адреси
+        if base_url:
+            base_url = base_url.rstrip("/")
+            self.forecast_url = f"{base_url}/v1/forecast"
+            self.geocoding_url = f"{base_url}/v1/search"
+            self.name = f"open-meteo@{base_url.split('://')[-1]}"
+        else:
+            self.forecast_url = self.FORECAST_URL
+            self.geocoding_url = self.GEOCODING_URL
+            self.name = "open-meteo"
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def forecast(self, latitude: float, longitude: float, days: int) -> Dict[str, Any]:
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            **FORECAST_FIELDS,
+            "timezone": "Europe/Kiev",
+            "forecast_days": days,
+        }
+        response = self.session.get(self.forecast_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def geocode(self, query: str, count: int) -> List[Dict[str, Any]]:
+        params = {
+            "name": query,
+            "count": count,
+            "language": "uk",
+            "format": "json",
+        }
+        response = self.session.get(self.geocoding_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return [location_from_result(r) for r in response.json().get("results") or []]
+
+
+class FileWeatherProvider(WeatherProvider):
+    """
+    Дані з JSON-файлу: {"forecast": <відповідь Open-Meteo>, "locations": [...]}.
+    Без "forecast" прогноз генерується (synthetic_forecast) - стабільний для координат.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"file:{os.path.basename(path)}"
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self._forecast = data.get("forecast")
+        self._locations = [location_from_result(r) for r in data.get("locations", [])]
+
+    def forecast(self, latitude: float, longitude: float, days: int) -> Dict[str, Any]:
+        if self._forecast:
+            return {**self._forecast, "latitude": latitude, "longitude": longitude}
+        return synthetic_forecast(latitude, longitude, days)
+
+    def geocode(self, query: str, count: int) -> List[Dict[str, Any]]:
+        q = query.casefold().strip()
+        return [loc for loc in self._locations if (loc.get("name") or "").casefold().startswith(q)][:count]
+
+
+def location_from_result(r: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": r.get("name"),
+        "country": r.get("country"),
+        "admin1": r.get("admin1"),
+        "latitude": r.get("latitude"),
+        "longitude": r.get("longitude"),
+    }
+
+
+def synthetic_forecast(latitude: float, longitude: float, days: int = 7,
+                       now: Optional[datetime] = None, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Правдоподібний прогноз у форматі Open-Meteo без мережі: добовий хід
+    температури, сезон за широтою і відтворюваний шум (seed - від координат).
+    """
+    now = (now or datetime.now()).replace(minute=0, second=0, microsecond=0)
+    rng = random.Random(seed if seed is not None else hash((round(latitude, 2), round(longitude, 2))))
+    season = math.cos((now.timetuple().tm_yday - 200) / 365.0 * 2 * math.pi)
+    base = 12.0 + 12.0 * season - abs(latitude - 45.0) * 0.3
+    codes = (0, 1, 2, 3, 45, 61, 63, 71, 80)
+
+    start = now.replace(hour=0)
+    hourly_time, hourly_temp, hourly_code = [], [], []
+    daily = {"time": [], "weather_code": [], "temperature_2m_max": [], "temperature_2m_min": [],
+             "precipitation_sum": []}
+    for day in range(days):
+        day_shift = rng.uniform(-4, 4)
+        code = rng.choice(codes)
+        temps = []
+        for hour in range(24):
+            t = start + timedelta(days=day, hours=hour)
+            temp = base + day_shift + 5.0 * math.sin((hour - 9) / 24.0 * 2 * math.pi) + rng.uniform(-0.5, 0.5)
+            temps.append(round(temp, 1))
+            hourly_time.append(t.strftime("%Y-%m-%dT%H:%M"))
+            hourly_temp.append(round(temp, 1))
+            hourly_code.append(code)
+        daily["time"].append((start + timedelta(days=day)).strftime("%Y-%m-%d"))
+        daily["weather_code"].append(code)
+        daily["temperature_2m_max"].append(max(temps))
+        daily["temperature_2m_min"].append(min(temps))
+        daily["precipitation_sum"].append(round(rng.uniform(1, 12), 1) if code >= 61 else 0.0)
+
+    index = now.hour
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "timezone": "Europe/Kiev",
+        "current": {
+            "time": now.strftime("%Y-%m-%dT%H:%M"),
+            "temperature_2m": hourly_temp[index],
+            "relative_humidity_2m": rng.randint(35, 95),
+            "weather_code": hourly_code[index],
+            "wind_speed_10m": round(rng.uniform(0, 30), 1),
+        },
+        "hourly": {"time": hourly_time, "temperature_2m": hourly_temp, "weather_code": hourly_code},
+        "daily": daily,
+    }
+
+
+def create_provider() -> WeatherProvider:
+    value = os.environ.get("SMARTHOME_WEATHER")
+    if not value:
+        try:
+            from PyQt5.QtCore import QSettings
+            value = QSettings('SmartHome', 'EnergyManager').value('weather_provider', None)
+        except Exception:
+            value = None
+    value = (value or "").strip()
+
+    if value.startswith("file:"):
+        try:
+            return FileWeatherProvider(value[len("file:"):])
+        except Exception as e:
+            # Відсутній чи пошкоджений файл не повинен ламати віджет погоди
+            print(f"Weather file provider unavailable, using Open-Meteo: {e}")
+            return OpenMeteoProvider()
+    if value.startswith("http://") or value.startswith("https://"):
+        return OpenMeteoProvider(value)
+    return OpenMeteoProvider()
@@ -0,0 +1,116 @@
+"""
+Локальна заміна Open-Meteo для роботи й навантажувального тестування без мережі.
+
+Відповідає на /v1/forecast і /v1/search у форматі Open-Meteo: записаними
+даними з файлу (як FileWeatherProvider) або згенерованим прогнозом.
+
+    python -m frontend.weather_stub_server --port 8090 [--file recorded.json] [--latency-ms 50]
+    SMARTHOME_WEATHER=http://127.0.0.1:8090 python -m frontend.main
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from frontend.weather_providers import FileWeatherProvider, WeatherProvider, synthetic_forecast
+
+DEFAULT_LOCATIONS = [
+    {"name": "Київ", "country": "Україна", "admin1": "Київ", "latitude": 50.4501, "longitude": 30.5234},
+    {"name": "Львів", "country": "Україна", "admin1": "Львівська область", "latitude": 49.8397, "longitude": 24.0297},
+    {"name": "Одеса", "country": "Україна", "admin1": "Одеська область", "latitude": 46.4825, "longitude": 30.7233},
+    {"name": "Харків", "country": "Україна", "admin1": "Харківська область", "latitude": 49.9935, "longitude": 36.2304},
+    {"name": "Дніпро", "country": "Україна", "admin1": "Дніпропетровська область", "latitude": 48.4647, "longitude": 35.0462},
+]
+
+
+class _SyntheticProvider(WeatherProvider):
+    name = "synthetic"
+
+    def forecast(self, latitude: float, longitude: float, days: int):
+        return synthetic_forecast(latitude, longitude, days)
+
+    def geocode(self, query: str, count: int):
+        q = query.casefold().strip()
+        return [loc for loc in DEFAULT_LOCATIONS if loc["name"].casefold().startswith(q)][:count]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    provider: WeatherProvider = _SyntheticProvider()
+    latency = 0.0
+    quiet = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            if url.path == "/v1/forecast":
+                body = self.provider.forecast(float(params["latitude"]), float(params["longitude"]),
+                                              int(params.get("forecast_days", 7)))
+            elif url.path == "/v1/search":
+                body = {"results": self.provider.geocode(params.get("name", ""), int(params.get("count", 10)))}
+            else:
+                self._send(404, {"error": True, "reason": "Not found"})
+                return
+        except (KeyError, ValueError) as e:
+            self._send(400, {"error": True, "reason": str(e)})
+            return
+        self._send(200, body)
+
+    def _send(self, status: int, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, file: Optional[str] = None,
+                latency_ms: float = 0.0, quiet: bool = True) -> ThreadingHTTPServer:
+    """Сервер (port=0 - вільний порт, див. server.server_address)."""
+    handler = type("WeatherStubHandler", (_Handler,), {
+        "provider": FileWeatherProvider(file) if file else _SyntheticProvider(),
+        "latency": latency_ms / 1000.0,
+        "quiet": quiet,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def start_in_thread(**kwargs) -> Tuple[ThreadingHTTPServer, str]:
+    """Запускає сервер у фоновому потоці; повертає (server, base_url). Зупинка - server.shutdown()."""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True, name="weather-stub").start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--file", help="JSON з 'forecast' та/або 'locations' (як для FileWeatherProvider)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="штучна затримка кожної відповіді")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.file, args.latency_ms, quiet=not args.verbose)
+    print(f"Weather stub: http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
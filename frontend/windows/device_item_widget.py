@@ -1,8 +1,8 @@
 from typing import Callable, Optional
 
-from PyQt5.QtCore import Qt, QTimer, QVariantAnimation, QPropertyAnimation, QEasingCurve, QPoint
+from PyQt5.QtCore import Qt, QTimer, QPoint, QEvent
 import os
-from PyQt5.QtGui import QPixmap, QIcon
+from PyQt5.QtGui import QPixmap, QIcon, QPainter
 from PyQt5.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -14,14 +14,19 @@ from PyQt5.QtWidgets import (
     QDoubleSpinBox,
     QPushButton,
     QFrame,
-    QGraphicsDropShadowEffect,
 )
 
+from frontend.animation_manager import AnimationManager
 from frontend.models import DeviceModel, DeviceType
+from frontend.theme import current_theme
+from frontend.utils.card_renderer import SHADOW_MARGIN, paint_card
 
 
 class DeviceItemWidget(QFrame):
 
+    HOVER_DURATION_MS = 180
+    HOVER_LIFT_PX = 4
+
     def __init__(
         self,
         device: DeviceModel,
@@ -41,29 +46,12 @@ class DeviceItemWidget(QFrame):
         self.setObjectName("deviceCard")
         self.setFrameShape(QFrame.NoFrame)
 
-        try:
-            self._shadow = QGraphicsDropShadowEffect(self)
-            self._shadow.setBlurRadius(6)
-            self._shadow.setOffset(0, 3)
-            from PyQt5.QtGui import QColor
-            self._shadow.setColor(QColor(0, 0, 0, 100))
-            self.setGraphicsEffect(self._shadow)
-
-            self._shadow_anim = QVariantAnimation(self)
-            self._shadow_anim.setDuration(180)
-
-            self._shadow_anim.setStartValue(6)
-            self._shadow_anim.setEndValue(12)
-            self._shadow_anim.valueChanged.connect(self._on_shadow_value_changed)
-            try:
-                self._pos_anim = QPropertyAnimation(self, b"pos", self)
-                self._pos_anim.setDuration(180)
-                self._pos_anim.setEasingCurve(QEasingCurve.OutQuad)
-            except Exception:
-                self._pos_anim = None
-        except Exception:
-            self._shadow = None
-            self._shadow_anim = None
+        # Тінь і фон малюються з кешованих pixmap у paintEvent (frontend.utils.card_renderer)
+        self._theme = current_theme()
+        self._hover = 0.0
+        # Позиція картки без "підйому"; запам'ятовується на початку hover
+        self._rest_pos: Optional[QPoint] = None
+        self.destroyed.connect(lambda *_: AnimationManager.instance().cancel(self))
 
         self._build_ui()
         self._update_ui_from_model()
@@ -71,14 +59,15 @@ class DeviceItemWidget(QFrame):
 
     def _build_ui(self):
         layout = QVBoxLayout(self)
-        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setContentsMargins(8 + SHADOW_MARGIN, 8 + SHADOW_MARGIN,
+                                  8 + SHADOW_MARGIN, 8 + SHADOW_MARGIN)
         layout.setSpacing(6)
 
         header = QHBoxLayout()
         header.setSpacing(8)
 
         try:
-            from frontend.icon_utils import get_device_icon, get_pixmap
+            from frontend.utils.icon_utils import get_device_icon, get_pixmap
             self.icon_label = QLabel()
             self.icon_label.setFixedSize(32, 32)
             self.icon_label.setObjectName("thumbnail")
@@ -284,7 +273,7 @@ class DeviceItemWidget(QFrame):
         self.power_label.setText(f"{self._device.current_power:.0f} Вт")
         
         try:
-            from frontend.icon_utils import get_device_icon
+            from frontend.utils.icon_utils import get_device_icon
             if hasattr(self, 'icon_label'):
                 device_type = self._device.type.name
                 pix = get_device_icon(device_type, self._device.is_on, 36)
@@ -309,53 +298,50 @@ class DeviceItemWidget(QFrame):
             self.spin_load.setValue(self._device.load_power if self._device.load_power is not None else 0.0)
             self.spin_load.blockSignals(False)
 
-    def _on_shadow_value_changed(self, v):
+    def _set_hover(self, v: float):
+        self._hover = float(v)
+        if self._rest_pos is not None:
+            self.move(self._rest_pos.x(), self._rest_pos.y() - round(self.HOVER_LIFT_PX * self._hover))
+            if self._hover <= 0.0:
+                self._rest_pos = None
+        self.update()
+
+    def _animate_hover(self, target: float):
+        # Тінь і підйом - одна анімація в спільному AnimationManager
+        distance = abs(target - self._hover)
+        AnimationManager.instance().animate(
+            self, 'hover', self._hover, target,
+            int(self.HOVER_DURATION_MS * distance), self._set_hover)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
         try:
-            if not getattr(self, '_shadow', None):
-                return
-            val = float(v)
-            self._shadow.setBlurRadius(val)
-            off = max(1.5, val / 4.0)
-            self._shadow.setOffset(0, off)
-        except Exception:
-            pass
+            paint_card(painter, self.rect(), self._theme, self._hover, self.devicePixelRatioF())
+        finally:
+            painter.end()
+        super().paintEvent(event)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.StyleChange:
+            theme = current_theme()
+            if theme != self._theme:
+                self._theme = theme
+                self.update()
 
     def enterEvent(self, event):
         super().enterEvent(event)
         try:
-            if getattr(self, '_shadow_anim', None) is not None:
-                self._shadow_anim.setDirection(self._shadow_anim.Forward)
-                self._shadow_anim.start()
-            if getattr(self, '_pos_anim', None) is not None:
-                try:
-                    start = self.pos()
-                    end = QPoint(self.x(), self.y() - 4)
-                    self._pos_anim.stop()
-                    self._pos_anim.setStartValue(start)
-                    self._pos_anim.setEndValue(end)
-                    self._pos_anim.start()
-                except Exception:
-                    pass
+            if self._rest_pos is None:
+                self._rest_pos = self.pos()
+            self._animate_hover(1.0)
         except Exception:
             pass
 
     def leaveEvent(self, event):
         super().leaveEvent(event)
         try:
-            if getattr(self, '_shadow_anim', None) is not None:
-                self._shadow_anim.setDirection(self._shadow_anim.Backward)
-                self._shadow_anim.start()
-            if getattr(self, '_pos_anim', None) is not None:
-                try:
-                    end = self.pos()
-
-                    target = QPoint(self.x(), self.y() + 4)
-                    self._pos_anim.stop()
-                    self._pos_anim.setStartValue(end)
-                    self._pos_anim.setEndValue(target)
-                    self._pos_anim.start()
-                except Exception:
-                    pass
+            self._animate_hover(0.0)
         except Exception:
             pass
 
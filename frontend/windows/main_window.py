@@ -1,8 +1,8 @@
-from typing import List, Optional, Callable, Any
+from typing import List, Optional, Callable, Any, Dict
 
-from PyQt5.QtCore import Qt, QThread, QTimer
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 import threading
-import requests
+import time
 from PyQt5.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -19,40 +19,83 @@ from PyQt5.QtWidgets import (
     QMenu,
     QSplitter,
     QTabWidget,
+    QLineEdit,
 )
 import os
 from PyQt5.QtGui import QIcon
 
-from frontend.api_client import ApiSmartHomeClient, ApiError
+from frontend.api_client import ApiError
+from frontend.fleet_client import create_client
 from frontend.models import DeviceModel, RoomModel, DeviceType
 from frontend.windows.device_item_widget import DeviceItemWidget
 from frontend.windows.add_room_dialog import AddRoomDialog
 from frontend.windows.add_device_dialog import AddDeviceDialog
-from frontend.windows.statistics_window_clean import StatisticsWindow
-from frontend.windows.weather_widget import WeatherWidget
-from frontend.windows.optimization_widget import OptimizationWidget, BudgetWidget
 from frontend.api_worker import ApiWorker
+from frontend.refresh_scheduler import RefreshScheduler
+from frontend.snapshot_cache import SnapshotCache
+from frontend.pending_patches import PendingPatchQueue
+from frontend.device_index import DeviceIndex
+from frontend.theme import set_state
+from frontend.state_store import create_store, device_power
+from frontend import startup_trace
 
 
 class MainWindow(QMainWindow):
+    # Кожен успішний /stats перевірки з'єднання: (час epoch, загальна потужність Вт)
+    stats_sampled = pyqtSignal(float, float)
+    # Скільки карток показувати для результатів пошуку
+    SEARCH_RESULTS_LIMIT = 200
+    # Картки перебудовуються, коли користувач на мить зупинився, а не на кожну клавішу
+    SEARCH_DELAY_MS = 150
+
     def __init__(self):
         super().__init__()
 
-        self.client = ApiSmartHomeClient()
+        self.client = create_client()
 
+        # Спільний стан для всіх вікон: rooms/devices нижче - властивості поверх нього
+        self.store = create_store(self)
         self.rooms: List[RoomModel] = []
         self.devices: List[DeviceModel] = []
         self.current_room_id: Optional[str] = None
+        self._pending_patches = PendingPatchQueue()
+        self._device_index = DeviceIndex()
 
         self.tile_widgets: List[DeviceItemWidget] = []
         self.active_threads: List[QThread] = []
 
+        # Порядок реєстрації визначає порядок перерахунку за один кадр
+        self._refresh = RefreshScheduler(parent=self)
+        self._refresh.register('rooms_list', self._fill_rooms_list_silent)
+        self._refresh.register('total_power', self._update_total_power_label)
+        self._refresh.register('cost', self._update_cost_display)
+        self._refresh.register('optimization', self._update_optimization_widget)
+        self._refresh.register('budget', self._update_budget_widget)
+        self.store.subscribe('room_power', lambda _: self._refresh.mark_dirty('rooms_list'))
+        self.store.subscribe('total_power', lambda _: self._refresh.mark_dirty('total_power'))
+
+        # Кеш графіків (спільний зі StatisticsWindow) - period -> відповідь /chart/history
+        from frontend.chart_history_cache import ChartHistoryCache
+        self.chart_snapshot = ChartHistoryCache()
+        self._cached_weather: Optional[dict] = None
+        self._snapshot_cache = SnapshotCache()
+        # Локальна історія споживання (1 хв / 1 год / 1 доба) - графіки без запитів до backend
+        try:
+            from frontend.timeseries_store import TimeSeriesStore
+            self._history_store = TimeSeriesStore()
+        except Exception as e:
+            print(f"History store unavailable: {e}")
+            self._history_store = None
+
         self._build_ui()
+        self._restore_snapshot()
         QTimer.singleShot(100, self._load_data_initial)
         self._start_connection_timer()
         self._start_tariff_update_timer()
+        self._start_snapshot_timer()
 
     def closeEvent(self, event):
+        self._save_snapshot()
         for thread in self.active_threads[:]:  
             if thread.isRunning():
                 thread.quit()
@@ -109,9 +152,6 @@ class MainWindow(QMainWindow):
         top.addWidget(self.btn_optimize)
         top.addWidget(self.btn_stats)
 
-        from frontend.theme import apply_theme
-        apply_theme('light')
-
         top.addSpacing(12)
         top.addWidget(QLabel("Тариф:"))
 
@@ -143,7 +183,8 @@ class MainWindow(QMainWindow):
 
         self.conn_indicator = QLabel()
         self.conn_indicator.setFixedSize(14, 14)
-        self.conn_indicator.setStyleSheet("border-radius:7px; background: gray;")
+        self.conn_indicator.setObjectName("connIndicator")
+        set_state(self.conn_indicator, "unknown")
         top.addWidget(self.conn_indicator)
 
         self.conn_label = QLabel("")
@@ -174,45 +215,14 @@ class MainWindow(QMainWindow):
         
         self.tab_widget.addTab(tab_rooms, "🏠 Кімнати")
         
-        # ============ ВКЛ 2: Погода ============
-        tab_weather = QWidget()
-        weather_layout = QVBoxLayout(tab_weather)
-        weather_layout.setContentsMargins(8, 8, 8, 8)
-        weather_layout.setSpacing(6)
-        
-        self.weather_widget = WeatherWidget()
-        weather_layout.addWidget(self.weather_widget)
-        weather_layout.addStretch()
-        
-        self.tab_widget.addTab(tab_weather, "🌤️ Погода")
-        
-        # ============ ВКЛ 3: Оптимізація ============
-        tab_optimization = QWidget()
-        opt_layout = QVBoxLayout(tab_optimization)
-        opt_layout.setContentsMargins(8, 8, 8, 8)
-        opt_layout.setSpacing(6)
-        
-        self.optimization_widget = OptimizationWidget()
-        opt_layout.addWidget(self.optimization_widget)
-        opt_layout.addStretch()
-        
-        self.tab_widget.addTab(tab_optimization, "💡 Оптимізація")
-        
-        # ============ ВКЛ 4: Бюджет ============
-        tab_budget = QWidget()
-        budget_layout = QVBoxLayout(tab_budget)
-        budget_layout.setContentsMargins(8, 8, 8, 8)
-        budget_layout.setSpacing(6)
-        
-        from PyQt5.QtCore import QSettings
-        settings = QSettings('SmartHome', 'EnergyManager')
-        monthly_budget = float(settings.value('monthly_budget', 300.0))
-        
-        self.budget_widget = BudgetWidget(monthly_budget=monthly_budget)
-        budget_layout.addWidget(self.budget_widget)
-        budget_layout.addStretch()
-        
-        self.tab_widget.addTab(tab_budget, "💰 Бюджет")
+        # Решта вкладок будується при першій активації
+        self._lazy_tabs: Dict[int, tuple] = {}
+        self._weather_tab_index = self._add_lazy_tab("🌤️ Погода", self._build_weather_tab)
+        self._add_lazy_tab("💡 Оптимізація", self._build_optimization_tab)
+        self._add_lazy_tab("💰 Бюджет", self._build_budget_tab)
+        self.tab_widget.currentChanged.connect(self._ensure_tab_built)
+        # Погода потрібна для рекомендацій - підвантажуємо її після старту, коли UI вже показано
+        QTimer.singleShot(5000, lambda: self._ensure_tab_built(self._weather_tab_index))
         
         splitter.addWidget(self.tab_widget)
 
@@ -226,7 +236,26 @@ class MainWindow(QMainWindow):
         self.devices_layout.addStretch()
         self.scroll.setWidget(self.scroll_widget)
 
-        splitter.addWidget(self.scroll)
+        # Пошук по всіх пристроях (назва, кімната, тип, on/off, потужність)
+        devices_panel = QWidget()
+        devices_panel_layout = QVBoxLayout(devices_panel)
+        devices_panel_layout.setContentsMargins(0, 8, 0, 0)
+        devices_panel_layout.setSpacing(6)
+
+        self.search_input = QLineEdit()
+        self.search_input.setObjectName("deviceSearch")
+        self.search_input.setPlaceholderText("🔍 Пошук: назва, кімната, тип, on/off, >100, 100-500 Вт")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self._on_search_changed)
+        devices_panel_layout.addWidget(self.search_input)
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self._show_devices_for_current_room)
+        devices_panel_layout.addWidget(self.scroll)
+
+        splitter.addWidget(devices_panel)
 
         splitter.setSizes([500, 700])
         splitter.setStretchFactor(0, 0)
@@ -243,8 +272,97 @@ class MainWindow(QMainWindow):
         self.btn_stats.clicked.connect(self._open_stats_window)
 
 
+    def _add_lazy_tab(self, title: str, factory: Callable[[QVBoxLayout], None]) -> int:
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+        index = self.tab_widget.addTab(tab, title)
+        self._lazy_tabs[index] = (layout, factory, title)
+        return index
+
+    def _ensure_tab_built(self, index: int):
+        entry = self._lazy_tabs.pop(index, None)
+        if entry is None:
+            return
+        layout, factory, title = entry
+        with startup_trace.span(f"build tab {title}"):
+            factory(layout)
+
+    def _build_weather_tab(self, layout: QVBoxLayout):
+        from frontend.windows.weather_widget import WeatherWidget
+        self.weather_widget = WeatherWidget()
+        if self._cached_weather:
+            self.weather_widget.show_cached(self._cached_weather)
+        self.weather_widget.weather_updated.connect(lambda _: self._refresh.mark_dirty('optimization'))
+        layout.addWidget(self.weather_widget)
+        layout.addStretch()
+
+    def _build_optimization_tab(self, layout: QVBoxLayout):
+        from frontend.windows.optimization_widget import OptimizationWidget
+        self.optimization_widget = OptimizationWidget()
+        layout.addWidget(self.optimization_widget)
+        layout.addStretch()
+        self._refresh.mark_dirty('optimization')
+
+    def _build_budget_tab(self, layout: QVBoxLayout):
+        from frontend.windows.optimization_widget import BudgetWidget
+        self.budget_widget = BudgetWidget(monthly_budget=self._monthly_budget())
+        layout.addWidget(self.budget_widget)
+        layout.addStretch()
+        self._refresh.mark_dirty('budget')
+
+    def _monthly_budget(self) -> float:
+        if hasattr(self, 'budget_widget'):
+            return self.budget_widget.monthly_budget
+        from PyQt5.QtCore import QSettings
+        settings = QSettings('SmartHome', 'EnergyManager')
+        return float(settings.value('monthly_budget', 300.0))
+
+    def _restore_snapshot(self):
+        """Миттєво показує останній збережений стан; backend перевіряє його у фоні."""
+        snapshot = self._snapshot_cache.load()
+        if not snapshot:
+            return
+
+        try:
+            tariff = snapshot.get("tariff")
+            if tariff:
+                from frontend.tariff import TariffManager
+                self.tariff_manager = TariffManager.from_dict(tariff)
+
+            self.rooms = [RoomModel.from_json(r) for r in snapshot.get("rooms", [])]
+            self.devices = [DeviceModel.from_json(d) for d in snapshot.get("devices", [])]
+            self._device_index.rebuild(self.devices)
+            self.chart_snapshot.update(snapshot.get("charts") or {})
+
+            self._cached_weather = snapshot.get("weather")
+
+            self._fill_rooms_list()
+            self._show_devices_for_current_room()
+        except Exception as e:
+            print(f"Error restoring snapshot: {e}")
+
+    def _save_snapshot(self):
+        weather = getattr(self.weather_widget, '_weather_data', None) if hasattr(self, 'weather_widget') else None
+        self._snapshot_cache.save({
+            "rooms": [r.to_dict() for r in self.rooms],
+            "devices": [d.to_dict() for d in self.devices],
+            "tariff": self.tariff_manager.to_dict(),
+            "weather": weather or self._cached_weather,
+            "charts": self.chart_snapshot.to_dict(),
+        })
+
+    def _start_snapshot_timer(self):
+        self._snapshot_timer = QTimer(self)
+        self._snapshot_timer.timeout.connect(self._save_snapshot)
+        self._snapshot_timer.start(5 * 60 * 1000)
+
     def _run_api_call(
-        self, api_call: Callable[[], Any], on_success: Callable[[Any], None]
+        self,
+        api_call: Callable[[], Any],
+        on_success: Callable[[Any], None],
+        on_failure: Optional[Callable[[str], None]] = None,
     ):
         thread = QThread()
         worker = ApiWorker(api_call)
@@ -262,6 +380,8 @@ class MainWindow(QMainWindow):
 
         def on_error(error_msg: str):
             try:
+                if on_failure is not None:
+                    on_failure(error_msg)
                 QMessageBox.critical(self, "Помилка", f"Помилка API:\n{error_msg}")
             finally:
                 thread.quit()
@@ -297,7 +417,7 @@ class MainWindow(QMainWindow):
         )
 
     def _on_devices_loaded(self, devices: List[DeviceModel]):
-        self.devices = devices
+        self.devices = [self._pending_patches.rebase(d) for d in devices]
 
         room_name_by_device = {}
         for r in self.rooms:
@@ -308,30 +428,42 @@ class MainWindow(QMainWindow):
             room_name = room_name_by_device.get(dev.id, dev.room)
             dev.room = room_name
 
+        self._device_index.rebuild(self.devices)
         self._show_devices_for_current_room()
-        self._update_total_power_label()
+
+    @property
+    def rooms(self) -> List[RoomModel]:
+        return self.store.get('rooms', [])
+
+    @rooms.setter
+    def rooms(self, value: List[RoomModel]):
+        self.store.set('rooms', value)
+
+    @property
+    def devices(self) -> List[DeviceModel]:
+        return self.store.get('devices', [])
+
+    @devices.setter
+    def devices(self, value: List[DeviceModel]):
+        self.store.set('devices', value)
 
     def _device_power(self, device: DeviceModel) -> float:
-        base_power = device.load_power if device.load_power is not None else device.current_power
-        return base_power if device.is_on else 0.0
+        return device_power(device)
 
     def _fill_rooms_list(self):
         self.rooms_list.clear()
+        try:
+            from frontend.utils.icon_utils import get_icon
+            room_icon = get_icon('room.svg')
+        except Exception:
+            room_icon = None
+        room_powers = self.store.select('room_power')
         for room in self.rooms:
-            room_power = sum(
-                self._device_power(d)
-                for d in self.devices
-                if d.room == room.name
-            )
+            room_power = room_powers.get(room.name, 0.0)
             item_text = f"{room.name} ({room_power:.0f} Вт)"
             item = QListWidgetItem(item_text)
-            try:
-                base = os.path.join(os.path.dirname(__file__), '..', 'resources', 'icons')
-                icon_path = os.path.join(base, 'room.svg')
-                if os.path.exists(icon_path):
-                    item.setIcon(QIcon(icon_path))
-            except Exception:
-                pass
+            if room_icon is not None and not room_icon.isNull():
+                item.setIcon(room_icon)
             item.setData(Qt.UserRole, room.id)
             self.rooms_list.addItem(item)
 
@@ -345,12 +477,9 @@ class MainWindow(QMainWindow):
         current_room_id_backup = self.current_room_id
         
         self.rooms_list.clear()
+        room_powers = self.store.select('room_power')
         for room in self.rooms:
-            room_power = sum(
-                self._device_power(d)
-                for d in self.devices
-                if d.room == room.name
-            )
+            room_power = room_powers.get(room.name, 0.0)
             item_text = f"{room.name} ({room_power:.0f} Вт)"
             item = QListWidgetItem(item_text)
             item.setData(Qt.UserRole, room.id)
@@ -367,31 +496,48 @@ class MainWindow(QMainWindow):
     def _show_devices_for_current_room(self):
         self._clear_devices()
 
-        if self.current_room_id is None:
+        query = self.search_input.text().strip() if hasattr(self, 'search_input') else ""
+        if query:
+            filtered_devices = self._device_index.query(query, limit=self.SEARCH_RESULTS_LIMIT)
+        elif self.current_room_id is None:
             return
-
-        filtered_devices = [
-            d for d in self.devices if d.room == self._get_room_name_by_id(self.current_room_id)
-        ]
+        else:
+            filtered_devices = [
+                d for d in self.devices if d.room == self._get_room_name_by_id(self.current_room_id)
+            ]
 
         for dev in filtered_devices:
             tile = DeviceItemWidget(dev, self._on_device_widget_changed, on_delete=self._on_delete_device)
             self.tile_widgets.append(tile)
             self.devices_layout.insertWidget(self.devices_layout.count() - 1, tile)
 
-        self._update_total_power_label()
+        self._refresh.mark_dirty('total_power')
 
     def _on_room_selected(self, item: QListWidgetItem):
         if not item:
             return
 
         room_id = item.data(Qt.UserRole)
-        if room_id == self.current_room_id:
+        if room_id == self.current_room_id and not self.search_input.text():
             return
 
         self.current_room_id = room_id
+        if self.search_input.text():
+            # Вибір кімнати скидає пошук
+            self.search_input.blockSignals(True)
+            self.search_input.clear()
+            self.search_input.blockSignals(False)
+            self._search_timer.stop()
         self._show_devices_for_current_room()
 
+    def _on_search_changed(self, text: str):
+        if not text.strip():
+            # Очищення пошуку - одразу повертаємо кімнату
+            self._search_timer.stop()
+            self._show_devices_for_current_room()
+            return
+        self._search_timer.start()
+
     def _on_rooms_context_menu(self, pos):
         item = self.rooms_list.itemAt(pos)
         if not item:
@@ -414,6 +560,7 @@ class MainWindow(QMainWindow):
         def on_success(resp: dict):
             self.rooms = [r for r in self.rooms if r.id != room_id]
             self.devices = [d for d in self.devices if d.room != self._get_room_name_by_id(room_id)]
+            self._device_index.rebuild(self.devices)
             self.current_room_id = None
             self._fill_rooms_list()
             self._show_devices_for_current_room()
@@ -423,9 +570,10 @@ class MainWindow(QMainWindow):
     def _on_delete_device(self, device_id: str):
         def on_success(resp: dict):
             self.devices = [d for d in self.devices if d.id != device_id]
-            self._fill_rooms_list_silent()
+            self._pending_patches.forget(device_id)
+            self._device_index.remove(device_id)
             self._show_devices_for_current_room()
-            self._update_total_power_label()
+            self._refresh.mark_dirty('rooms_list', 'total_power')
 
         self._run_api_call(lambda: self.client.delete_device(device_id), on_success)
 
@@ -436,18 +584,18 @@ class MainWindow(QMainWindow):
         return None
 
     def _update_total_power_label(self):
-        total = sum(self._device_power(d) for d in self.devices)
+        total = self.store.select('total_power')
         self.total_power_label.setText(f"Загальна потужність: {total:.0f} Вт")
-        self._update_cost_display()
+        self._refresh.mark_dirty('cost')
 
     def _update_cost_display(self):
-        total_power = sum(self._device_power(d) for d in self.devices)
         price_per_kwh = self.tariff_manager.get_current_price()
         period = self.tariff_manager.get_current_period()
+        self.store.set('price_per_kwh', price_per_kwh)
         
         self.tariff_label.setText(f"Тариф: {price_per_kwh:.2f} ₴/кВт ({period})")
         
-        cost_per_hour = (total_power / 1000.0) * price_per_kwh
+        cost_per_hour = self.store.select('cost_per_hour')
         
         cost_per_day = cost_per_hour * 24
         
@@ -462,31 +610,44 @@ class MainWindow(QMainWindow):
             f"За день: {cost_per_day:.2f} ₴\n"
             f"За місяць: {cost_per_month:.2f} ₴"
         )
-        
-        # Оновлюємо Optimization widget
-        weather = getattr(self.weather_widget, '_weather_data', None) if hasattr(self, 'weather_widget') else None
+
+        # Важкі віджети перераховуються окремо, не частіше одного разу за кадр
+        self._refresh.mark_dirty('optimization', 'budget')
+
+    def _update_optimization_widget(self):
+        if not hasattr(self, 'optimization_widget'):
+            return
+
+        total_power = self.store.select('total_power')
+        price_per_kwh = self.tariff_manager.get_current_price()
+        cost_per_day = (total_power / 1000.0) * price_per_kwh * 24
+
+        weather = getattr(self.weather_widget, '_weather_data', None) if hasattr(self, 'weather_widget') else self._cached_weather
         time_of_day = self._get_time_of_day()
-        
-        if hasattr(self, 'optimization_widget'):
-            self.optimization_widget.update_data(
-                current_power=total_power,
-                daily_consumption=cost_per_day / price_per_kwh if price_per_kwh > 0 else 0,
-                weather_data=weather,
-                time_of_day=time_of_day,
-                devices=getattr(self, 'devices', None)
-            )
-        
+
+        self.optimization_widget.update_data(
+            current_power=total_power,
+            daily_consumption=cost_per_day / price_per_kwh if price_per_kwh > 0 else 0,
+            weather_data=weather,
+            time_of_day=time_of_day,
+            devices=getattr(self, 'devices', None)
+        )
+
+        level = self._calculate_tariff_level()
+        self.optimization_widget.set_optimization_level(level)
+
+    def _update_budget_widget(self):
+        if not hasattr(self, 'budget_widget'):
+            return
+
         from datetime import datetime
-        today = datetime.now()
-        if hasattr(self, 'budget_widget'):
-            self.budget_widget.update_budget_status(
-                today_cost=cost_per_day,
-                day_of_month=today.day
-            )
-        
-        if hasattr(self, 'optimization_widget'):
-            level = self._calculate_tariff_level()
-            self.optimization_widget.set_optimization_level(level)
+        total_power = self.store.select('total_power')
+        price_per_kwh = self.tariff_manager.get_current_price()
+        cost_per_day = (total_power / 1000.0) * price_per_kwh * 24
+        self.budget_widget.update_budget_status(
+            today_cost=cost_per_day,
+            day_of_month=datetime.now().day
+        )
 
 
     def _start_connection_timer(self):
@@ -497,20 +658,41 @@ class MainWindow(QMainWindow):
 
 
     def _perform_connection_check(self):
+        price_per_kwh = self.tariff_manager.get_current_price()
+
         def worker():
+            stats = None
             try:
-                self.client.get_stats()
+                stats = self.client.get_stats(price_per_kwh)
                 ok = True
             except Exception:
                 ok = False
+            sampled_at = time.time()
+            if ok and isinstance(stats, dict) and self._history_store is not None:
+                try:
+                    self._history_store.ingest_stats(sampled_at, stats, price_per_kwh)
+                except Exception as e:
+                    print(f"Error recording history sample: {e}")
+            # Для кількох будівель - стан кожного backend окремо
+            backend_errors = dict(getattr(self.client, 'last_errors', {}) or {})
 
             def update_label():
-                if ok:
-                    self.conn_indicator.setStyleSheet("border-radius:7px; background: #2ecc71;")
+                if ok and isinstance(stats, dict):
+                    self.store.set('stats', stats)
+                    self.stats_sampled.emit(sampled_at, float(stats.get('total_power', 0) or 0))
+                if ok and not backend_errors:
+                    set_state(self.conn_indicator, "connected")
                     self.conn_label.setText("OK")
+                elif ok:
+                    set_state(self.conn_indicator, "partial")
+                    self.conn_label.setText("Частково")
                 else:
-                    self.conn_indicator.setStyleSheet("border-radius:7px; background: #e74c3c;")
+                    set_state(self.conn_indicator, "disconnected")
                     self.conn_label.setText("Відсутнє")
+                if hasattr(self.client, 'clients'):
+                    self.conn_indicator.setToolTip("\n".join(
+                        f"{name}: {backend_errors.get(name, 'OK')}" for name in self.client.clients
+                    ))
 
             QTimer.singleShot(0, update_label)
 
@@ -519,7 +701,10 @@ class MainWindow(QMainWindow):
 
 
     def _open_stats_window(self):
-        self.stats_window = StatisticsWindow(self, client=self.client)
+        from frontend.windows.statistics_window_clean import StatisticsWindow
+        self.stats_window = StatisticsWindow(self, client=self.client, chart_snapshot=self.chart_snapshot,
+                                             history_store=self._history_store, store=self.store)
+        self.stats_sampled.connect(self.stats_window.append_live_sample)
         self.stats_window.show()
 
 
@@ -541,7 +726,9 @@ class MainWindow(QMainWindow):
             return
 
         def on_success(room: RoomModel):
-            self.rooms.append(room)
+            # Новий список, а не append: версія зрізу в сховищі має змінитися, інакше селектори
+            # повернуть запам'ятоване значення
+            self.rooms = self.rooms + [room]
             self._fill_rooms_list()
             for i in range(self.rooms_list.count()):
                 item = self.rooms_list.item(i)
@@ -569,7 +756,8 @@ class MainWindow(QMainWindow):
         room_id, dev_type, config = result
 
         def on_success(dev: DeviceModel):
-            self.devices.append(dev)
+            self.devices = self.devices + [dev]
+            self._device_index.add(dev)
             self._fill_rooms_list()
             self._show_devices_for_current_room()
 
@@ -584,7 +772,10 @@ class MainWindow(QMainWindow):
             self.optimization_widget.set_optimization_level(tariff)
 
         def on_success(devices: List[DeviceModel]):
-            self.devices = devices
+            # Будівля, що не відповіла (FleetClient), у результаті відсутня - її пристрої лишаються як були
+            optimized = {d.id for d in devices}
+            unchanged = [d for d in self.devices if d.id not in optimized]
+            self.devices = [self._pending_patches.rebase(d) for d in devices] + unchanged
 
             room_name_by_device = {}
             for r in self.rooms:
@@ -595,9 +786,9 @@ class MainWindow(QMainWindow):
                 room_name = room_name_by_device.get(dev.id, dev.room)
                 dev.room = room_name
 
+            self._device_index.rebuild(self.devices)
             self._show_devices_for_current_room()
             self._fill_rooms_list() 
-            self._update_total_power_label()
             
             level_names = {0: "відключено", 1: "м'яка", 2: "агресивна"}
             print(f"Оптимізація виконана (рівень: {level_names.get(tariff, tariff)})")
@@ -605,12 +796,9 @@ class MainWindow(QMainWindow):
         self._run_api_call(lambda: self.client.optimize(tariff), on_success)
     
     def _calculate_tariff_level(self) -> int:
-        if not hasattr(self, 'budget_widget'):
-            return 1
-        
         from datetime import datetime
         day_of_month = datetime.now().day
-        monthly_budget = self.budget_widget.monthly_budget
+        monthly_budget = self._monthly_budget()
         
         total_power = sum(d.current_power or 0 for d in self.devices)
         price_per_kwh, _ = self.tariff_manager.current_plan.get_current_price()
@@ -641,74 +829,50 @@ class MainWindow(QMainWindow):
         if new_device_state.load_power is not None:
             state["load_power"] = new_device_state.load_power
 
-        for i, d in enumerate(self.devices):
-            if d.id == new_device_state.id:
-                merged = {**d.__dict__, **new_device_state.__dict__}
-                if merged.get("current_power") is None:
-                    merged["current_power"] = d.current_power
-                self.devices[i] = DeviceModel(**merged)
-                local_updated = self.devices[i]
-                break
-        else:
-            local_updated = None
-
-        if local_updated is not None:
-            for tile in self.tile_widgets:
-                if tile.device.id == local_updated.id:
-                    tile.update_from_device(local_updated, preserve_user_input=True)
-                    break
+        current = next((d for d in self.devices if d.id == new_device_state.id), None)
+        if current is None:
+            return
 
-        self._fill_rooms_list_silent()
-        self._update_total_power_label()
+        # Оптимістично застосовуємо зміну одразу; відповідь сервера перебазує чергу
+        seq = self._pending_patches.push(current, state)
+        self._apply_device_view(current.id)
 
         def on_success(updated: DeviceModel):
-            preserved_values = {}
-            for tile in self.tile_widgets:
-                if tile.device.id == updated.id:
-                    if tile.device.type == DeviceType.LIGHT:
-                        if hasattr(tile, 'slider_brightness'):
-                            preserved_values['brightness'] = tile.slider_brightness.value()
-                    elif tile.device.type == DeviceType.CLIMATE:
-                        if hasattr(tile, 'spin_temp'):
-                            preserved_values['target_temperature'] = tile.spin_temp.value()
-                    elif tile.device.type == DeviceType.SMART_PLUG:
-                        if hasattr(tile, 'spin_load'):
-                            preserved_values['load_power'] = tile.spin_load.value()
-                    break
-            
-            for i, d in enumerate(self.devices):
-                if d.id == updated.id:
-                    updated_copy = DeviceModel(**updated.__dict__)
-                    if 'brightness' in preserved_values:
-                        updated_copy.brightness = preserved_values['brightness']
-                    elif updated.brightness is not None:
-                        updated_copy.brightness = updated.brightness
-                    
-                    if 'target_temperature' in preserved_values:
-                        updated_copy.target_temperature = preserved_values['target_temperature']
-                    elif updated.target_temperature is not None:
-                        updated_copy.target_temperature = updated.target_temperature
-                    
-                    if 'load_power' in preserved_values:
-                        updated_copy.load_power = preserved_values['load_power']
-                    elif updated.load_power is not None:
-                        updated_copy.load_power = updated.load_power
-                    
-                    self.devices[i] = updated_copy
-                    break
-
-            for tile in self.tile_widgets:
-                if tile.device.id == updated.id:
-                    tile.update_from_device(updated, preserve_user_input=True)
-                    break
+            self._pending_patches.confirm(seq, updated)
+            self._apply_device_view(updated.id)
 
-            self._fill_rooms_list_silent()
-            self._update_total_power_label()
+        def on_failure(error_msg: str):
+            self._pending_patches.reject(current.id, seq)
+            self._apply_device_view(current.id, rolled_back=True)
 
         self._run_api_call(
-            lambda: self.client.update_device(new_device_state.id, state), on_success
+            lambda: self.client.update_device(new_device_state.id, state), on_success, on_failure
         )
 
+    def _apply_device_view(self, device_id: str, rolled_back: bool = False):
+        """Показує актуальний стан пристрою: серверна версія + очікувані локальні патчі."""
+        view = self._pending_patches.view(device_id)
+        if view is None:
+            return
+
+        for i, d in enumerate(self.devices):
+            if d.id == device_id:
+                if not view.room:
+                    view.room = d.room
+                self.devices[i] = view
+                self.store.touch('devices')
+                self._device_index.update(view)
+                break
+        else:
+            return
+
+        for tile in self.tile_widgets:
+            if tile.device.id == device_id:
+                tile.update_from_device(view, preserve_user_input=not rolled_back)
+                break
+
+        self._refresh.mark_dirty('rooms_list', 'total_power')
+
     def _on_tariff_config(self):
         """Відкрити діалог налаштування тарифів."""
         try:
@@ -4,12 +4,57 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QColor
 from frontend.optimization import OptimizationEngine, OptimizationLevel
-from frontend.theme import current_theme
+from frontend.theme import current_theme, set_state
+from frontend.refresh_scheduler import RefreshScheduler
 from collections import Counter
 
 
+class _RecommendationItem(QFrame):
+    """Елемент поради; колір за пріоритетом задає тема (властивість priority)."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("tipItem")
+
+        layout = QVBoxLayout(self)
+        layout.setSpacing(4)
+        layout.setContentsMargins(8, 6, 8, 6)
+
+        self.title = QLabel()
+        self.title.setObjectName("tipTitle")
+        self.title.setFont(QFont("Segoe UI", 10, QFont.Bold))
+        layout.addWidget(self.title)
+
+        self.description = QLabel()
+        self.description.setObjectName("tipDescription")
+        self.description.setWordWrap(True)
+        self.description.setFont(QFont("Segoe UI", 9))
+        layout.addWidget(self.description)
+
+        self.action = QLabel()
+        self.action.setObjectName("tipAction")
+        self.action.setFont(QFont("Segoe UI", 9, QFont.Bold))
+        layout.addWidget(self.action)
+
+        self.impact = QLabel()
+        self.impact.setObjectName("tipImpact")
+        self.impact.setFont(QFont("Segoe UI", 8))
+        layout.addWidget(self.impact)
+
+    def bind(self, tip):
+        priority = tip.priority if tip.priority in ("high", "medium") else "low"
+        set_state(self, priority, 'priority')
+        set_state(self.action, priority, 'priority')
+        self.title.setText(f"{tip.title} ({tip.estimated_savings:.1f} ₴/день)")
+        self.description.setText(tip.description)
+        self.action.setText(f"→ {tip.action}")
+        self.impact.setText(f"💰 {tip.impact}")
+
+
 class OptimizationWidget(QWidget):
-    
+
+    MAX_VISIBLE_TIPS = 5
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.engine = OptimizationEngine(OptimizationLevel.BALANCED)
@@ -18,6 +63,8 @@ class OptimizationWidget(QWidget):
         self.weather_data = None
         self.optimization_level = 1
         self._theme = current_theme()
+        self._refresh = RefreshScheduler(parent=self)
+        self._refresh.register('analysis', self._update_analysis)
         self._init_ui()
     
     def _init_ui(self):
@@ -34,65 +81,67 @@ class OptimizationWidget(QWidget):
         
         self.level_label = QLabel("Рівень: --")
         self.level_label.setFont(QFont("Segoe UI", 9))
-        self.level_label.setStyleSheet("color: #64748b;")
+        self.level_label.setObjectName("optLevel")
         header_layout.addWidget(self.level_label)
         
         self.score_label = QLabel("Оцінка: --")
         self.score_label.setFont(QFont("Segoe UI", 10, QFont.Bold))
-        self.score_label.setStyleSheet("color: #3b82f6;")
+        self.score_label.setObjectName("optScore")
         header_layout.addWidget(self.score_label)
         
         header_layout.addStretch()
         
         layout.addLayout(header_layout)
         
+        # Кольори станів - у frontend/theme.py (get_state_qss), тут лише перемикаємо властивість
         self.score_bar = QProgressBar()
-        self.score_bar.setStyleSheet("""
-            QProgressBar {
-                border: 1px solid #cbd5e1;
-                border-radius: 6px;
-                height: 20px;
-                text-align: center;
-                font-weight: bold;
-                font-size: 11px;
-            }
-            QProgressBar::chunk {
-                background-color: #10b981;
-                border-radius: 5px;
-            }
-        """)
+        self.score_bar.setObjectName("scoreBar")
+        set_state(self.score_bar, "ok")
         self.score_bar.setValue(50)
         layout.addWidget(self.score_bar)
         
         self.savings_label = QLabel("Потенційна економія: -- ₴/день")
         self.savings_label.setFont(QFont("Segoe UI", 10, QFont.Bold))
-        self.savings_label.setStyleSheet("color: #059669;")
+        self.savings_label.setObjectName("optSavings")
         layout.addWidget(self.savings_label)
         
-        is_dark = self._theme == 'dark'
         scroll = QScrollArea()
+        scroll.setObjectName("recommendationsArea")
         scroll.setWidgetResizable(True)
         scroll.setMinimumHeight(250)
-        scroll.setStyleSheet(f"""
-            QScrollArea {{
-                border: 1px solid {'#334155' if is_dark else '#cbd5e1'};
-                background-color: {'#0f172a' if is_dark else '#f9fafb'};
-                border-radius: 6px;
-            }}
-        """)
         
         self.recommendations_container = QWidget()
         self.recommendations_layout = QVBoxLayout(self.recommendations_container)
         self.recommendations_layout.setSpacing(6)
         self.recommendations_layout.setContentsMargins(8, 8, 8, 8)
         
+        # Фіксований пул елементів: перевикористовуються для нових порад замість створення QFrame
+        self._tips_signature = None
+        self._tip_items = []
+        for _ in range(self.MAX_VISIBLE_TIPS):
+            item = _RecommendationItem()
+            item.hide()
+            self._tip_items.append(item)
+            self.recommendations_layout.addWidget(item)
+
+        self._no_tips_label = QLabel("✅ Оптимально! Немає рекомендацій.")
+        self._no_tips_label.setObjectName("optNoTips")
+        self._no_tips_label.hide()
+        self.recommendations_layout.addWidget(self._no_tips_label)
+
+        self._more_tips_label = QLabel()
+        self._more_tips_label.setObjectName("optMoreTips")
+        self._more_tips_label.hide()
+        self.recommendations_layout.addWidget(self._more_tips_label)
+        self.recommendations_layout.addStretch()
+
         scroll.setWidget(self.recommendations_container)
         layout.addWidget(scroll)
         
         layout.addStretch()
         
         self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self._update_analysis)
+        self.update_timer.timeout.connect(lambda: self._refresh.mark_dirty('analysis'))
         self.update_timer.start(60 * 1000) 
     
     def update_data(self, current_power: float, daily_consumption: float, 
@@ -104,18 +153,23 @@ class OptimizationWidget(QWidget):
         self.time_of_day = time_of_day
         self.device_mix = Counter([getattr(d, 'type', None) for d in devices]) if devices else None
         self.engine.update_power_sample(current_power)
-        self._update_analysis()
+        self._refresh.mark_dirty('analysis')
     
     def set_optimization_level(self, level: int):
-        self.optimization_level = level
+        """Рівень тарифної оптимізації (0 - вимкнено, 1 - м'яка, 2 - агресивна): підпис, стан і рівень аналізу."""
         level_info = {
-            0: ("🟢 Відключено", "#10b981"),
-            1: ("🟡 М'яка", "#f59e0b"),
-            2: ("🔴 Агресивна", "#ef4444")
+            0: ("🟢 Відключено", "off", OptimizationLevel.MINIMAL),
+            1: ("🟡 М'яка", "soft", OptimizationLevel.BALANCED),
+            2: ("🔴 Агресивна", "aggressive", OptimizationLevel.AGGRESSIVE)
         }
-        text, color = level_info.get(level, ("--", "#64748b"))
+        text, state, engine_level = level_info.get(level, ("--", "", self.engine.level))
+        self.optimization_level = level
         self.level_label.setText(f"Рівень: {text}")
-        self.level_label.setStyleSheet(f"color: {color}; font-weight: bold;")
+        set_state(self.level_label, state)
+        # Викликається при кожному оновленні - аналіз перераховується лише при зміні рівня
+        if engine_level != self.engine.level:
+            self.engine.level = engine_level
+            self._refresh.mark_dirty('analysis')
     
     def _update_analysis(self):
         est_daily_kwh = self.daily_consumption if self.daily_consumption else self.engine.estimate_daily_kwh()
@@ -133,26 +187,12 @@ class OptimizationWidget(QWidget):
         self.score_label.setText(f"Оцінка: {score} ({grade})")
         
         if score >= 75:
-            color = "#10b981"  #
+            state = "ok"
         elif score >= 50:
-            color = "#f59e0b"  
+            state = "warn"
         else:
-            color = "#ef4444"  
-        
-        self.score_bar.setStyleSheet(f"""
-            QProgressBar {{
-                border: 1px solid #cbd5e1;
-                border-radius: 6px;
-                height: 20px;
-                text-align: center;
-                font-weight: bold;
-                font-size: 11px;
-            }}
-            QProgressBar::chunk {{
-                background-color: {color};
-                border-radius: 5px;
-            }}
-        """)
+            state = "critical"
+        set_state(self.score_bar, state)
         
         savings = self.engine.estimate_monthly_savings(tips)
         self.savings_label.setText(
@@ -160,76 +200,32 @@ class OptimizationWidget(QWidget):
             f"({savings['total']:.0f} ₴/місяць)"
         )
         
-        for i in reversed(range(self.recommendations_layout.count())):
-            self.recommendations_layout.itemAt(i).widget().setParent(None)
-        
-        if not tips:
-            no_tips = QLabel("✅ Оптимально! Немає рекомендацій.")
-            no_tips.setStyleSheet(f"color: {'#10b981' if self._theme == 'dark' else '#059669'}; font-weight: bold;")
-            self.recommendations_layout.addWidget(no_tips)
-        else:
-            for tip in tips[:5]:  
-                self._add_recommendation_item(tip)
-        
-        if len(tips) > 5:
-            more = QLabel(f"... та ще {len(tips) - 5} рекомендацій")
-            more.setStyleSheet(f"color: {'#94a3b8' if self._theme == 'dark' else '#94a3b8'}; font-style: italic;")
-            self.recommendations_layout.addWidget(more)
-    
-    def _add_recommendation_item(self, tip):
-        item = QFrame()
-        
-        # Color by priority
-        dark = self._theme == 'dark'
-        if tip.priority == "high":
-            border_color = "#ef4444"
-            bg_color = "#2f1515" if dark else "#fef2f2"
-        elif tip.priority == "medium":
-            border_color = "#f59e0b"
-            bg_color = "#2f2410" if dark else "#fffbeb"
+        self._show_tips(tips)
+
+    def _show_tips(self, tips):
+        # Аналіз повторюється щохвилини і на кожну зміну пристрою - якщо поради ті самі, нічого не чіпаємо
+        signature = tuple(
+            (t.title, t.description, round(t.estimated_savings, 1), t.priority, t.action, t.impact)
+            for t in tips[:self.MAX_VISIBLE_TIPS]
+        ) + (len(tips),)
+        if signature == self._tips_signature:
+            return
+        self._tips_signature = signature
+
+        visible = tips[:self.MAX_VISIBLE_TIPS]
+        for i, item in enumerate(self._tip_items):
+            if i < len(visible):
+                item.bind(visible[i])
+                item.show()
+            else:
+                item.hide()
+
+        self._no_tips_label.setVisible(not tips)
+        if len(tips) > self.MAX_VISIBLE_TIPS:
+            self._more_tips_label.setText(f"... та ще {len(tips) - self.MAX_VISIBLE_TIPS} рекомендацій")
+            self._more_tips_label.show()
         else:
-            border_color = "#3b82f6"
-            bg_color = "#152238" if dark else "#eff6ff"
-        
-        item.setStyleSheet(f"""
-            QFrame {{
-                background-color: {bg_color};
-                border-left: 3px solid {border_color};
-                border-radius: 4px;
-                padding: 8px;
-            }}
-        """)
-        
-        layout = QVBoxLayout(item)
-        layout.setSpacing(4)
-        layout.setContentsMargins(8, 6, 8, 6)
-        
-        title = QLabel(f"{tip.title} ({tip.estimated_savings:.1f} ₴/день)")
-        title.setFont(QFont("Segoe UI", 10, QFont.Bold))
-        title.setStyleSheet(f"color: {'#e5e7eb' if dark else '#0f172a'};")
-        layout.addWidget(title)
-        
-        desc = QLabel(tip.description)
-        desc.setWordWrap(True)
-        desc.setFont(QFont("Segoe UI", 9))
-        desc.setStyleSheet(f"color: {'#cbd5e1' if dark else '#4b5563'};")
-        layout.addWidget(desc)
-        
-        action = QLabel(f"→ {tip.action}")
-        action.setFont(QFont("Segoe UI", 9, QFont.Bold))
-        action.setStyleSheet(f"color: {border_color};")
-        layout.addWidget(action)
-        
-        impact = QLabel(f"💰 {tip.impact}")
-        impact.setFont(QFont("Segoe UI", 8))
-        impact.setStyleSheet(f"color: {'#22c55e' if dark else '#059669'};")
-        layout.addWidget(impact)
-        
-        self.recommendations_layout.addWidget(item)
-    
-    def set_optimization_level(self, level: OptimizationLevel):
-        self.engine.level = level
-        self._update_analysis()
+            self._more_tips_label.hide()
 
 
 class BudgetWidget(QWidget):
@@ -262,19 +258,7 @@ class BudgetWidget(QWidget):
         layout.addLayout(header_layout)
         
         self.budget_bar = QProgressBar()
-        self.budget_bar.setStyleSheet("""
-            QProgressBar {
-                border: 1px solid #cbd5e1;
-                border-radius: 6px;
-                height: 22px;
-                text-align: center;
-                font-weight: bold;
-            }
-            QProgressBar::chunk {
-                background-color: #3b82f6;
-                border-radius: 5px;
-            }
-        """)
+        self.budget_bar.setObjectName("budgetBar")
         layout.addWidget(self.budget_bar)
         
         self.info_label = QLabel("Оновлюю...")
@@ -284,6 +268,7 @@ class BudgetWidget(QWidget):
         
         self.daily_label = QLabel("Щоденний ліміт: --")
         self.daily_label.setFont(QFont("Segoe UI", 10, QFont.Bold))
+        self.daily_label.setObjectName("dailyLimit")
         layout.addWidget(self.daily_label)
         
         layout.addStretch()
@@ -299,29 +284,15 @@ class BudgetWidget(QWidget):
         
         # Status color
         if percentage > 110:
-            color = "#ef4444"  
+            state = "critical"
             status = "ПЕРЕВИЩЕНО!"
         elif percentage > 100:
-            color = "#f59e0b"  
+            state = "warn"
             status = "Зі перевищенням"
         else:
-            color = "#10b981" 
+            state = "ok"
             status = "В межах бюджету"
-        
-        self.budget_bar.setStyleSheet(f"""
-            QProgressBar {{
-                border: 1px solid #cbd5e1;
-                border-radius: 6px;
-                height: 22px;
-                text-align: center;
-                font-weight: bold;
-                color: {color};
-            }}
-            QProgressBar::chunk {{
-                background-color: {color};
-                border-radius: 5px;
-            }}
-        """)
+        set_state(self.budget_bar, state)
         
         days_left = 30 - day_of_month
         remaining = max(0, self.monthly_budget - projected)
@@ -336,15 +307,16 @@ class BudgetWidget(QWidget):
             daily_limit = remaining / days_left
             if daily_limit < 5:
                 self.daily_label.setText(f"⚠️ Критично! Ліміт: {daily_limit:.2f}₴/день")
-                self.daily_label.setStyleSheet("color: #ef4444; font-weight: bold;")
+                set_state(self.daily_label, "critical")
             elif daily_limit < 10:
                 self.daily_label.setText(f"⚠️ Обережно! Ліміт: {daily_limit:.2f}₴/день")
-                self.daily_label.setStyleSheet("color: #f59e0b; font-weight: bold;")
+                set_state(self.daily_label, "warn")
             else:
                 self.daily_label.setText(f"✅ OK! Ліміт: {daily_limit:.2f}₴/день")
-                self.daily_label.setStyleSheet("color: #10b981; font-weight: bold;")
+                set_state(self.daily_label, "ok")
         else:
             self.daily_label.setText("Місяць завершився!")
+            set_state(self.daily_label, "")
     
     def _on_settings_clicked(self):
         from frontend.windows.budget_dialog import BudgetDialog
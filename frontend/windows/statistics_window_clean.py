@@ -1,25 +1,38 @@
+from collections import OrderedDict
 from typing import Any, Dict, Optional
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QPushButton, QTextEdit, QMessageBox, QHBoxLayout, QToolTip
+    QWidget, QVBoxLayout, QLabel, QPushButton, QTextEdit, QMessageBox, QHBoxLayout, QComboBox
 )
 from PyQt5.QtCore import QTimer, Qt, QThread
-from PyQt5.QtGui import QCursor
+from datetime import datetime
 import threading
 import json
+import time
 
 from frontend.api_client import ApiSmartHomeClient
 from frontend.api_worker import ApiWorker
+from frontend.chart_history_cache import ChartHistoryCache
+from frontend.state_store import create_store
 
 try:
     import pyqtgraph as pg
     from pyqtgraph import PlotWidget
+    from frontend.chart_lod import ChartCrosshair, LodCurve, RingSeries, series_from_history
+    import numpy as np
     HAS_PYQTGRAPH = True
 except Exception:
     HAS_PYQTGRAPH = False
 
 
 class StatisticsWindow(QWidget):
-    def __init__(self, parent=None, client: Optional[ApiSmartHomeClient] = None):
+    # Живий режим: буфер із запасом, а на графік іде лише остання година за часом
+    LIVE_CAPACITY = 1440
+    LIVE_WINDOW_SECONDS = 3600
+    # Скільки рядів (пристрій, період) тримати в пам'яті для вкладки пристрою
+    DEVICE_HISTORY_CACHE_ITEMS = 16
+
+    def __init__(self, parent=None, client: Optional[ApiSmartHomeClient] = None,
+                 chart_snapshot: Optional[Dict[str, Any]] = None, history_store=None, store=None):
         super().__init__(parent)
         self.setWindowFlags(self.windowFlags() | Qt.Window)
         self.setWindowTitle("📈 Статистика")
@@ -33,6 +46,12 @@ class StatisticsWindow(QWidget):
         """)
 
         self.client = client or ApiSmartHomeClient()
+        # Спільний з MainWindow кеш period -> дані графіка (зберігається у знімку)
+        self._chart_snapshot = chart_snapshot if chart_snapshot is not None else ChartHistoryCache()
+        # frontend.timeseries_store.TimeSeriesStore: запасне джерело графіків без backend
+        self._history_store = history_store
+        # Спільний з MainWindow StateStore: свіжий /stats вже є в ньому, окремий запит не потрібен
+        self._store = store if store is not None else create_store(self)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -116,7 +135,7 @@ class StatisticsWindow(QWidget):
         self.plot_widget_1h = None
         if HAS_PYQTGRAPH:
             try:
-                self.plot_widget_1h = PlotWidget()
+                self.plot_widget_1h = PlotWidget(axisItems={'bottom': pg.DateAxisItem()})
                 self.plot_widget_1h.setBackground('w')
                 self.plot_widget_1h.setLabel('left', 'Power', units='W')
                 self.plot_widget_1h.setLabel('bottom', 'Time')
@@ -128,10 +147,10 @@ class StatisticsWindow(QWidget):
         self.plot_widget_24h = None
         if HAS_PYQTGRAPH:
             try:
-                self.plot_widget_24h = PlotWidget()
+                self.plot_widget_24h = PlotWidget(axisItems={'bottom': pg.DateAxisItem()})
                 self.plot_widget_24h.setBackground('w')
                 self.plot_widget_24h.setLabel('left', 'Power', units='W')
-                self.plot_widget_24h.setLabel('bottom', 'Hours')
+                self.plot_widget_24h.setLabel('bottom', 'Time')
                 self.chart_tabs.addTab(self.plot_widget_24h, "24 години")
             except Exception:
                 self.plot_widget_24h = None
@@ -140,14 +159,22 @@ class StatisticsWindow(QWidget):
         self.plot_widget_7d = None
         if HAS_PYQTGRAPH:
             try:
-                self.plot_widget_7d = PlotWidget()
+                self.plot_widget_7d = PlotWidget(axisItems={'bottom': pg.DateAxisItem()})
                 self.plot_widget_7d.setBackground('w')
                 self.plot_widget_7d.setLabel('left', 'Power', units='W')
-                self.plot_widget_7d.setLabel('bottom', 'Days')
+                self.plot_widget_7d.setLabel('bottom', 'Time')
                 self.chart_tabs.addTab(self.plot_widget_7d, "7 днів")
             except Exception:
                 self.plot_widget_7d = None
 
+        # Вкладка деталізації по пристрою: вміст створюється лише при першому відкритті
+        self.device_tab = None
+        self.device_plot = None
+        if HAS_PYQTGRAPH and (self.plot_widget_1h or self.plot_widget_24h or self.plot_widget_7d):
+            self.device_tab = QWidget()
+            self.chart_tabs.addTab(self.device_tab, "🔍 Пристрій")
+            self.chart_tabs.currentChanged.connect(self._on_chart_tab_changed)
+
         if self.plot_widget_1h or self.plot_widget_24h or self.plot_widget_7d:
             layout.addWidget(self.chart_tabs)
 
@@ -175,10 +202,17 @@ class StatisticsWindow(QWidget):
                 background: #1e40af;
             }
         """)
-        self.btn_refresh.clicked.connect(self._load_stats)
+        self.btn_refresh.clicked.connect(lambda: self._reload(force=True))
         btn_row.addWidget(self.btn_refresh)
 
-        self.btn_csv = QPushButton("📊 Експорт CSV")
+        self.btn_live = QPushButton("📡 Наживо")
+        self.btn_live.setCheckable(True)
+        self.btn_live.setToolTip("Додавати нові виміри до графіка 1 година без перезавантаження")
+        self.btn_live.setEnabled(self.plot_widget_1h is not None)
+        self.btn_live.toggled.connect(self._set_live_mode)
+        btn_row.addWidget(self.btn_live)
+
+        self.btn_csv = QPushButton("📊 Експорт")
         self.btn_csv.setStyleSheet("""
             QPushButton {
                 background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
@@ -198,7 +232,7 @@ class StatisticsWindow(QWidget):
                 background: #065f46;
             }
         """)
-        self.btn_csv.clicked.connect(self.export_csv)
+        self.btn_csv.clicked.connect(self.export_history)
         btn_row.addWidget(self.btn_csv)
         
         btn_row.addStretch()
@@ -228,44 +262,105 @@ class StatisticsWindow(QWidget):
         layout.addLayout(btn_row)
 
         self._worker_threads = []
-        self._load_stats()
-
-    def _load_stats(self):
-        self.info_label.setText("Loading statistics...")
-
+        # period -> номер запиту; відповідь старішого запиту (після "Оновити") ігнорується
+        self._chart_generation: Dict[str, int] = {}
+        # id(plot_widget) -> LodCurve: повні дані в NumPy, на екрані - лише ~ширина графіка точок
+        self._lod_curves: Dict[int, Any] = {}
+        # id(plot_widget) -> вартість кожної точки в грн/год (для підказки перехрестя)
+        self._chart_costs: Dict[int, Any] = {}
+        self._crosshairs: Dict[int, Any] = {}
+        # (кошик, [(назва, Вт)]) - найбільші споживачі для останньої точки під курсором
+        self._top_devices_cache = (None, [])
+        # Попередньо виділений кільцевий буфер живого режиму - пам'ять не росте з часом
+        self._live = False
+        self._live_series = RingSeries(self.LIVE_CAPACITY) if self.plot_widget_1h is not None else None
+        # (device_id, period) -> (час, потужність, вартість) з /chart/device_history; скидається кнопкою "Оновити"
+        self._device_history_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._device_pending = set()
+        self._render_cached_charts()
+        self._unsubscribe_stats = self._store.subscribe('stats_summary', self._render_stats)
+        self._reload(force=False)
+
+    @property
+    def _stats_data(self) -> Dict[str, Any]:
+        return self._store.get('stats') or {}
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Поки вікно було сховане, семпли лише додавались у буфер - оновлюємо криву
+        if self._live:
+            self._show_live_series()
+
+    def closeEvent(self, event):
+        self._unsubscribe_stats()
+        super().closeEvent(event)
+
+    def _chart_plots(self):
+        return (("1hour", self.plot_widget_1h),
+                ("24hours", self.plot_widget_24h),
+                ("7days", self.plot_widget_7d))
+
+    def _start_worker(self, api_call, on_success, on_error):
         thread = QThread()
-        worker = ApiWorker(lambda: self.client.get_stats())
+        worker = ApiWorker(api_call)
         worker.moveToThread(thread)
 
+        def finish():
+            thread.quit()
+            worker.deleteLater()
+            if thread in self._worker_threads:
+                self._worker_threads.remove(thread)
+
         def on_finished(result):
             try:
-                self._on_stats_loaded(result)
+                on_success(result)
             finally:
-                thread.quit()
-                worker.deleteLater()
-                if thread in self._worker_threads:
-                    self._worker_threads.remove(thread)
+                finish()
 
-        def on_error(msg: str):
+        def on_failed(msg: str):
             try:
-                QMessageBox.critical(self, "Error", f"Failed to load stats: {msg}")
-                self.info_label.setText("Failed to load statistics")
+                on_error(msg)
             finally:
-                thread.quit()
-                worker.deleteLater()
-                if thread in self._worker_threads:
-                    self._worker_threads.remove(thread)
+                finish()
 
         worker.finished.connect(on_finished)
-        worker.error.connect(on_error)
+        worker.error.connect(on_failed)
         thread.started.connect(worker.run)
         thread.start()
         self._worker_threads.append(thread)
 
+    def _reload(self, force: bool = True):
+        # Статистика і всі графіки запитуються одночасно; кожна вкладка малюється, щойно прийдуть її дані.
+        # Без force (відкриття вікна) беруться спільні дані, якщо вони є
+        if force or not self._store.has('stats'):
+            self._load_stats()
+        else:
+            self._render_stats(self._store.select('stats_summary'))
+        self._load_charts(force)
+        if force:
+            self._device_history_cache.clear()
+        if self.device_plot is not None and self.chart_tabs.currentWidget() is self.device_tab:
+            self._load_device_history()
+
+    def _load_stats(self):
+        self.info_label.setText("Loading statistics...")
+
+        def on_error(msg: str):
+            QMessageBox.critical(self, "Error", f"Failed to load stats: {msg}")
+            self.info_label.setText("Failed to load statistics")
+
+        self._start_worker(lambda: self.client.get_stats(), self._on_stats_loaded, on_error)
+
+    def _load_charts(self, force: bool = True):
+        for period, plot_widget in self._chart_plots():
+            self._load_chart_data(period, plot_widget, force)
+
     def _on_stats_loaded(self, data: Dict[str, Any]):
+        # Через сховище: оновляться всі підписані вікна, а це - в _render_stats
+        self._store.set('stats', data)
+
+    def _render_stats(self, data: Dict[str, Any]):
         try:
-            self._stats_data = data
-            
             total = data.get("total_power", 0)
             forecast = data.get("forecast_next_total", 0)
             self.info_label.setText(f"Загальна потужність: {total:.0f} Вт | Прогноз: {forecast:.0f} Вт")
@@ -275,10 +370,6 @@ class StatisticsWindow(QWidget):
             text_parts.append(f"🔮 Прогноз наступної оптимізації: {forecast:.0f} Вт")
             text_parts.append("")
             
-            self._load_chart_data("1hour", self.plot_widget_1h if self.plot_widget_1h else None)
-            self._load_chart_data("24hours", self.plot_widget_24h if self.plot_widget_24h else None)
-            self._load_chart_data("7days", self.plot_widget_7d if self.plot_widget_7d else None)
-            
             rooms = data.get("rooms", [])
             if rooms:
                 text_parts.append("🏠 Кімнати:")
@@ -299,11 +390,87 @@ class StatisticsWindow(QWidget):
                     text_parts.append("")
             
             self.text.setPlainText("\n".join(text_parts))
+            self._fill_device_selector()
         except Exception as ex:
             QMessageBox.critical(self, "Error", f"Invalid stats data: {ex}")
 
 
 
+    # Діапазони експорту: назва -> секунд від поточного моменту (None - уся історія)
+    EXPORT_RANGES = {
+        "Остання доба": 86400,
+        "7 днів": 7 * 86400,
+        "30 днів": 30 * 86400,
+        "Уся історія": None,
+    }
+
+    def export_history(self):
+        """Експорт повної історії (загальна, кімнати, пристрої) у фоновому потоці."""
+        if self._history_store is None:
+            self.export_csv()
+            return
+
+        from PyQt5.QtWidgets import QFileDialog, QInputDialog, QProgressDialog
+        from frontend.history_export import FORMATS, HistoryExportWorker, available_formats
+
+        range_name, ok = QInputDialog.getItem(self, "Експорт історії", "Період:",
+                                              list(self.EXPORT_RANGES), 1, False)
+        if not ok:
+            return
+
+        formats = available_formats()
+        path, selected = QFileDialog.getSaveFileName(
+            self, "Експорт історії", "consumption_history.csv", ";;".join(FORMATS[f] for f in formats))
+        if not path:
+            return
+        fmt = next((f for f in formats if FORMATS[f] == selected), "csv")
+        ext = ".arrow" if fmt == "arrow" else f".{fmt}"
+        if not path.lower().endswith(ext):
+            path += ext
+
+        end = time.time()
+        seconds = self.EXPORT_RANGES[range_name]
+        start = end - seconds if seconds is not None else 0.0
+
+        progress = QProgressDialog("Експорт історії...", "Скасувати", 0, 0, self)
+        progress.setWindowTitle("Експорт")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+
+        thread = QThread()
+        worker = HistoryExportWorker(self._history_store, path, fmt, start, end)
+        worker.moveToThread(thread)
+        # Лямбда, а не worker.cancel: слот об'єкта з іншого потоку чекав би його (зайнятого) циклу подій
+        progress.canceled.connect(lambda: worker.cancel())
+
+        def finish():
+            progress.reset()
+            thread.quit()
+            worker.deleteLater()
+            if thread in self._worker_threads:
+                self._worker_threads.remove(thread)
+
+        def on_progress(done: int, total: int):
+            if total > 0:
+                progress.setMaximum(total)
+                progress.setValue(min(done, total))
+
+        def on_finished(result_path: str):
+            finish()
+            QMessageBox.information(self, "Експорт", f"Історію експортовано у {result_path}")
+
+        def on_error(msg: str):
+            finish()
+            QMessageBox.critical(self, "Експорт", f"Помилка експорту: {msg}")
+
+        worker.progress.connect(on_progress)
+        worker.finished.connect(on_finished)
+        worker.error.connect(on_error)
+        worker.cancelled.connect(finish)
+        thread.started.connect(worker.run)
+        thread.start()
+        self._worker_threads.append(thread)
+
     def export_csv(self):
         if not hasattr(self, '_stats_data') or not self._stats_data:
             QMessageBox.warning(self, "Export CSV", "No statistics data available")
@@ -342,55 +509,306 @@ class StatisticsWindow(QWidget):
         except Exception as ex:
             QMessageBox.critical(self, "Export CSV", f"Failed to export CSV: {ex}")
 
-    def _load_chart_data(self, period: str, plot_widget):
+    def _render_cached_charts(self):
+        for period, plot_widget in self._chart_plots():
+            data = self._chart_snapshot.get(period)
+            if data and plot_widget:
+                self._render_chart(data, plot_widget)
+
+    def _set_chart_loading(self, plot_widget, loading: bool):
+        index = self.chart_tabs.indexOf(plot_widget)
+        if index < 0:
+            return
+        title = self.chart_tabs.tabText(index).rstrip(" ⏳")
+        self.chart_tabs.setTabText(index, f"{title} ⏳" if loading else title)
+
+    def _load_chart_data(self, period: str, plot_widget, force: bool = True):
 
         if not plot_widget or not HAS_PYQTGRAPH:
             return
 
-        try:
-            data = self.client.get_chart_history(period)
-            chart_data = data.get("data", [])
-            
-            if not chart_data:
+        generation = self._chart_generation.get(period, 0) + 1
+        self._chart_generation[period] = generation
+        self._set_chart_loading(plot_widget, True)
+
+        def on_loaded(series):
+            if self._chart_generation.get(period) != generation:
                 return
+            self._set_chart_loading(plot_widget, False)
+            if series is not None:
+                self._render_series(plot_widget, *series)
+            if self._live and plot_widget is self.plot_widget_1h:
+                self._seed_live_series()
 
-            powers = [entry.get("power", 0) for entry in chart_data]
-            
-            if not powers:
+        def on_error(msg: str):
+            if self._chart_generation.get(period) != generation:
                 return
+            # Лишаємо попередній (кешований) графік
+            self._set_chart_loading(plot_widget, False)
+            print(f"Failed to load chart {period}: {msg}")
+
+        store = self._history_store
+        cache = self._chart_snapshot
+        client = self.client
+
+        def fetch():
+            # Дані графіка належать кешу відповідей backend; розбір - у робочому потоці,
+            # у GUI приходять готові масиви
+            if not force and cache.is_recent(period):
+                # Щойно завантажено іншим вікном - вже намальовано з кешу
+                return None
+            try:
+                # Свіжий кеш дозавантажується лише новими точками (since=); "Оновити" - повністю
+                data = cache.fetch(client, period, full=force)
+            except Exception as e:
+                # Backend недоступний - показуємо локальну історію, не змішуючи її з кешем
+                rows = None
+                if store is not None:
+                    try:
+                        rows = store.chart_rows(period)
+                    except Exception as local_error:
+                        print(f"Error reading local history {period}: {local_error}")
+                if not rows:
+                    raise
+                print(f"Chart {period} unavailable, using local store: {e}")
+                return self._rows_to_series(rows)
+
+            if store is not None:
+                try:
+                    store.backfill(period, data)
+                except Exception as e:
+                    print(f"Error backfilling history {period}: {e}")
+            return self._entries_to_series(data.get("data", []))
+
+        self._start_worker(fetch, on_loaded, on_error)
+
+    @staticmethod
+    def _rows_to_series(rows):
+        """Рядки (ts, avg, грн/год) зі сховища -> (час, потужність, вартість) як масиви NumPy."""
+        arr = np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+        return arr[:, 0], arr[:, 1], arr[:, 2]
+
+    @staticmethod
+    def _entries_to_series(entries):
+        """Записи /chart/history -> (час, потужність, вартість) як масиви NumPy."""
+        times, powers = series_from_history(entries)
+        costs = np.fromiter((e.get("cost", 0) or 0 for e in entries), dtype=np.float64, count=len(entries))
+        return times, powers, costs
+
+    DEVICE_PERIODS = (("1hour", "1 година"), ("24hours", "24 години"), ("7days", "7 днів"))
+
+    def _on_chart_tab_changed(self, index: int):
+        if self.chart_tabs.widget(index) is not self.device_tab:
+            return
+        if self.device_plot is None:
+            self._build_device_tab()
+        self._load_device_history()
+
+    def _build_device_tab(self):
+        tab_layout = QVBoxLayout(self.device_tab)
+        tab_layout.setContentsMargins(0, 0, 0, 0)
+
+        selector_row = QHBoxLayout()
+        self.device_combo = QComboBox()
+        self.device_combo.setMinimumWidth(260)
+        self.device_period_combo = QComboBox()
+        for period, title in self.DEVICE_PERIODS:
+            self.device_period_combo.addItem(title, period)
+        self.device_period_combo.setCurrentIndex(1)
+        selector_row.addWidget(QLabel("Пристрій:"))
+        selector_row.addWidget(self.device_combo, 1)
+        selector_row.addWidget(self.device_period_combo)
+        tab_layout.addLayout(selector_row)
+
+        self.device_plot = PlotWidget(axisItems={'bottom': pg.DateAxisItem()})
+        self.device_plot.setBackground('w')
+        self.device_plot.setLabel('left', 'Power', units='W')
+        self.device_plot.setLabel('bottom', 'Time')
+        tab_layout.addWidget(self.device_plot)
+
+        self._fill_device_selector()
+        self.device_combo.currentIndexChanged.connect(lambda _: self._load_device_history())
+        self.device_period_combo.currentIndexChanged.connect(lambda _: self._load_device_history())
+
+    def _fill_device_selector(self):
+        if self.device_plot is None:
+            return
+        current = self.device_combo.currentData()
+        self.device_combo.blockSignals(True)
+        self.device_combo.clear()
+        for room in self._stats_data.get("rooms", []):
+            for dev in room.get("devices", []):
+                self.device_combo.addItem(f"{room.get('name', '')} / {dev.get('name', '')}", dev.get("id"))
+        index = self.device_combo.findData(current)
+        self.device_combo.setCurrentIndex(max(0, index))
+        self.device_combo.blockSignals(False)
+        if self.chart_tabs.currentWidget() is self.device_tab:
+            self._load_device_history()
+
+    def _selected_device_key(self) -> tuple:
+        return self.device_combo.currentData(), self.device_period_combo.currentData()
+
+    def _load_device_history(self):
+        if self.device_plot is None:
+            return
+        key = self._selected_device_key()
+        device_id, period = key
+        if not device_id:
+            return
 
+        cached = self._device_history_cache.get(key)
+        if cached is not None:
+            self._device_history_cache.move_to_end(key)
+            self._render_device_history(cached)
+            return
+        if key in self._device_pending:
+            return
+        self._device_pending.add(key)
+        self._set_chart_loading(self.device_tab, True)
+
+        def on_loaded(series):
+            self._device_pending.discard(key)
+            self._device_history_cache[key] = series
+            self._device_history_cache.move_to_end(key)
+            while len(self._device_history_cache) > self.DEVICE_HISTORY_CACHE_ITEMS:
+                self._device_history_cache.popitem(last=False)
+            # Поки йшов запит, могли вибрати інший пристрій - тоді лише кешуємо
+            if self._selected_device_key() == key:
+                self._set_chart_loading(self.device_tab, False)
+                self._render_device_history(series)
 
-            plot_widget.clear()
-            curve = plot_widget.plot(powers, pen=pg.mkPen(color=(59, 130, 246), width=2), name="Power (W)")
-           
+        def on_error(msg: str):
+            self._device_pending.discard(key)
+            print(f"Failed to load device history {device_id}: {msg}")
+            if self._selected_device_key() == key:
+                self._set_chart_loading(self.device_tab, False)
+
+        client = self.client
+        store = self._history_store
+
+        def fetch():
+            try:
+                data = client.get_device_history(device_id, period)
+            except Exception as e:
+                # Без backend - хвилинні агрегати пристрою з локального сховища
+                if store is None:
+                    raise
+                print(f"Device history {device_id} unavailable, using local store: {e}")
+                end = time.time()
+                start = end - store.PERIOD_SECONDS.get(period, 86400)
+                rows = store.query(start, end, f"device:{device_id}")
+                return self._rows_to_series([(ts, avg, cost) for ts, avg, _, _, cost in rows])
+            return self._entries_to_series(data.get("data", []))
+
+        self._start_worker(fetch, on_loaded, on_error)
+
+    def _render_device_history(self, series):
+        if not len(series[0]):
+            self._curve_for(self.device_plot).set_data([], [])
+            return
+        self._render_series(self.device_plot, *series)
+
+    def _curve_for(self, plot_widget):
+        # Крива створюється один раз; нові дані лише підміняють ряд без clear()
+        curve = self._lod_curves.get(id(plot_widget))
+        if curve is None:
+            curve = LodCurve(plot_widget, pen=pg.mkPen(color=(59, 130, 246), width=2), name="Power (W)")
+            self._lod_curves[id(plot_widget)] = curve
             plot_widget.showGrid(x=True, y=True, alpha=0.3)
-            
+            self._crosshairs[id(plot_widget)] = ChartCrosshair(
+                curve, lambda index, pw=plot_widget: self._describe_point(pw, index))
+        return curve
+
+    def _describe_point(self, plot_widget, index: int) -> str:
+        curve = self._lod_curves[id(plot_widget)]
+        ts = float(curve.x[index])
+        lines = [
+            datetime.fromtimestamp(ts).strftime("%d.%m.%Y %H:%M:%S"),
+            f"⚡ {curve.y[index]:.1f} Вт",
+        ]
+        if plot_widget is self.device_plot:
+            return "\n".join(lines)
+        # У живому режимі ряд 1 години - з кільцевого буфера, і вартостей для нього немає
+        costs = self._chart_costs.get(id(plot_widget))
+        if costs is not None and len(costs) == len(curve.x):
+            lines.append(f"💰 {costs[index]:.2f} грн/год")
+        top = self._top_devices_at(ts)
+        if top:
+            lines.append("Найбільші споживачі:")
+            lines.extend(f"  • {name}: {power:.0f} Вт" for name, power in top)
+        return "\n".join(lines)
+
+    def _top_devices_at(self, ts: float):
+        if self._history_store is None:
+            return []
+        bucket = int(ts // self._history_store.RESOLUTIONS[0])
+        if self._top_devices_cache[0] == bucket:
+            return self._top_devices_cache[1]
+        try:
+            rows = self._history_store.top_series_at(ts, "device:", 3)
+        except Exception as e:
+            print(f"Error reading top devices: {e}")
+            rows = []
+        names = self._store.select('stats_summary')["device_names"]
+        top = []
+        for series, power in rows:
+            device_id = series[len("device:"):]
+            top.append((names.get(device_id, device_id), power))
+        self._top_devices_cache = (bucket, top)
+        return top
+
+    def _seed_live_series(self):
+        curve = self._lod_curves.get(id(self.plot_widget_1h))
+        if curve is None:
+            self._live_series.clear()
+        else:
+            self._live_series.extend(curve.x, curve.y)
+            self._show_live_series()
+        self.plot_widget_1h.enableAutoRange(axis='y')
+
+    def _show_live_series(self):
+        # Копія останньої години: зрізи буфера перезаписуються після обходу кола
+        x, y = self._live_series.window(self.LIVE_WINDOW_SECONDS)
+        self._curve_for(self.plot_widget_1h).set_data(x, y)
+
+    def _set_live_mode(self, enabled: bool):
+        self._live = bool(enabled) and self._live_series is not None
+        if not self._live:
+            return
+        self._seed_live_series()
+        self.chart_tabs.setCurrentWidget(self.plot_widget_1h)
+
+    def append_live_sample(self, timestamp: float, power: float):
+        """Новий вимір від MainWindow (кожна перевірка з'єднання)."""
+        if not self._live:
+            return
+        self._live_series.append(timestamp, power)
+        if not self.isVisible():
+            return
+        self._show_live_series()
+
+    def _render_chart(self, data: Dict[str, Any], plot_widget):
+        chart_data = data.get("data", [])
+        if chart_data:
+            self._render_series(plot_widget, *self._entries_to_series(chart_data))
+
+    def _render_series(self, plot_widget, times, powers, costs):
+        try:
+            if not len(times):
+                return
+
+            self._curve_for(plot_widget).set_data(times, powers)
+            self._chart_costs[id(plot_widget)] = costs
+
             try:
-                ymin = min(powers)
-                ymax = max(powers)
+                ymin = float(powers.min())
+                ymax = float(powers.max())
                 padding = (ymax - ymin) * 0.1 if ymax != ymin else max(1.0, abs(ymax) * 0.1)
                 plot_widget.setYRange(ymin - padding, ymax + padding)
             except Exception:
                 pass
 
         except Exception as ex:
-            pass 
-
-    def _on_plot_mouse_move(self, evt):
-        try:
-            if not hasattr(self, '_plot_values') or not self._plot_values:
-                return
-            vb = self.plot_widget.getPlotItem().vb
-            mousePoint = vb.mapSceneToView(evt)
-            x = mousePoint.x()
-            idx = int(round(x))
-            if idx < 0:
-                idx = 0
-            if idx >= len(self._plot_values):
-                idx = len(self._plot_values) - 1
-            val = self._plot_values[idx]
-            QToolTip.showText(QCursor.pos(), f"#{idx}: {val:.2f} W", widget=self.plot_widget)
-        except Exception:
             pass
 
 
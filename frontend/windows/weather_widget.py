@@ -1,7 +1,8 @@
 from PyQt5.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QPushButton, QScrollArea, QLineEdit)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+                             QPushButton, QScrollArea, QLineEdit, QCompleter)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QStringListModel
 from PyQt5.QtGui import QFont, QColor
+from concurrent.futures import ThreadPoolExecutor
 from frontend.weather import WeatherClient
 import re
 
@@ -9,6 +10,12 @@ import re
 class WeatherWidget(QFrame):
     
     weather_updated = pyqtSignal(dict)
+    # Результати фонових запитів: (покоління, дані). Сигнали доставляються в потік GUI
+    _weather_loaded = pyqtSignal(int, object)
+    _location_found = pyqtSignal(int, str, object)
+    _suggestions_ready = pyqtSignal(int, str, object)
+    # Пауза після останнього натискання перед запитом підказок
+    SUGGEST_DELAY_MS = 300
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -16,6 +23,20 @@ class WeatherWidget(QFrame):
         self.weather_client = WeatherClient()
         self._weather_data = None
         self._current_location_label = "Київ"
+        # Мережеві запити - лише у фоні; зміна локації збільшує покоління,
+        # і відповіді для попередньої локації відкидаються
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weather")
+        self._generation = 0
+        self._weather_future = None
+        self._search_future = None
+        self._weather_loaded.connect(self._on_weather_loaded)
+        self._location_found.connect(self._on_location_found)
+        self._suggest_generation = 0
+        self._suggest_future = None
+        self._suggestions = {}
+        self._suggestions_ready.connect(self._on_suggestions_ready)
+        executor = self._executor
+        self.destroyed.connect(lambda *_: executor.shutdown(wait=False))
         self._init_ui()
         self._start_update_timer()
 
@@ -83,6 +104,21 @@ class WeatherWidget(QFrame):
         self.location_input.setFixedWidth(220)
         location_layout.addWidget(self.location_input)
 
+        # Підказки під час введення: запит після паузи SUGGEST_DELAY_MS, у фоні
+        self._suggest_model = QStringListModel(self)
+        self._completer = QCompleter(self._suggest_model, self)
+        self._completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self._completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self._completer.activated[str].connect(self._on_suggestion_chosen)
+        self.location_input.setCompleter(self._completer)
+        self.location_input.textEdited.connect(self._on_location_edited)
+        self.location_input.returnPressed.connect(self._handle_location_change)
+
+        self._suggest_timer = QTimer(self)
+        self._suggest_timer.setSingleShot(True)
+        self._suggest_timer.setInterval(self.SUGGEST_DELAY_MS)
+        self._suggest_timer.timeout.connect(self._request_suggestions)
+
         self.set_location_btn = QPushButton("Задати")
         self.set_location_btn.setMinimumWidth(80)
         self.set_location_btn.clicked.connect(self._handle_location_change)
@@ -122,7 +158,7 @@ class WeatherWidget(QFrame):
         self.refresh_btn = QPushButton("Оновити")
         self.refresh_btn.setMinimumWidth(90)
         self.refresh_btn.setMaximumWidth(120)
-        self.refresh_btn.clicked.connect(self._load_weather)
+        self.refresh_btn.clicked.connect(lambda: self._load_weather(force=True))
         weather_layout.addWidget(self.refresh_btn)
         
         layout.addLayout(weather_layout)
@@ -146,37 +182,142 @@ class WeatherWidget(QFrame):
         
         layout.addStretch()
     
-    def _load_weather(self):
-        data = self.weather_client.get_current_weather()
-        if data:
+    def _load_weather(self, force: bool = False):
+        # Один (кешований на CACHE_TTL) запит: і погода, і рекомендації
+        if self._weather_future is not None:
+            self._weather_future.cancel()
+        generation = self._generation
+        location = (self.weather_client.latitude, self.weather_client.longitude)
+        if self._weather_data is None:
+            self.condition_label.setText("Завантаження...")
+
+        def task():
+            try:
+                bundle = self.weather_client.get_weather_bundle(force=force, location=location)
+            except Exception as e:
+                print(f"Error loading weather: {e}")
+                bundle = None
+            self._weather_loaded.emit(generation, bundle)
+
+        self._weather_future = self._executor.submit(task)
+
+    def _on_weather_loaded(self, generation: int, bundle):
+        if generation != self._generation:
+            return
+        if not bundle:
+            if self._weather_data is None:
+                self.condition_label.setText("Немає даних")
+            return
+        data = bundle["weather"]
+        self._weather_data = data
+        self._update_weather_display(data)
+        self.weather_updated.emit(data)
+        self._update_recommendations(bundle.get("recommendations", []))
+
+    def _cancel_pending(self):
+        """Нова локація: незапущені запити скасовуються, відповіді запущених - ігноруються."""
+        self._generation += 1
+        for future in (self._weather_future, self._search_future):
+            if future is not None:
+                future.cancel()
+        self._weather_future = None
+        self._search_future = None
+
+    def show_cached(self, data: dict):
+        """Показує збережені дані до завершення першого запиту."""
+        if self._weather_data is None and data:
             self._weather_data = data
             self._update_weather_display(data)
-            self.weather_updated.emit(data)
-            
-            rec_data = self.weather_client.get_energy_recommendations()
-            if rec_data:
-                self._update_recommendations(rec_data.get("recommendations", []))
 
     def _handle_location_change(self):
         text = (self.location_input.text() or "").strip()
         if not text:
             return
 
+        self._cancel_pending()
+        suggestion = self._suggestions.get(text)
+        if suggestion:
+            self._apply_location(self._short_name(suggestion), suggestion.get("latitude"), suggestion.get("longitude"))
+            return
         coords = self._parse_coordinates(text)
         if coords:
             latitude, longitude = coords
-            display_name = f"{latitude:.2f}, {longitude:.2f}"
-        else:
-            result = self.weather_client.search_location(text)
-            if not result:
-                self.location_status.setText("Локацію не знайдено")
-                return
-            latitude = result.get("latitude")
-            longitude = result.get("longitude")
-            name = result.get("name")
-            country = result.get("country")
-            display_name = f"{name}, {country}" if country else name
+            self._apply_location(f"{latitude:.2f}, {longitude:.2f}", latitude, longitude)
+            return
+
+        generation = self._generation
+        self.location_status.setText("Пошук...")
+
+        def task():
+            try:
+                result = self.weather_client.search_location(text)
+            except Exception as e:
+                print(f"Error searching location: {e}")
+                result = None
+            self._location_found.emit(generation, text, result)
+
+        self._search_future = self._executor.submit(task)
+
+    def _on_location_edited(self, text: str):
+        text = text.strip()
+        if len(text) < WeatherClient.SUGGEST_MIN_CHARS or self._parse_coordinates(text):
+            self._suggest_timer.stop()
+            return
+        self._suggest_timer.start()
+
+    def _request_suggestions(self):
+        query = self.location_input.text()
+        self._suggest_generation += 1
+        generation = self._suggest_generation
+        # Попередній запит уже неактуальний: незапущений скасовується, запущений - ігнорується
+        if self._suggest_future is not None:
+            self._suggest_future.cancel()
+
+        def task():
+            try:
+                results = self.weather_client.suggest_locations(query)
+            except Exception as e:
+                print(f"Error suggesting locations: {e}")
+                results = []
+            self._suggestions_ready.emit(generation, query, results)
+
+        self._suggest_future = self._executor.submit(task)
+
+    def _on_suggestions_ready(self, generation: int, query: str, results):
+        if generation != self._suggest_generation or self.location_input.text() != query:
+            return
+        self._suggestions = {}
+        for r in results or []:
+            parts = [r.get("name"), r.get("admin1"), r.get("country")]
+            display = ", ".join(p for p in parts if p)
+            self._suggestions.setdefault(display, r)
+        self._suggest_model.setStringList(list(self._suggestions))
+        if self._suggestions and self.location_input.hasFocus():
+            self._completer.complete()
+
+    def _on_suggestion_chosen(self, display: str):
+        suggestion = self._suggestions.get(display)
+        if not suggestion:
+            return
+        self._suggest_timer.stop()
+        self._cancel_pending()
+        self._apply_location(self._short_name(suggestion), suggestion.get("latitude"), suggestion.get("longitude"))
+
+    @staticmethod
+    def _short_name(result: dict) -> str:
+        name = result.get("name")
+        country = result.get("country")
+        return f"{name}, {country}" if country else name
+
+    def _on_location_found(self, generation: int, query: str, result):
+        if generation != self._generation:
+            return
+        if not result:
+            self.location_status.setText("Локацію не знайдено")
+            return
+        self._apply_location(self._short_name(result), result.get("latitude"), result.get("longitude"))
 
+    def _apply_location(self, display_name: str, latitude, longitude):
         if latitude is None or longitude is None:
             self.location_status.setText("Координати недоступні")
             return
@@ -290,5 +431,6 @@ class WeatherWidget(QFrame):
         self._load_weather()
     
     def set_location(self, latitude: float, longitude: float):
+        self._cancel_pending()
         self.weather_client.set_location(latitude, longitude)
         self._load_weather()